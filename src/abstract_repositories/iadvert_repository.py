@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from models.advert import Advert
+from typing import Any, Dict, List, Optional, Set, Tuple
+from models.advert import Advert, RankedAdvert
 from datetime import datetime
 from uuid import UUID
+from dto.filter_dto import AdvertFilter, FilterResult
+from core.pagination import DEFAULT_PAGE_SIZE, Keyset, RankKeyset
 
 
 class IAdvertRepository(ABC):
@@ -11,7 +13,9 @@ class IAdvertRepository(ABC):
     @abstractmethod
     async def get_by_id(self, advert_id: UUID) -> Optional[Advert]: ...
     @abstractmethod
-    async def get_all_adverts(self) -> List[Advert]: ...
+    async def get_all_adverts(self, after: Optional[Keyset] = None, limit: Optional[int] = None) -> List[Advert]: ...
+    @abstractmethod
+    async def scan_adverts(self, after: Optional[Keyset] = None, limit: Optional[int] = None) -> List[Advert]: ...
 
     @abstractmethod
     async def get_advert_by_user(self, user_id: UUID) -> List[Advert]: ...
@@ -20,13 +24,36 @@ class IAdvertRepository(ABC):
     async def is_created(self, user_id: UUID, advert_id: UUID) -> bool: ...
 
     @abstractmethod
-    async def get_adverts_by_key_word(self, key_word: str) -> List[Advert]: ...
+    async def get_adverts_by_key_word(self, key_word: str, after: Optional[Keyset] = None,
+                                      limit: Optional[int] = None) -> List[Advert]: ...
+
+    @abstractmethod
+    async def search_adverts_fulltext(self, query: str, after: Optional[RankKeyset] = None,
+                                      limit: int = DEFAULT_PAGE_SIZE) -> List[RankedAdvert]: ...
+
+    @abstractmethod
+    async def search_adverts_fuzzy(self, query: str, after: Optional[RankKeyset] = None,
+                                   limit: int = DEFAULT_PAGE_SIZE) -> List[RankedAdvert]: ...
+
+    @abstractmethod
+    async def get_search_suggestions(self, query: str, limit: int) -> List[str]: ...
+
+    @abstractmethod
+    async def filter_adverts(self, flt: AdvertFilter, after: Optional[Tuple[Any, UUID]] = None,
+                             limit: int = DEFAULT_PAGE_SIZE) -> FilterResult: ...
 
     @abstractmethod
     async def get_adverts_by_filter(self, begin_time: datetime, end_time: datetime) -> List[Advert]: ...
 
     @abstractmethod
-    async def get_adverts_by_category(self, category_id: UUID) -> List[Advert]: ...
+    async def get_adverts_by_category(self, category_id: UUID, after: Optional[Keyset] = None,
+                                      limit: Optional[int] = None) -> List[Advert]: ...
 
     @abstractmethod
     async def delete_advert(self, advert_id: UUID, user_id: UUID) -> None: ...
+
+    @abstractmethod
+    async def get_feed_details(self, advert_ids: List[UUID], user_id: Optional[UUID] = None) -> Dict[UUID, Dict[str, Any]]: ...
+
+    @abstractmethod
+    async def is_created_many(self, user_id: UUID, advert_ids: List[UUID]) -> Set[UUID]: ...
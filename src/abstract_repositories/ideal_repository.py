@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Set
 from models.advert import Advert
 from models.deal import Deal
 from uuid import UUID
@@ -16,4 +16,10 @@ class IDealRepository(ABC):
     async def is_in_deals(self, user_id: UUID, advert_id: UUID) -> bool: ...
 
     @abstractmethod
-    async def is_bought(self, advert_id: UUID) -> bool: ...
\ No newline at end of file
+    async def is_bought(self, advert_id: UUID) -> bool: ...
+
+    @abstractmethod
+    async def is_in_deals_many(self, user_id: UUID, advert_ids: List[UUID]) -> Set[UUID]: ...
+
+    @abstractmethod
+    async def is_bought_many(self, advert_ids: List[UUID]) -> Set[UUID]: ...
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Set
 from models.advert import Advert
 from models.liked import Liked
 from uuid import UUID
@@ -16,4 +16,7 @@ class ILikedRepository(ABC):
     async def get_liked_by_user(self, id_user: UUID)-> List[Advert]: ...
 
     @abstractmethod
-    async def is_liked(self, user_id: UUID, advert_id: UUID) -> bool: ...
\ No newline at end of file
+    async def is_liked(self, user_id: UUID, advert_id: UUID) -> bool: ...
+
+    @abstractmethod
+    async def is_liked_many(self, user_id: UUID, advert_ids: List[UUID]) -> Set[UUID]: ...
@@ -11,4 +11,7 @@ class IUserRepository(ABC):
     async def delete(self, profile_id: UUID) -> bool: ...
 
     @abstractmethod
-    async def find_by_email(self, email: str) -> Optional[User]: ...
\ No newline at end of file
+    async def find_by_email(self, email: str) -> Optional[User]: ...
+
+    @abstractmethod
+    async def update_password(self, profile_id: UUID, password: str) -> bool: ...
@@ -0,0 +1,451 @@
+"""
+Нагрузочный тест HTTP-маршрутов приложения.
+
+    python -m benchmarks.datagen --adverts 100000                      # один раз: данные
+    python -m benchmarks.bench_http --spawn --workers 1 --duration 10 --out results/base.json
+    python -m benchmarks.bench_http --base-url http://127.0.0.1:8000 --compare results/base.json
+
+--spawn запускает main:app под uvicorn, иначе нагружается уже запущенный сервер (--base-url).
+Каждый маршрут нагружается отдельной фазой анонимными и авторизованными клиентами, затем идёт
+смешанная фаза. По каждой фазе — запросы в секунду, p50/p95/p99 задержки и число запросов к БД
+на HTTP-запрос (по приросту счётчика queries из GET /metrics). Счётчик у каждого воркера uvicorn
+свой, а /metrics отвечает один из них, поэтому при --workers больше 1 это число не считается (null).
+
+Идентификаторы объявлений и категорий и адреса пользователей берутся из базы (роль admin или --dsn).
+Пользователи входят через POST /login с паролем --password (у benchmarks.datagen это "password").
+Фазы like и deal_create пишут в базу.
+
+Все клиенты идут с одного IP, поэтому ограничение частоты (core/rate_limiter.py) отвечало бы им 429:
+при --spawn сервер запускается с RATE_LIMIT_*_IP=0 и RATE_LIMIT_*_USER=0, сервер для --base-url
+нужно запустить так же. Вход с ответом 429 прерывает прогон, а фаза, в которой больше половины
+ответов — 429, помечается в отчёте, и прогон завершается с ошибкой.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote, urlencode, urlsplit
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+# Доля ответов 429, выше которой фаза считается замером ограничителя частоты
+RATE_LIMITED_SHARE = 0.5
+
+
+@dataclass
+class Response:
+    status: int
+    headers: Dict[str, str]
+    cookies: Dict[str, str]
+    body: bytes
+
+
+async def read_response(reader: asyncio.StreamReader) -> Response:
+    """
+    Читает один ответ HTTP/1.1: тело по Content-Length или chunked.
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("сервер закрыл соединение")
+    status = int(status_line.split()[1])
+    headers: Dict[str, str] = {}
+    cookies: Dict[str, str] = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        name, value = name.strip().lower(), value.strip()
+        if name == "set-cookie":
+            cookie_name, _, cookie_value = value.split(";", 1)[0].partition("=")
+            cookies[cookie_name] = cookie_value.strip('"')
+        headers[name] = value
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b"".join(chunks)
+    else:
+        body = await reader.readexactly(int(headers.get("content-length", "0")))
+    return Response(status, headers, cookies, body)
+
+
+class HttpClient:
+    """
+    Минимальный клиент HTTP/1.1 с одним keep-alive соединением. Редиректы не выполняются:
+    303 после POST /like — это и есть ответ маршрута.
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, cookies: Optional[Dict[str, str]] = None,
+                      form: Optional[Dict[str, str]] = None, headers: Optional[Dict[str, str]] = None) -> Response:
+        body = urlencode(form).encode() if form else b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        if form:
+            lines.append("Content-Type: application/x-www-form-urlencoded")
+        if cookies:
+            lines.append("Cookie: " + "; ".join(f"{name}={value}" for name, value in cookies.items()))
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+        for attempt in (1, 2):
+            if self._writer is None:
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                self._writer.write(payload)
+                await self._writer.drain()
+                response = await read_response(self._reader)
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Сервер закрыл простаивавшее keep-alive соединение: один повтор на новом
+                await self.close()
+                if attempt == 2:
+                    raise
+        if response.headers.get("connection", "").lower() == "close":
+            await self.close()
+        return response
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._reader = None
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: Callable[[random.Random], str]
+    auth: bool = False
+
+
+@dataclass
+class Fixtures:
+    adverts: List[str]
+    categories: List[str]
+    words: List[str]
+    sessions: List[Dict[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class PhaseResult:
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    statuses: Dict[str, Dict[int, int]] = field(default_factory=dict)
+    errors: int = 0
+
+    def record(self, name: str, status: int, elapsed: float) -> None:
+        self.latencies.setdefault(name, []).append(elapsed)
+        by_status = self.statuses.setdefault(name, {})
+        by_status[status] = by_status.get(status, 0) + 1
+
+
+def scenarios(fixtures: Fixtures) -> Dict[str, Scenario]:
+    def index(rnd: random.Random) -> str:
+        return "/"
+
+    def category(rnd: random.Random) -> str:
+        return f"/category/{rnd.choice(fixtures.categories)}"
+
+    def search(rnd: random.Random) -> str:
+        return "/search?q=" + quote(" ".join(rnd.sample(fixtures.words, k=min(2, len(fixtures.words)))))
+
+    def like(rnd: random.Random) -> str:
+        return f"/like/{rnd.choice(fixtures.adverts)}"
+
+    def deal(rnd: random.Random) -> str:
+        return f"/deal_create/{rnd.choice(fixtures.adverts)}"
+
+    result = {}
+    for name, path in (("index", index), ("category", category), ("search", search)):
+        result[f"{name}:anon"] = Scenario(f"{name}:anon", "GET", path)
+        result[f"{name}:auth"] = Scenario(f"{name}:auth", "GET", path, auth=True)
+    result["like:auth"] = Scenario("like:auth", "POST", like, auth=True)
+    result["deal_create:auth"] = Scenario("deal_create:auth", "POST", deal, auth=True)
+    return result
+
+
+# Доли маршрутов в смешанной фазе: чтение ленты преобладает над записью
+MIXED_WEIGHTS = {
+    "index:anon": 30, "index:auth": 10, "category:anon": 15, "category:auth": 5,
+    "search:anon": 20, "search:auth": 5, "like:auth": 10, "deal_create:auth": 5,
+}
+
+
+async def run_phase(host: str, port: int, mix: Sequence[Tuple[Scenario, int]], fixtures: Fixtures,
+                    concurrency: int, duration: float, seed: int) -> Tuple[PhaseResult, float]:
+    result = PhaseResult()
+    deadline = time.perf_counter() + duration
+    population = [scenario for scenario, _ in mix]
+    weights = [weight for _, weight in mix]
+
+    async def worker(number: int) -> None:
+        rnd = random.Random(seed * 1000 + number)
+        client = HttpClient(host, port)
+        cookies = fixtures.sessions[number % len(fixtures.sessions)] if fixtures.sessions else None
+        try:
+            while time.perf_counter() < deadline:
+                scenario = rnd.choices(population, weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = await client.request(scenario.method, scenario.path(rnd),
+                                                    cookies if scenario.auth else None)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    result.errors += 1
+                    await client.close()
+                    continue
+                result.record(scenario.name, response.status, time.perf_counter() - started)
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return result, time.perf_counter() - started
+
+
+async def fetch_metrics(client: HttpClient) -> Dict[str, Any]:
+    # Сервер с METRICS_TOKEN отдаёт метрики только с этим токеном; без него — только с loopback
+    token = os.getenv("METRICS_TOKEN")
+    response = await client.request("GET", "/metrics", headers={"Authorization": f"Bearer {token}"} if token else None)
+    if response.status != 200:
+        raise SystemExit(f"GET /metrics: {response.status}, нужен METRICS_TOKEN сервера или запуск на этом хосте")
+    return json.loads(response.body)
+
+
+def summarize(result: PhaseResult, elapsed: float, queries: Optional[int]) -> Dict[str, Any]:
+    routes: Dict[str, Any] = {}
+    total = limited = 0
+    for name, values in sorted(result.latencies.items()):
+        values.sort()
+        total += len(values)
+        limited += result.statuses[name].get(429, 0)
+        routes[name] = {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+            "statuses": {str(status): count for status, count in sorted(result.statuses[name].items())},
+        }
+    return {
+        "requests": total,
+        "errors": result.errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "db_queries_per_request": round(queries / total, 2) if total and queries is not None else None,
+        # Доля ответов 429: при заметной доле фаза меряет отказ ограничителя, а не маршрут
+        "rate_limited": round(limited / total, 3) if total else 0.0,
+        "routes": routes,
+    }
+
+
+async def load_fixtures(dsn: str, users: int) -> Tuple[Fixtures, List[str]]:
+    import asyncpg
+
+    from core.migrations import asyncpg_dsn
+
+    conn = await asyncpg.connect(asyncpg_dsn(dsn))
+    try:
+        adverts = [str(r["id"]) for r in await conn.fetch(
+            "SELECT id FROM adv_uuid.adverts ORDER BY date_created DESC LIMIT 2000")]
+        categories = [str(r["id"]) for r in await conn.fetch("SELECT id FROM adv_uuid.categories")]
+        titles = [r["content"] for r in await conn.fetch("SELECT content FROM adv_uuid.adverts LIMIT 2000")]
+        emails = [r["email"] for r in await conn.fetch(
+            "SELECT p.email FROM adv_uuid.profiles p JOIN adv_uuid.customers c ON c.profile_id = p.id LIMIT $1",
+            users,
+        )]
+    finally:
+        await conn.close()
+    if not adverts or not categories:
+        raise SystemExit("в базе нет объявлений или категорий: python -m benchmarks.datagen")
+    words = sorted({word for title in titles for word in title.lower().split() if word.isalpha()}) or ["велосипед"]
+    return Fixtures(adverts, categories, words), emails
+
+
+async def login_all(client: HttpClient, emails: Sequence[str], password: str) -> List[Dict[str, str]]:
+    sessions = []
+    for email in emails:
+        response = await client.request("POST", "/login", form={"email": email, "password": password})
+        if response.status == 429:
+            raise SystemExit("POST /login: 429 — запустите сервер с RATE_LIMIT_LOGIN_IP=0 или уменьшите --users")
+        if "access_token" in response.cookies:
+            sessions.append({"access_token": response.cookies["access_token"]})
+    return sessions
+
+
+async def wait_ready(client: HttpClient, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            metrics = await fetch_metrics(client)
+            if metrics.get("suggest_trie", {}).get("ready", True):
+                return
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            await client.close()
+        if time.perf_counter() > deadline:
+            raise SystemExit("сервер не ответил на /metrics")
+        await asyncio.sleep(0.5)
+
+
+def unlimited_env() -> Dict[str, str]:
+    """
+    Переменные, выключающие все ограничения частоты: нагрузка идёт с одного IP и от немногих пользователей.
+    """
+    from core.rate_limiter import RATE_RULES
+
+    return {f"RATE_LIMIT_{rule.name.upper()}_{kind}": "0" for rule in RATE_RULES for kind in ("IP", "USER")}
+
+
+def spawn_server(port: int, workers: int) -> subprocess.Popen:
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    return subprocess.Popen(command, cwd=SRC_DIR, env={**os.environ, **unlimited_env()})
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(base: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """
+    Строки сравнения двух прогонов: rps и p95 каждой фазы и изменение в процентах.
+    """
+    lines = []
+    for phase, result in current["phases"].items():
+        before = base.get("phases", {}).get(phase)
+        if before is None:
+            continue
+        for route, stats in result["routes"].items():
+            old = before["routes"].get(route)
+            if old is None:
+                continue
+            rps = (stats["rps"] / old["rps"] - 1) * 100 if old["rps"] else 0.0
+            p95 = (stats["p95_ms"] / old["p95_ms"] - 1) * 100 if old["p95_ms"] else 0.0
+            lines.append(f"{phase:18} {route:18} rps {old['rps']:>9} -> {stats['rps']:<9} ({rps:+.1f}%)  "
+                         f"p95 {old['p95_ms']:>8} -> {stats['p95_ms']:<8} ({p95:+.1f}%)")
+    return lines
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from core.db import DATABASES
+
+    url = urlsplit(args.base_url)
+    host, port = url.hostname or "127.0.0.1", url.port or 80
+    fixtures, emails = await load_fixtures(args.dsn or DATABASES["admin"], args.users)
+
+    server = spawn_server(port, args.workers) if args.spawn else None
+    control = HttpClient(host, port)
+    try:
+        await wait_ready(control, args.startup_timeout)
+        fixtures.sessions = await login_all(control, emails, args.password)
+        available = scenarios(fixtures)
+        if not fixtures.sessions:
+            print("ни один пользователь не вошёл: авторизованные фазы пропущены", file=sys.stderr)
+            available = {name: s for name, s in available.items() if not s.auth}
+
+        selected = [name for name in available if name.split(":")[0] in args.routes]
+        phases: List[Tuple[str, List[Tuple[Scenario, int]]]] = [(name, [(available[name], 1)]) for name in selected]
+        if args.mixed:
+            phases.append(("mixed", [(available[n], w) for n, w in MIXED_WEIGHTS.items() if n in available]))
+
+        # Счётчик запросов к БД свой у каждого воркера: при нескольких разница по одному
+        # из них ничего не говорит о нагрузке целиком
+        count_queries = args.workers == 1
+        report: Dict[str, Any] = {}
+        for number, (phase, mix) in enumerate(phases):
+            # Прогрев: соединения пулов и кэши приложения не должны попадать в замер
+            await run_phase(host, port, mix, fixtures, args.concurrency, args.warmup, args.seed + number)
+            before = (await fetch_metrics(control))["queries"]["total"] if count_queries else 0
+            result, elapsed = await run_phase(host, port, mix, fixtures, args.concurrency, args.duration,
+                                              args.seed + number)
+            queries = (await fetch_metrics(control))["queries"]["total"] - before if count_queries else None
+            report[phase] = summarize(result, elapsed, queries)
+            per_request = report[phase]["db_queries_per_request"]
+            print(f"{phase:18} {report[phase]['rps']:>9} rps"
+                  + (f"  {per_request} запросов к БД на запрос" if per_request is not None else ""), file=sys.stderr)
+            if report[phase]["rate_limited"] > RATE_LIMITED_SHARE:
+                print(f"{phase:18} {report[phase]['rate_limited']:.0%} ответов 429: замер недостоверен",
+                      file=sys.stderr)
+    finally:
+        await control.close()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    return {
+        "commit": git_commit(),
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {key: getattr(args, key) for key in ("concurrency", "duration", "warmup", "workers", "seed")},
+        "phases": report,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8765")
+    parser.add_argument("--spawn", action="store_true", help="запустить main:app под uvicorn на порту из --base-url")
+    parser.add_argument("--workers", type=int, default=1, help="воркеры uvicorn: запускаемые при --spawn или у сервера по --base-url; "
+                             "при нескольких запросы к БД не считаются")
+    parser.add_argument("--dsn", help="SQLAlchemy URL базы для выбора id и пользователей (по умолчанию роль admin)")
+    parser.add_argument("--routes", nargs="+", default=["index", "category", "search", "like", "deal_create"])
+    parser.add_argument("--no-mixed", dest="mixed", action="store_false", help="без смешанной фазы")
+    parser.add_argument("--concurrency", type=int, default=32, help="одновременных клиентов")
+    parser.add_argument("--duration", type=float, default=10.0, help="длительность фазы, с")
+    parser.add_argument("--warmup", type=float, default=2.0, help="прогрев перед фазой, с")
+    parser.add_argument("--users", type=int, default=50, help="сколько пользователей входит в систему")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--out", type=Path, help="куда сохранить JSON с результатами")
+    parser.add_argument("--compare", type=Path, help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(result, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    if args.compare:
+        print("\n".join(compare(json.loads(args.compare.read_text(encoding="utf-8")), result)))
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    limited = [phase for phase, report in result["phases"].items() if report["rate_limited"] > RATE_LIMITED_SHARE]
+    if limited:
+        raise SystemExit(f"в фазах {', '.join(limited)} большинство ответов 429: "
+                         "запустите сервер с RATE_LIMIT_*_IP=0 и RATE_LIMIT_*_USER=0")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Пропускная способность входа и задержка цикла событий при одновременных логинах.
+
+    python -m benchmarks.bench_login --concurrency 32 --duration 5
+    python -m benchmarks.bench_login --mode pool --workers 4 --n 32768
+    python -m benchmarks.bench_login --plaintext      # пароли открытым текстом: первый вход их обновляет
+
+AuthService.login выполняется в этом процессе над пользователями в памяти (БД не нужна).
+inline — хэш проверяется прямо в цикле событий (так выглядел бы slow hash без пула),
+pool — в пуле потоков PasswordHasher. Параллельно с логинами фоновая задача каждые --tick мс
+засыпает и измеряет, насколько позже положенного она проснулась: это задержка, которую
+в тот же момент получил бы любой другой запрос воркера.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional
+from uuid import UUID, uuid4
+
+from abstract_repositories.iuser_repository import IUserRepository
+from benchmarks.bench_http import percentile
+from models.user import User
+from services.auth_service import AuthService
+from services.password_hasher import (
+    PASSWORD_HASH_N, PASSWORD_HASH_P, PASSWORD_HASH_R, PASSWORD_HASH_WORKERS, PasswordHasher,
+)
+
+PASSWORD = "password"
+
+
+class MemoryUsers(IUserRepository):
+    def __init__(self) -> None:
+        self.by_email: Dict[str, User] = {}
+        self.updates = 0
+
+    async def create(self, user: User) -> User:
+        user = user.model_copy(update={"id": user.id or uuid4()})
+        self.by_email[user.email] = user
+        return user
+
+    async def delete(self, profile_id: UUID) -> bool:
+        return False
+
+    async def find_by_email(self, email: str) -> Optional[User]:
+        return self.by_email.get(email)
+
+    async def update_password(self, profile_id: UUID, password: str) -> bool:
+        for email, user in self.by_email.items():
+            if user.id == profile_id:
+                self.by_email[email] = user.model_copy(update={"password": password})
+                self.updates += 1
+                return True
+        return False
+
+
+class InlineHasher(PasswordHasher):
+    """
+    Тот же scrypt, но в цикле событий: точка отсчёта для сравнения с пулом.
+    """
+
+    async def hash(self, password: str) -> str:
+        self.hashes += 1
+        return self.hash_sync(password)
+
+    async def verify(self, password: str, encoded: str) -> bool:
+        self.verifications += 1
+        return self.verify_sync(password, encoded)
+
+
+async def seed_users(repo: MemoryUsers, hasher: PasswordHasher, count: int, plaintext: bool) -> List[str]:
+    encoded = PASSWORD if plaintext else hasher.hash_sync(PASSWORD)
+    emails = []
+    for n in range(count):
+        email = f"user{n}@example.com"
+        await repo.create(User(nickname=f"user{n}", fio=f"Пользователь {n}", email=email,
+                               phone_number=str(n), password=encoded))
+        emails.append(email)
+    return emails
+
+
+async def watch_lag(tick: float, samples: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(tick)
+        samples.append(max(time.perf_counter() - started - tick, 0.0) * 1000)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, object]:
+    hasher_cls = InlineHasher if args.mode == "inline" else PasswordHasher
+    hasher = hasher_cls(n=args.n, r=args.r, p=args.p, workers=args.workers)
+    repo = MemoryUsers()
+    emails = await seed_users(repo, hasher, args.users, args.plaintext)
+    service = AuthService(repo, hasher=hasher)
+
+    latencies: List[float] = []
+    lag: List[float] = []
+    failures = 0
+    stop = asyncio.Event()
+    deadline = time.perf_counter() + args.duration
+
+    async def client(k: int) -> None:
+        nonlocal failures
+        i = k
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                await service.login(None, emails[i % len(emails)], PASSWORD)
+            except ValueError:
+                failures += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+            i += args.concurrency
+
+    watcher = asyncio.create_task(watch_lag(args.tick / 1000, lag, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(client(k) for k in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await watcher
+    hasher.shutdown()
+
+    latencies.sort()
+    lag.sort()
+    return {
+        "mode": args.mode,
+        "hasher": hasher.stats(),
+        "concurrency": args.concurrency,
+        "logins": len(latencies),
+        "failures": failures,
+        "rehashed": repo.updates,
+        "logins_per_s": round(len(latencies) / elapsed, 1),
+        "login_ms": {p: round(percentile(latencies, q), 2) for p, q in (("p50", 50), ("p99", 99))},
+        "loop_lag_ms": {
+            "p50": round(percentile(lag, 50), 2),
+            "p99": round(percentile(lag, 99), 2),
+            "max": round(lag[-1] if lag else 0.0, 2),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("inline", "pool", "both"), default="both")
+    parser.add_argument("--concurrency", type=int, default=32, help="одновременных клиентов")
+    parser.add_argument("--duration", type=float, default=5.0, help="длительность фазы, с")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=PASSWORD_HASH_WORKERS, help="потоков пула")
+    parser.add_argument("--n", type=int, default=PASSWORD_HASH_N, help="стоимость scrypt N")
+    parser.add_argument("--r", type=int, default=PASSWORD_HASH_R)
+    parser.add_argument("--p", type=int, default=PASSWORD_HASH_P)
+    parser.add_argument("--tick", type=float, default=5.0, help="период замера задержки цикла, мс")
+    parser.add_argument("--plaintext", action="store_true", help="пароли открытым текстом (проверка обновления)")
+    args = parser.parse_args()
+
+    modes = ("inline", "pool") if args.mode == "both" else (args.mode,)
+    results = []
+    for mode in modes:
+        args.mode = mode
+        results.append(asyncio.run(run(args)))
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
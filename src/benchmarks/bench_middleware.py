@@ -0,0 +1,147 @@
+"""
+Накладные расходы middleware определения пользователя на пустом маршруте.
+
+    python -m benchmarks.bench_middleware --requests 20000
+
+Запросы подаются приложению FastAPI прямо через ASGI (без сети и сервера), маршрут /noop
+возвращает пустой ответ. Сравниваются варианты:
+
+    none      — без middleware (точка отсчёта);
+    http      — прежний @app.middleware("http") (BaseHTTPMiddleware);
+    asgi      — core.user_middleware.UserMiddleware.
+
+Каждый вариант — без cookie (анонимный клиент) и с действительным access_token
+(токен проверяется через AuthService с кэшем токенов, как в приложении).
+
+rate_limit — стоимость одной проверки core.rate_limiter (сопоставление маршрута и корзины
+IP и пользователя) на --clients разных клиентах.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+
+from core.create_jwt import JWTManager
+from core.rate_limiter import RateLimiter
+from core.user_middleware import UserMiddleware
+from services.auth_service import AuthService
+from services.token_cache import TokenCache
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+    auth = AuthService(None, TokenCache())
+    app.state.locator = SimpleNamespace(auth_service=lambda: auth)
+
+    @app.get("/noop")
+    async def noop(request: Request):
+        return PlainTextResponse("ok" if request.state.user else "")
+
+    if variant == "http":
+        @app.middleware("http")
+        async def add_user_to_request(request: Request, call_next):
+            token = request.cookies.get("access_token")
+            request.state.user = None
+            if token:
+                try:
+                    payload = request.app.state.locator.auth_service().verify_token(token)
+                    request.state.user = {
+                        "id": payload.get("id"),
+                        "email": payload.get("sub"),
+                        "role": payload.get("role"),
+                    }
+                except Exception:
+                    request.state.user = None
+            return await call_next(request)
+    elif variant == "asgi":
+        app.add_middleware(UserMiddleware)
+    # none: маршрут читает request.state.user, поэтому measure кладёт user = None прямо в scope
+    return app
+
+
+def make_scope(app: FastAPI, cookie: Optional[str]) -> Dict[str, Any]:
+    headers: List[Tuple[bytes, bytes]] = [(b"host", b"bench"), (b"user-agent", b"bench")]
+    if cookie:
+        headers.append((b"cookie", f"theme=dark; access_token={cookie}".encode()))
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/noop", "raw_path": b"/noop", "root_path": "", "query_string": b"",
+        "headers": headers, "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+
+
+async def measure(app: FastAPI, cookie: Optional[str], requests: int, variant: str) -> float:
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    statuses: List[int] = []
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    template = make_scope(app, cookie)
+    started = time.perf_counter()
+    for _ in range(requests):
+        scope = dict(template)
+        if variant == "none":
+            scope["state"] = {"user": None}
+        await app(scope, receive, send)
+    elapsed = time.perf_counter() - started
+    if set(statuses) != {200}:
+        raise RuntimeError(f"unexpected statuses: {sorted(set(statuses))}")
+    return elapsed / requests * 1e6
+
+
+def measure_rate_limit(requests: int, clients: int) -> Dict[str, float]:
+    limiter = RateLimiter()
+    keys = [(f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}", f"user-{n}") for n in range(clients)]
+    started = time.perf_counter()
+    for i in range(requests):
+        ip, user_id = keys[i % clients]
+        limiter.check(limiter.match("POST", "/like/42"), ip, user_id)
+    elapsed = time.perf_counter() - started
+    return {"check_us": round(elapsed / requests * 1e6, 2), "buckets": len(limiter)}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    token = JWTManager.create_access_token({"sub": "bench@example.com", "id": "1", "role": "authorized_user"})
+    results: Dict[str, Dict[str, float]] = {}
+    for variant in ("none", "http", "asgi"):
+        app = build_app(variant)
+        row: Dict[str, float] = {}
+        for label, cookie in (("anonymous_us", None), ("with_token_us", token)):
+            await measure(app, cookie, args.warmup, variant)
+            row[label] = round(min(
+                [await measure(app, cookie, args.requests, variant) for _ in range(args.repeat)]
+            ), 2)
+        results[variant] = row
+    base = results["none"]
+    for variant in ("http", "asgi"):
+        results[variant]["overhead_anonymous_us"] = round(results[variant]["anonymous_us"] - base["anonymous_us"], 2)
+        results[variant]["overhead_with_token_us"] = round(
+            results[variant]["with_token_us"] - base["with_token_us"], 2
+        )
+    results["rate_limit"] = measure_rate_limit(args.requests, args.clients)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000, help="запросов в замере")
+    parser.add_argument("--repeat", type=int, default=3, help="повторов замера; берётся лучший")
+    parser.add_argument("--warmup", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=10_000, help="разных IP и пользователей для rate_limit")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
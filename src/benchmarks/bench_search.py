@@ -0,0 +1,154 @@
+"""
+Сравнение поиска по индексу в памяти и SQL-поиска (fulltext, fuzzy, pattern).
+
+    python -m benchmarks.bench_search --source synthetic --docs 200000
+    python -m benchmarks.bench_search --source db --queries 500
+
+synthetic — только индекс в памяти на сгенерированных объявлениях (БД не нужна).
+db — индекс строится из таблицы adverts, и те же запросы выполняются обоими бэкендами.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+from uuid import uuid4
+
+from models.advert import Advert
+from services.search_index import SearchIndex, tokenize
+
+_WORDS = (
+    "велосипед горный детский диван угловой кровать стол стул шкаф телефон смартфон ноутбук "
+    "планшет часы куртка пальто ботинки кроссовки коляска самокат холодильник плита чайник "
+    "apple iphone samsung galaxy xiaomi lenovo thinkpad sony playstation nike adidas "
+    "новый б/у отличное состояние срочно торг доставка самовывоз гарантия оригинал чехол"
+).split()
+
+
+def synthetic_adverts(count: int, seed: int = 1) -> List[Advert]:
+    rnd = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    category, seller = uuid4(), uuid4()
+    return [
+        Advert(
+            id=uuid4(),
+            content=" ".join(rnd.choices(_WORDS, k=rnd.randint(2, 5))),
+            description=" ".join(rnd.choices(_WORDS, k=rnd.randint(5, 30))),
+            id_category=category,
+            price=rnd.randint(100, 100_000),
+            id_seller=seller,
+            date_created=start - timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+def sample_queries(adverts: List[Advert], count: int, seed: int = 2) -> List[str]:
+    rnd = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        tokens = tokenize(rnd.choice(adverts).content) or ["велосипед"]
+        queries.append(" ".join(rnd.sample(tokens, k=min(len(tokens), rnd.randint(1, 2)))))
+    return queries
+
+
+async def measure(search: Callable[[str], Awaitable[object]], queries: List[str]) -> Dict[str, float]:
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        await search(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "queries": len(timings),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+async def build_index(fetch_page, page_size: int) -> Dict[str, object]:
+    index = SearchIndex()
+    started = time.perf_counter()
+    await index.build(fetch_page, page_size)
+    return {"index": index, "build_s": round(time.perf_counter() - started, 3)}
+
+
+async def run_synthetic(args: argparse.Namespace) -> Dict[str, object]:
+    adverts = synthetic_adverts(args.docs)
+    positions = {advert.id: i for i, advert in enumerate(adverts)}
+
+    async def fetch_page(after, limit):
+        start = 0 if after is None else positions[after[1]] + 1
+        return adverts[start:start + limit]
+
+    built = await build_index(fetch_page, args.page)
+    index: SearchIndex = built["index"]
+
+    async def search(query: str):
+        return index.search(query, limit=args.limit)
+
+    return {
+        "build_s": built["build_s"],
+        "index": index.stats(),
+        "memory": await measure(search, sample_queries(adverts, args.queries)),
+    }
+
+
+async def run_db(args: argparse.Namespace) -> Dict[str, object]:
+    from core.db import SessionLocal, dispose_engines
+    from repositories.advert_repository import AdvertsRepository
+    from sql_builders.advert_sql_builder import AdvertsSqlBuilder
+
+    try:
+        async with SessionLocal["any_user"]() as session:
+            repo = AdvertsRepository(session, AdvertsSqlBuilder())
+            built = await build_index(repo.scan_adverts, args.page)
+            index: SearchIndex = built["index"]
+            if not len(index):
+                return {"error": "в таблице adverts нет объявлений"}
+
+            adverts = await repo.get_all_adverts(limit=10_000)
+            queries = sample_queries(adverts, args.queries)
+
+            async def memory(query: str):
+                return index.search(query, limit=args.limit)
+
+            result: Dict[str, object] = {
+                "build_s": built["build_s"],
+                "index": index.stats(),
+                "memory": await measure(memory, queries),
+                "sql_fulltext": await measure(lambda q: repo.search_adverts_fulltext(q, limit=args.limit), queries),
+                "sql_fuzzy": await measure(lambda q: repo.search_adverts_fuzzy(q, limit=args.limit), queries),
+            }
+            if args.with_pattern:
+                result["sql_pattern"] = await measure(
+                    lambda q: repo.get_adverts_by_key_word(q, limit=args.limit), queries
+                )
+            return result
+    finally:
+        await dispose_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=("synthetic", "db"), default="synthetic")
+    parser.add_argument("--docs", type=int, default=100_000, help="число объявлений для synthetic")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=30, help="размер страницы выдачи")
+    parser.add_argument("--page", type=int, default=1000, help="размер страницы при построении индекса")
+    parser.add_argument("--with-pattern", action="store_true", help="замерить и режим pattern (ILIKE)")
+    args = parser.parse_args()
+
+    runner = run_db if args.source == "db" else run_synthetic
+    print(json.dumps(asyncio.run(runner(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
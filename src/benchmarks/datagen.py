@@ -0,0 +1,353 @@
+"""
+Генератор синтетических данных для нагрузочных тестов и планов запросов.
+
+    python -m benchmarks.datagen --adverts 1000000 --likes 10000000
+    python -m benchmarks.datagen --adverts 100000 --defer-indexes --truncate
+
+Заполняет profiles, customers, sellers, categories, adverts, likes и deals схемы adv_uuid.
+Популярность распределена по Ципфу: немногие пользователи ставят большую часть лайков,
+немногие объявления их получают, категории и слова заголовков тоже неравномерны.
+Свежих объявлений больше, чем старых; лайки и сделки появляются после публикации.
+Строки генерируются потоком и грузятся через COPY (asyncpg copy_records_to_table).
+
+Подключение — роль admin (DB_ADMIN_URL) или --dsn. Данные добавляются к существующим;
+--truncate предварительно очищает все семь таблиц.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from array import array
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID, SafeUUID
+
+from services.password_hasher import password_hasher
+
+_MASK62 = (1 << 62) - 1
+# Нечётный множитель: n -> n * _MIX mod 2^62 — биекция, разносящая соседние номера по всему диапазону
+_MIX = 0x9E3779B97F4A7C15 & _MASK62 | 1
+
+# UUID неизменяем, поэтому поля задаются в обход __setattr__, как это делает сам модуль uuid
+_new_uuid, _set = object.__new__, object.__setattr__
+_UNKNOWN = SafeUUID.unknown
+
+_CATEGORIES = (
+    "Транспорт", "Недвижимость", "Электроника", "Одежда и обувь", "Для дома и дачи", "Детские товары",
+    "Хобби и отдых", "Животные", "Услуги", "Работа", "Запчасти", "Красота и здоровье",
+)
+_WORDS = (
+    "продам велосипед диван телефон ноутбук куртка коляска стол шкаф кровать смартфон планшет часы "
+    "ботинки кроссовки пальто самокат холодильник плита чайник горный детский угловой новый б/у "
+    "отличное состояние срочно торг доставка самовывоз гарантия оригинал чехол комплект "
+    "apple iphone samsung galaxy xiaomi lenovo thinkpad sony playstation nike adidas ikea"
+).split()
+
+TABLES = ("profiles", "customers", "sellers", "categories", "adverts", "likes", "deals")
+
+
+@dataclass(frozen=True)
+class Volumes:
+    users: int = 100_000
+    seller_share: float = 0.2
+    categories: int = 50
+    adverts: int = 1_000_000
+    likes: int = 10_000_000
+    deals: int = 500_000
+    # Объявления распределены по последним days дням
+    days: int = 365
+
+    @classmethod
+    def scaled(cls, adverts: int) -> "Volumes":
+        """
+        Пропорциональные объёмы для заданного числа объявлений: 10 лайков и 0.5 сделки на объявление.
+        """
+        return cls(users=max(adverts // 10, 10), categories=min(50, max(adverts // 100, 5)),
+                   adverts=adverts, likes=adverts * 10, deals=adverts // 2)
+
+
+@dataclass
+class Dataset:
+    """
+    Итог генерации: число строк и время загрузки по таблицам, "горячие" значения для запросов.
+    """
+    rows: Dict[str, int] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+    hot_user_id: Optional[UUID] = None
+    hot_user_email: str = ""
+    hot_category_id: Optional[UUID] = None
+    hot_advert_id: Optional[UUID] = None
+    newest_advert_date: Optional[datetime] = None
+
+    def to_json(self) -> Dict[str, Any]:
+        return {key: str(value) if isinstance(value, (UUID, datetime)) else value
+                for key, value in asdict(self).items()}
+
+
+class Zipf:
+    """
+    Выбор номера из [0, n) с вероятностью ~ 1 / (rank + 1)^s. Ранг переводится в номер
+    случайной перестановкой, чтобы популярность не совпадала с порядком вставки.
+    """
+
+    def __init__(self, n: int, s: float, rnd: random.Random) -> None:
+        self.n = n
+        self._cum = list(accumulate(1.0 / (rank + 1) ** s for rank in range(n)))
+        self._rank_to_index = array("I", range(n))
+        rnd.shuffle(self._rank_to_index)
+        self._rnd = rnd
+
+    def top(self, rank: int = 0) -> int:
+        return self._rank_to_index[rank]
+
+    def sample(self, k: int) -> List[int]:
+        ranks = self._rnd.choices(range(self.n), cum_weights=self._cum, k=k)
+        index = self._rank_to_index
+        return [index[rank] for rank in ranks]
+
+
+class _Ids:
+    """
+    Детерминированные UUID по номеру строки: хранить миллионы UUID для внешних ключей не нужно.
+    Старшие 64 бита случайны для каждого запуска, так что повторная генерация не конфликтует с прошлой.
+    """
+
+    def __init__(self, rnd: random.Random) -> None:
+        prefix = rnd.getrandbits(64)
+        self.tag = f"{prefix:016x}"[:8]
+        # Биты версии 4 и варианта RFC 4122 выставлены заранее: UUID(int=..., version=4) втрое медленнее
+        self._high = ((prefix & ~(0xF << 12)) | (4 << 12)) << 64 | 1 << 63
+
+    def __call__(self, n: int) -> UUID:
+        uuid = _new_uuid(UUID)
+        _set(uuid, "int", self._high | ((n * _MIX) & _MASK62))
+        _set(uuid, "is_safe", _UNKNOWN)
+        return uuid
+
+
+class DataGenerator:
+    def __init__(self, volumes: Volumes, seed: int = 1, now: Optional[datetime] = None,
+                 batch: int = 100_000) -> None:
+        self.v = volumes
+        self.rnd = random.Random(seed)
+        self.now = now or datetime.utcnow().replace(microsecond=0)
+        self.batch = batch
+        self.user_id, self.category_id, self.advert_id = _Ids(self.rnd), _Ids(self.rnd), _Ids(self.rnd)
+        self.sellers = max(int(volumes.users * volumes.seller_share), 1)
+        # Пароль всех пользователей — "password"; хэш один на всех, иначе scrypt занял бы часы
+        self.password = password_hasher.hash_sync("password")
+        # Возраст объявлений в целых секундах от now: нужен, чтобы лайк был позже объявления.
+        # Целые секунды заметно ускоряют timedelta на миллионах строк
+        self.advert_age = array("q")
+
+    def email(self, n: int) -> str:
+        return f"user{n}.{self.user_id.tag}@example.com"
+
+    def seller(self, k: int) -> int:
+        # Продавцы — каждый пятый пользователь (при seller_share = 0.2)
+        return k * self.v.users // self.sellers
+
+    def profiles(self) -> Iterator[Tuple[Any, ...]]:
+        for n in range(self.v.users):
+            yield self.user_id(n), f"user{n}", f"Пользователь {n}", self.email(n), f"+7{9_000_000_000 + n}", self.password
+
+    def customers(self) -> Iterator[Tuple[Any, ...]]:
+        for n in range(self.v.users):
+            yield self.user_id(n), self.rnd.randint(0, 5)
+
+    def sellers_rows(self) -> Iterator[Tuple[Any, ...]]:
+        for k in range(self.sellers):
+            yield self.user_id(self.seller(k)), self.rnd.randint(0, 5)
+
+    def categories(self) -> Iterator[Tuple[Any, ...]]:
+        for n in range(self.v.categories):
+            base = _CATEGORIES[n % len(_CATEGORIES)]
+            yield self.category_id(n), f"{base} {n // len(_CATEGORIES) + 1}.{self.category_id.tag}"
+
+    def adverts(self, categories: Zipf, sellers: Zipf) -> Iterator[Tuple[Any, ...]]:
+        """
+        Объявления в порядке публикации. Возраст (1 - u)^2 * days при равномерном u:
+        за последние 10% периода публикуется около трети объявлений.
+        """
+        rnd, total, span = self.rnd, self.v.adverts, self.v.days * 86400.0
+        words = Zipf(len(_WORDS), 1.0, rnd)
+        for start in range(0, total, self.batch):
+            size = min(self.batch, total - start)
+            category_batch, seller_batch = categories.sample(size), sellers.sample(size)
+            word_batch = words.sample(size * 4)
+            for j in range(size):
+                n = start + j
+                age = int(span * (1 - (n + rnd.random()) / total) ** 2)
+                self.advert_age.append(age)
+                title = " ".join(_WORDS[w] for w in word_batch[j * 4: j * 4 + rnd.randint(2, 4)])
+                yield (
+                    self.advert_id(n), f"{title.capitalize()} {n}",
+                    f"Описание объявления {n}: {title}", self.category_id(category_batch[j]),
+                    int(rnd.lognormvariate(8.5, 1.3)), self.user_id(self.seller(seller_batch[j])),
+                    self.now - timedelta(0, age),
+                )
+
+    def interactions(self, total: int, customers: Zipf, adverts: Zipf,
+                     mean_delay_days: float) -> Iterator[Tuple[Any, ...]]:
+        """
+        Лайки или сделки: (покупатель, объявление, дата); id строки назначает БД.
+        Покупатель и объявление — по Ципфу, пара не повторяется,
+        дата — через экспоненциальную задержку после публикации.
+        """
+        rnd, now, advert_age = self.rnd, self.now, self.advert_age
+        user_id, advert_id = self.user_id, self.advert_id
+        rate = 1 / (mean_delay_days * 86400)
+        per_customer: Counter = Counter()
+        for start in range(0, total, self.batch):
+            per_customer.update(customers.sample(min(self.batch, total - start)))
+
+        cap = max(self.v.adverts // 4, 1)
+        for customer, count in per_customer.items():
+            count = min(count, cap)
+            customer_id = user_id(customer)
+            seen: set = set()
+            attempts = 0
+            while len(seen) < count and attempts < count * 4:
+                for advert in adverts.sample(count - len(seen)):
+                    attempts += 1
+                    if advert in seen:
+                        continue
+                    seen.add(advert)
+                    age = advert_age[advert]
+                    delay = min(int(rnd.expovariate(rate)), age)
+                    yield customer_id, advert_id(advert), now - timedelta(0, age - delay)
+
+
+async def _copy(conn: Any, table: str, columns: Sequence[str], rows: Iterator[Tuple[Any, ...]],
+                dataset: Dataset, progress: Callable[[str], None]) -> None:
+    counted = _Counted(rows)
+    started = time.perf_counter()
+    await conn.copy_records_to_table(table, schema_name="adv_uuid", columns=list(columns), records=counted)
+    elapsed = time.perf_counter() - started
+    dataset.rows[table] = counted.count
+    dataset.seconds[table] = round(elapsed, 3)
+    progress(f"{table}: {counted.count} строк за {elapsed:.1f} с")
+
+
+class _Counted:
+    def __init__(self, rows: Iterator[Tuple[Any, ...]]) -> None:
+        self._rows = rows
+        self.count = 0
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        for row in self._rows:
+            self.count += 1
+            yield row
+
+
+async def _secondary_indexes(conn: Any) -> List[Tuple[str, str]]:
+    """
+    Индексы таблиц генератора, не связанные с ограничениями (их можно удалить на время загрузки).
+    """
+    rows = await conn.fetch("""
+        SELECT i.indexname, i.indexdef FROM pg_indexes i
+        JOIN pg_class c ON c.relname = i.indexname
+        JOIN pg_namespace n ON n.oid = c.relnamespace AND n.nspname = i.schemaname
+        WHERE i.schemaname = 'adv_uuid' AND i.tablename = ANY($1::text[])
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint k WHERE k.conindid = c.oid)
+    """, list(TABLES))
+    return [(row["indexname"], row["indexdef"]) for row in rows]
+
+
+async def generate(conn: Any, volumes: Volumes, seed: int = 1, now: Optional[datetime] = None,
+                   defer_indexes: bool = False, truncate: bool = False,
+                   progress: Callable[[str], None] = lambda message: None) -> Dataset:
+    """
+    Заполняет таблицы через соединение asyncpg. Можно вызывать внутри открытой транзакции:
+    так делают тесты планов, которые потом её откатывают.
+    defer_indexes удаляет вторичные индексы на время загрузки и строит их заново в конце —
+    на миллионах строк это быстрее, чем обновлять GIN- и B-tree-индексы на каждую строку.
+    """
+    gen = DataGenerator(volumes, seed, now)
+    dataset = Dataset()
+    if truncate:
+        await conn.execute(f"TRUNCATE {', '.join('adv_uuid.' + t for t in TABLES)} CASCADE")
+    deferred = await _secondary_indexes(conn) if defer_indexes else []
+    for name, _ in deferred:
+        await conn.execute(f'DROP INDEX adv_uuid."{name}"')
+
+    users = Zipf(volumes.users, 0.9, gen.rnd)
+    sellers = Zipf(gen.sellers, 1.0, gen.rnd)
+    categories = Zipf(volumes.categories, 1.1, gen.rnd)
+    adverts = Zipf(volumes.adverts, 0.8, gen.rnd)
+
+    await _copy(conn, "profiles", ("id", "nickname", "fio", "email", "phone_number", "password"),
+                gen.profiles(), dataset, progress)
+    await _copy(conn, "customers", ("profile_id", "rating"), gen.customers(), dataset, progress)
+    await _copy(conn, "sellers", ("profile_id", "rating"), gen.sellers_rows(), dataset, progress)
+    await _copy(conn, "categories", ("id", "name"), gen.categories(), dataset, progress)
+    await _copy(conn, "adverts", ("id", "content", "description", "id_category", "price", "id_seller", "date_created"),
+                gen.adverts(categories, sellers), dataset, progress)
+    await _copy(conn, "likes", ("id_customer", "id_advert", "date_created"),
+                gen.interactions(volumes.likes, users, adverts, 3.0), dataset, progress)
+    await _copy(conn, "deals", ("id_customer", "id_advert", "date_created"),
+                gen.interactions(volumes.deals, users, adverts, 7.0), dataset, progress)
+
+    for name, definition in deferred:
+        started = time.perf_counter()
+        await conn.execute(definition)
+        progress(f"индекс {name} за {time.perf_counter() - started:.1f} с")
+    for table in TABLES:
+        await conn.execute(f"ANALYZE adv_uuid.{table}")
+
+    dataset.hot_user_id = gen.user_id(users.top())
+    dataset.hot_user_email = gen.email(users.top())
+    dataset.hot_category_id = gen.category_id(categories.top())
+    dataset.hot_advert_id = gen.advert_id(adverts.top())
+    dataset.newest_advert_date = gen.now - timedelta(0, gen.advert_age[-1]) if gen.advert_age else None
+    return dataset
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    import asyncpg
+
+    from core.db import DATABASES
+    from core.migrations import asyncpg_dsn
+
+    volumes = Volumes.scaled(args.adverts)
+    overrides = {key: getattr(args, key) for key in ("users", "categories", "likes", "deals", "days")
+                 if getattr(args, key) is not None}
+    volumes = Volumes(**{**asdict(volumes), **overrides})
+
+    conn = await asyncpg.connect(asyncpg_dsn(args.dsn or DATABASES["admin"]))
+    try:
+        started = time.perf_counter()
+        async with conn.transaction():
+            dataset = await generate(conn, volumes, args.seed, defer_indexes=args.defer_indexes,
+                                     truncate=args.truncate, progress=print)
+        return {"volumes": asdict(volumes), "total_s": round(time.perf_counter() - started, 3), **dataset.to_json()}
+    finally:
+        await conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", help="SQLAlchemy URL базы (по умолчанию роль admin)")
+    parser.add_argument("--adverts", type=int, default=100_000,
+                        help="число объявлений; остальные объёмы по умолчанию пропорциональны")
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--categories", type=int)
+    parser.add_argument("--likes", type=int)
+    parser.add_argument("--deals", type=int)
+    parser.add_argument("--days", type=int, help="за сколько дней распределены объявления")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="удалить вторичные индексы на время загрузки и построить заново")
+    parser.add_argument("--truncate", action="store_true", help="очистить таблицы перед загрузкой")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(_main(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
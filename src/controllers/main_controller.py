@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 from fastapi import Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 
 from service_locator import ServiceLocator
 
 from controllers.advert_controller import AdvertController
+from core.pagination import DEFAULT_PAGE_SIZE
+from services.advert_service import AUTOCOMPLETE_LIMIT
+from dto.filter_dto import AdvertFilter
+from services.search_index import SEARCH_BACKEND
 from uuid import UUID
 
 templates = Jinja2Templates(directory="templates")
@@ -17,12 +21,13 @@ class MainController:
         self.locator = locator
         self.advert_controller = AdvertController(locator)
 
-    async def index(self, request: Request) -> HTMLResponse:
+    async def index(self, request: Request, cursor: str | None = None,
+                    page_size: int = DEFAULT_PAGE_SIZE) -> HTMLResponse:
         user_id = request.state.user["id"] if request.state.user else None
         categories = await self.locator.category_service().get_all()
 
-        adverts = await self.locator.advert_service().get_all_adverts()
-        adverts_dto = await self.advert_controller.get_adverts_with_dto(adverts, user_id)
+        page = await self.locator.advert_service().get_adverts_page(cursor, page_size)
+        adverts_dto = await self.advert_controller.get_adverts_with_dto(page.items, user_id)
 
         return templates.TemplateResponse(
             "index.html",
@@ -31,16 +36,18 @@ class MainController:
                 "user": request.state.user,
                 "user_id": user_id,
                 "adverts": adverts_dto,
-                "categories": categories
+                "categories": categories,
+                "next_cursor": page.next_cursor,
             },
         )
 
-    async def adverts_by_category(self, request: Request, category_id: UUID) -> HTMLResponse:
+    async def adverts_by_category(self, request: Request, category_id: UUID, cursor: str | None = None,
+                                  page_size: int = DEFAULT_PAGE_SIZE) -> HTMLResponse:
         user_id = request.state.user["id"] if request.state.user else None
         categories = await self.locator.category_service().get_all()
 
-        adverts = await self.locator.advert_service().get_adverts_by_category(category_id)
-        adverts_dto = await self.advert_controller.get_adverts_with_dto(adverts, user_id)
+        page = await self.locator.advert_service().get_adverts_by_category_page(category_id, cursor, page_size)
+        adverts_dto = await self.advert_controller.get_adverts_with_dto(page.items, user_id)
 
         return templates.TemplateResponse(
             "index.html",
@@ -49,26 +56,61 @@ class MainController:
                 "user": request.state.user,
                 "user_id": user_id,
                 "adverts": adverts_dto,
-                "categories": categories
+                "categories": categories,
+                "next_cursor": page.next_cursor,
             },
         )
 
-    async def search_adverts(self, request: Request, query: str) -> HTMLResponse:
-        adverts = await self.locator.advert_service().get_adverts_by_key_word(query)
+    async def search_adverts(self, request: Request, query: str, cursor: str | None = None,
+                             page_size: int = DEFAULT_PAGE_SIZE, mode: str | None = None,
+                             backend: str | None = None) -> HTMLResponse:
+        user_id = request.state.user["id"] if request.state.user else None
+        page = await self.locator.advert_service().search_adverts_page(
+            query, mode, cursor, page_size, backend or SEARCH_BACKEND
+        )
         categories = await self.locator.category_service().get_all()
 
-        adverts_dto = await self.advert_controller.get_adverts_with_dto(adverts)
+        adverts_dto = await self.advert_controller.get_adverts_with_dto(page.items, user_id)
 
         return templates.TemplateResponse(
             "index.html",
             {
                 "request": request,
                 "user": request.state.user,
+                "user_id": user_id,
                 "adverts": adverts_dto,
-                "categories": categories
+                "categories": categories,
+                "next_cursor": page.next_cursor,
+                "query": query,
+                "suggestions": page.suggestions,
             }
         )
 
+    async def filter_adverts(self, request: Request, flt: AdvertFilter, cursor: str | None = None,
+                             page_size: int = DEFAULT_PAGE_SIZE) -> HTMLResponse:
+        user_id = request.state.user["id"] if request.state.user else None
+        categories = await self.locator.category_service().get_all()
+
+        result = await self.locator.advert_service().filter_adverts(flt, cursor, page_size)
+        adverts_dto = await self.advert_controller.get_adverts_with_dto(result.items, user_id)
+
+        return templates.TemplateResponse(
+            "index.html",
+            {
+                "request": request,
+                "user": request.state.user,
+                "user_id": user_id,
+                "adverts": adverts_dto,
+                "categories": categories,
+                "next_cursor": result.next_cursor,
+                "facets": result,
+            },
+        )
+
+    async def search_suggestions(self, query: str, limit: int = AUTOCOMPLETE_LIMIT) -> JSONResponse:
+        suggestions = await self.locator.advert_service().autocomplete(query, limit)
+        return JSONResponse({"query": query, "suggestions": suggestions})
+
     async def profile_page(self, request: Request) -> HTMLResponse | RedirectResponse:
         if not request.state.user:
             return RedirectResponse(url="/login", status_code=303)
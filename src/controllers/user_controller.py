@@ -65,6 +65,9 @@ class UserController:
             )
 
     async def logout(self, request: Request) -> RedirectResponse:
+        token = request.cookies.get("access_token")
+        if token:
+            await self.locator.auth_service().logout(token)
         response = RedirectResponse(url="/", status_code=303)
         response.delete_cookie("access_token")
         return response
\ No newline at end of file
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LruCache(Generic[K, V]):
+    """
+    LRU-кэш с ограничением по суммарному размеру значений в байтах и временем жизни записей.
+    Размер значения считает sizeof: точный подсчёт памяти Python дорог, поэтому
+    вызывающая сторона передаёт свою оценку. Не потокобезопасен: рассчитан на один event loop.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, sizeof: Callable[[V], int] = sys.getsizeof,
+                 max_entries: Optional[int] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._sizeof = sizeof
+        self._clock = clock
+        # ключ -> (значение, момент истечения, размер); порядок — от давно не использованных к свежим
+        self._data: OrderedDict[K, Tuple[V, float, int]] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+        value, expires_at, _ = item
+        if expires_at <= self._clock():
+            self._drop(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: K, value: V, ttl: Optional[float] = None) -> bool:
+        """
+        Кладёт значение; ttl переопределяет время жизни по умолчанию для этой записи.
+        Значение больше всего кэша не сохраняется, и put возвращает False.
+        """
+        size = self._sizeof(value)
+        self.pop(key)
+        lifetime = self.ttl if ttl is None else ttl
+        if size > self.max_bytes or lifetime <= 0:
+            return False
+
+        self._data[key] = (value, self._clock() + lifetime, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes or (self.max_entries is not None and len(self._data) > self.max_entries):
+            oldest = next(iter(self._data))
+            self._drop(oldest)
+            self.evictions += 1
+        return True
+
+    def pop(self, key: K) -> Optional[V]:
+        if key not in self._data:
+            return None
+        value = self._data[key][0]
+        self._drop(key)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    def _drop(self, key: K) -> None:
+        _, _, size = self._data.pop(key)
+        self.bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+MIGRATIONS_TABLE = "adv_uuid.schema_migrations"
+# Директива в начале файла: выполнять выражения по одному вне транзакции (нужно для CREATE INDEX CONCURRENTLY)
+NO_TRANSACTION = "-- migrate: no-transaction"
+# Ключ pg_advisory_lock: два одновременных запуска не применят одну миграцию дважды
+_LOCK_KEY = 0x6D696772
+
+_FILE_RE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+_DOLLAR_RE = re.compile(r"\$(?:[A-Za-z_]\w*)?\$")
+_CONCURRENT_INDEX_RE = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    name: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode()).hexdigest()
+
+    @property
+    def transactional(self) -> bool:
+        return NO_TRANSACTION not in self.sql.splitlines()[:5]
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """
+    Файлы NNNN_name.sql из каталога миграций в порядке номеров.
+    """
+    migrations: Dict[str, Migration] = {}
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILE_RE.match(path.name)
+        if match is None:
+            raise ValueError(f"Имя миграции не в формате NNNN_name.sql: {path.name}")
+        version, name = match.groups()
+        if version in migrations:
+            raise ValueError(f"Две миграции с номером {version}: {migrations[version].name} и {name}")
+        migrations[version] = Migration(version, name, path.read_text(encoding="utf-8"))
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Делит скрипт на отдельные выражения по ';' вне строк, идентификаторов в кавычках,
+    $$-блоков и комментариев. Выражения из одних комментариев отбрасываются.
+    """
+    statements: List[str] = []
+    start, i, n = 0, 0, len(sql)
+    while i < n:
+        ch = sql[i]
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = n if end < 0 else end + 1
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif ch in ("'", '"'):
+            # Удвоенная кавычка внутри — экранированная, цикл просто продолжит строку
+            end = sql.find(ch, i + 1)
+            i = n if end < 0 else end + 1
+        elif ch == "$" and (match := _DOLLAR_RE.match(sql, i)):
+            end = sql.find(match.group(), match.end())
+            i = n if end < 0 else end + len(match.group())
+        elif ch == ";":
+            statements.append(sql[start:i])
+            i += 1
+            start = i
+        else:
+            i += 1
+    statements.append(sql[start:])
+    return [s.strip() for s in statements if _strip_comments(s).strip()]
+
+
+def _strip_comments(sql: str) -> str:
+    return re.sub(r"--[^\n]*|/\*.*?\*/", "", sql, flags=re.DOTALL)
+
+
+def asyncpg_dsn(url: str) -> str:
+    """
+    DSN из конфига SQLAlchemy (postgresql+asyncpg://...) в виде, понятном asyncpg.connect.
+    """
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class MigrationRunner:
+    """
+    Применяет миграции через соединение asyncpg и записывает их в adv_uuid.schema_migrations.
+    Обычный файл выполняется целиком в одной транзакции. Файл с директивой no-transaction
+    выполняется по одному выражению в autocommit; если предыдущий запуск оборвался на
+    CREATE INDEX CONCURRENTLY, оставшийся невалидный индекс удаляется и строится заново.
+    """
+
+    def __init__(self, conn: Any) -> None:
+        self.conn = conn
+
+    async def ensure_table(self) -> None:
+        await self.conn.execute(f"""
+            CREATE SCHEMA IF NOT EXISTS adv_uuid;
+            CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+                version    text PRIMARY KEY,
+                name       text NOT NULL,
+                checksum   text NOT NULL,
+                applied_at timestamptz NOT NULL DEFAULT now()
+            )
+        """)
+
+    async def applied(self) -> Dict[str, str]:
+        rows = await self.conn.fetch(f"SELECT version, checksum FROM {MIGRATIONS_TABLE}")
+        return {row["version"]: row["checksum"] for row in rows}
+
+    async def status(self, migrations: Iterable[Migration]) -> List[Tuple[Migration, str]]:
+        """
+        Состояние каждой миграции: applied, pending или changed (файл изменён после применения).
+        """
+        await self.ensure_table()
+        applied = await self.applied()
+        result = []
+        for migration in migrations:
+            checksum = applied.get(migration.version)
+            if checksum is None:
+                result.append((migration, "pending"))
+            elif checksum != migration.checksum:
+                result.append((migration, "changed"))
+            else:
+                result.append((migration, "applied"))
+        return result
+
+    async def upgrade(self, migrations: Iterable[Migration], target: Optional[str] = None) -> List[Migration]:
+        """
+        Применяет ещё не применённые миграции до target включительно. Возвращает применённые.
+        """
+        await self.ensure_table()
+        await self.conn.execute("SELECT pg_advisory_lock($1)", _LOCK_KEY)
+        try:
+            done: List[Migration] = []
+            for migration, state in await self.status(migrations):
+                if target is not None and migration.version > target:
+                    break
+                if state == "changed":
+                    raise RuntimeError(f"Миграция {migration.version}_{migration.name} изменена после применения")
+                if state == "pending":
+                    await self._apply(migration)
+                    done.append(migration)
+            return done
+        finally:
+            await self.conn.execute("SELECT pg_advisory_unlock($1)", _LOCK_KEY)
+
+    async def _apply(self, migration: Migration) -> None:
+        if migration.transactional:
+            async with self.conn.transaction():
+                await self.conn.execute(migration.sql)
+                await self._record(migration)
+            return
+
+        for statement in split_statements(migration.sql):
+            await self._drop_invalid_index(statement)
+            await self.conn.execute(statement)
+        await self._record(migration)
+
+    async def _record(self, migration: Migration) -> None:
+        await self.conn.execute(
+            f"INSERT INTO {MIGRATIONS_TABLE} (version, name, checksum) VALUES ($1, $2, $3)",
+            migration.version, migration.name, migration.checksum,
+        )
+
+    async def _drop_invalid_index(self, statement: str) -> None:
+        match = _CONCURRENT_INDEX_RE.search(statement)
+        if match is None:
+            return
+        row = await self.conn.fetchrow(
+            """
+            SELECT n.nspname FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relname = $1 AND NOT i.indisvalid
+            """,
+            match.group(1),
+        )
+        if row is not None:
+            await self.conn.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{row["nspname"]}"."{match.group(1)}"')
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    ok: bool
+    seq_scans: List[str]
+    note: str = ""
+
+
+def find_seq_scans(plan: Dict[str, Any]) -> List[str]:
+    """
+    Таблицы, которые план читает последовательным сканированием (обход дерева EXPLAIN FORMAT JSON).
+    """
+    found: List[str] = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if node.get("Node Type") == "Seq Scan":
+            found.append(node.get("Relation Name", "?"))
+        stack.extend(node.get("Plans", ()))
+    return sorted(found)
+
+
+async def verify_plans(engine: AsyncEngine, catalog: Iterable[Any]) -> List[PlanCheck]:
+    """
+    EXPLAIN каждого запроса каталога с enable_seqscan = off: планировщик выбирает
+    Seq Scan только когда подходящего индекса нет, так что проверка не зависит от объёма данных.
+    Запросы full_read могут читать таблицу целиком; тело opaque-запросов скрыто в функции.
+    """
+    checks: List[PlanCheck] = []
+    async with engine.connect() as conn:
+        await conn.execute(text("SET enable_seqscan = off"))
+        for query in catalog:
+            if query.opaque:
+                checks.append(PlanCheck(query.name, True, [], "план скрыт в функции PostgreSQL"))
+                continue
+            result = await conn.execute(text("EXPLAIN (FORMAT JSON) " + query.sql.text), query.params)
+            raw = result.scalar_one()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            seq_scans = find_seq_scans(plan)
+            note = "полное чтение ожидаемо" if seq_scans and query.full_read else ""
+            checks.append(PlanCheck(query.name, not seq_scans or query.full_read, seq_scans, note))
+        await conn.rollback()
+    return checks
@@ -0,0 +1,90 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+DEFAULT_PAGE_SIZE = 30
+MAX_PAGE_SIZE = 100
+
+# Ключ keyset-пагинации: (date_created, id) последнего объявления на странице
+Keyset = Tuple[datetime, UUID]
+# Ключ для выдачи, отсортированной по релевантности: (rank, id) последнего объявления
+RankKeyset = Tuple[float, UUID]
+
+
+def clamp_page_size(page_size: int | None) -> int:
+    if not page_size or page_size < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(page_size, MAX_PAGE_SIZE)
+
+
+def encode_cursor(date_created: datetime, advert_id: UUID) -> str:
+    """
+    Упаковывает позицию в ленте в непрозрачную строку для ссылки "следующая страница".
+    """
+    return _pack(f"{date_created.isoformat()}|{advert_id}")
+
+
+def decode_cursor(cursor: str | None) -> Optional[Keyset]:
+    """
+    Обратное преобразование курсора. Испорченный курсор трактуется как первая страница.
+    """
+    raw = _unpack(cursor)
+    if raw is None:
+        return None
+    try:
+        date_part, id_part = raw.split("|", 1)
+        return datetime.fromisoformat(date_part), UUID(id_part)
+    except ValueError:
+        return None
+
+
+def encode_rank_cursor(rank: float, advert_id: UUID) -> str:
+    """
+    Курсор для выдачи по релевантности. repr сохраняет rank без потери точности,
+    иначе граница страницы сместится и строки повторятся.
+    """
+    return _pack(f"r{rank!r}|{advert_id}")
+
+
+def decode_rank_cursor(cursor: str | None) -> Optional[RankKeyset]:
+    raw = _unpack(cursor)
+    if raw is None or not raw.startswith("r"):
+        return None
+    try:
+        rank_part, id_part = raw[1:].split("|", 1)
+        return float(rank_part), UUID(id_part)
+    except ValueError:
+        return None
+
+
+def encode_price_cursor(price: int, advert_id: UUID) -> str:
+    """
+    Курсор для выдачи, отсортированной по цене.
+    """
+    return _pack(f"p{price}|{advert_id}")
+
+
+def decode_price_cursor(cursor: str | None) -> Optional[Tuple[int, UUID]]:
+    raw = _unpack(cursor)
+    if raw is None or not raw.startswith("p"):
+        return None
+    try:
+        price_part, id_part = raw[1:].split("|", 1)
+        return int(price_part), UUID(id_part)
+    except ValueError:
+        return None
+
+
+def _pack(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _unpack(cursor: str | None) -> Optional[str]:
+    if not cursor:
+        return None
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List
+
+
+@dataclass
+class PlanSummary:
+    """
+    Выжимка из EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON), которую имеет смысл хранить как базовую линию.
+    shape — узлы плана в прямом порядке обхода, с таблицей и индексом;
+    scans — отсортированные узлы чтения таблиц и индексов из shape.
+    """
+    shape: List[str]
+    scans: List[str]
+    rows: int
+    cost: float
+    buffers: int
+
+    def to_json(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "PlanSummary":
+        return cls(**data)
+
+
+@dataclass(frozen=True)
+class PlanTolerance:
+    """
+    Допустимый рост относительно базовой линии. Абсолютный запас нужен для маленьких чисел:
+    рост с 2 до 9 блоков — шум, а не регрессия.
+    """
+    cost_factor: float = 3.0
+    buffers_factor: float = 3.0
+    buffers_slack: int = 64
+    rows_factor: float = 10.0
+    rows_slack: int = 100
+
+
+def _describe(node: Dict[str, Any]) -> str:
+    parts = [node["Node Type"]]
+    if "Relation Name" in node:
+        parts.append(f"on {node['Relation Name']}")
+    if "Index Name" in node:
+        parts.append(f"using {node['Index Name']}")
+    return " ".join(parts)
+
+
+def _shape(node: Dict[str, Any]) -> List[str]:
+    shape = [_describe(node)]
+    for child in node.get("Plans", ()):
+        shape.extend(_shape(child))
+    return shape
+
+
+def _scans(node: Dict[str, Any]) -> List[str]:
+    # Seq Scan, Index Scan, Index Only Scan, Bitmap Index Scan, Bitmap Heap Scan и т.п.
+    scans = [_describe(node)] if node["Node Type"].endswith("Scan") else []
+    for child in node.get("Plans", ()):
+        scans.extend(_scans(child))
+    return scans
+
+
+def summarize_plan(explain: List[Dict[str, Any]]) -> PlanSummary:
+    """
+    Выжимка из результата EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON). Счётчики корневого узла
+    уже включают потомков.
+    """
+    root = explain[0]["Plan"]
+    return PlanSummary(
+        shape=_shape(root),
+        scans=sorted(_scans(root)),
+        rows=int(root.get("Actual Rows", 0) * root.get("Actual Loops", 1)),
+        cost=float(root["Total Cost"]),
+        buffers=int(root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)),
+    )
+
+
+def _grew(before: float, after: float, factor: float, slack: float = 0.0) -> bool:
+    return after > before * factor + slack
+
+
+def compare_plans(baseline: PlanSummary, current: PlanSummary,
+                  tolerance: PlanTolerance = PlanTolerance()) -> List[str]:
+    """
+    Регрессии текущего плана относительно базовой линии; пустой список — всё в порядке.
+    Узлы чтения (какая таблица каким способом и по какому индексу) должны совпадать
+    с базовой линией; остальная форма плана — порядок соединений, сортировки, агрегаты —
+    может меняться. Кроме того, ошибка — скачок строк, стоимости или буферов.
+    """
+    problems: List[str] = []
+    gone = sorted((Counter(baseline.scans) - Counter(current.scans)).elements())
+    new = sorted((Counter(current.scans) - Counter(baseline.scans)).elements())
+    if gone or new:
+        problems.append(f"чтение: {', '.join(gone) or '-'} -> {', '.join(new) or '-'}")
+    if _grew(baseline.rows, current.rows, tolerance.rows_factor, tolerance.rows_slack):
+        problems.append(f"строк: {baseline.rows} -> {current.rows}")
+    if _grew(baseline.cost, current.cost, tolerance.cost_factor):
+        problems.append(f"стоимость: {baseline.cost:.2f} -> {current.cost:.2f}")
+    if _grew(baseline.buffers, current.buffers, tolerance.buffers_factor, tolerance.buffers_slack):
+        problems.append(f"буферов: {baseline.buffers} -> {current.buffers}")
+    return problems
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Число шардов состояния (округляется вверх до степени двойки)
+RATE_LIMIT_SHARDS = int(os.getenv("RATE_LIMIT_SHARDS", "16"))
+# Через сколько проверок (не меньше) очищается очередной шард от полностью восстановившихся корзин
+RATE_LIMIT_SWEEP_EVERY = int(os.getenv("RATE_LIMIT_SWEEP_EVERY", "256"))
+
+_UNITS = {"s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+@dataclass(frozen=True)
+class Limit:
+    """
+    Корзина токенов: burst запросов подряд, дальше — rate запросов в секунду.
+    """
+    burst: float
+    rate: float
+    # Интервал между запросами при равномерном темпе и допустимое опережение графика, с
+    interval: float = field(init=False, repr=False)
+    tolerance: float = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "interval", 1.0 / self.rate)
+        object.__setattr__(self, "tolerance", self.burst / self.rate)
+
+    @classmethod
+    def parse(cls, spec: str) -> Optional[Limit]:
+        """
+        "10/m" — 10 запросов в минуту, "5/10s" — 5 за 10 секунд, "30/3600" — 30 в час.
+        Пустая строка или "0" — ограничения нет.
+        """
+        spec = spec.strip()
+        if spec in ("", "0"):
+            return None
+        count, sep, period = spec.partition("/")
+        if not sep:
+            raise ValueError(f"Bad rate limit {spec!r}: expected <count>/<period>")
+        unit = _UNITS.get(period[-1:], 1.0)
+        number = period[:-1] if period[-1:] in _UNITS else period
+        seconds = float(number or 1) * unit
+        burst = float(count)
+        if burst <= 0 or seconds <= 0:
+            raise ValueError(f"Bad rate limit {spec!r}")
+        return cls(burst=burst, rate=burst / seconds)
+
+
+@dataclass(frozen=True)
+class RateRule:
+    name: str
+    method: str
+    # Путь маршрута; окончание на "/" — префикс (/like/ подходит для /like/{id})
+    path: str
+    per_ip: Optional[Limit]
+    per_user: Optional[Limit]
+
+    @property
+    def prefix(self) -> bool:
+        return self.path.endswith("/")
+
+
+def _rule(name: str, method: str, path: str, per_ip: str, per_user: str) -> RateRule:
+    env = f"RATE_LIMIT_{name.upper()}"
+    return RateRule(
+        name, method, path,
+        per_ip=Limit.parse(os.getenv(f"{env}_IP", per_ip)),
+        per_user=Limit.parse(os.getenv(f"{env}_USER", per_user)),
+    )
+
+
+# Маршруты, каждый вызов которых идёт в БД: вход и регистрация ищут пользователя по email,
+# лайк и сделка пишут. Пользователь при входе и регистрации ещё не известен — только лимит по IP
+RATE_RULES: Tuple[RateRule, ...] = (
+    _rule("login", "POST", "/login", "10/m", ""),
+    _rule("register", "POST", "/register", "5/m", ""),
+    _rule("like", "POST", "/like/", "120/m", "60/m"),
+    _rule("deal_create", "POST", "/deal_create/", "60/m", "20/m"),
+)
+
+
+class RateLimiter:
+    """
+    Корзины токенов в памяти процесса, по IP клиента и по пользователю, отдельно для каждого маршрута.
+
+    Корзина хранится одним числом — моментом, когда она снова будет полной (GCRA): запрос
+    сдвигает его на 1/rate вперёд и разрешён, пока сдвиг не ушёл дальше burst/rate от текущего
+    времени. Это та же корзина токенов, но без изменяемого объекта на ключ: миллионы записей
+    не нагружают сборщик мусора, а корзина с моментом в прошлом полна, и её можно удалить.
+    Состояние разбито на шарды по хэшу ключа: раз в sweep_every (или больше) проверок очищается
+    один шард от корзин, которые уже восстановились полностью (такая корзина неотличима от новой),
+    поэтому уборка идёт маленькими порциями и не останавливает цикл событий на обходе всех ключей.
+    Проверки выполняются в цикле событий одного воркера, блокировки не нужны; у каждого
+    воркера uvicorn свои корзины, и общий предел для N воркеров — до N раз выше заданного.
+    """
+
+    def __init__(self, rules: Tuple[RateRule, ...] = RATE_RULES, shards: int = RATE_LIMIT_SHARDS,
+                 sweep_every: int = RATE_LIMIT_SWEEP_EVERY, clock: Callable[[], float] = time.monotonic) -> None:
+        self._exact: Dict[Tuple[str, str], RateRule] = {(r.method, r.path): r for r in rules if not r.prefix}
+        self._prefixes: Tuple[RateRule, ...] = tuple(r for r in rules if r.prefix)
+        size = 1 << max(shards - 1, 0).bit_length()
+        self._shards: List[Dict[Hashable, float]] = [{} for _ in range(size)]
+        self._mask = size - 1
+        self._sweep_every = max(sweep_every, 1)
+        self._until_sweep = self._sweep_every
+        self._next_shard = 0
+        self._clock = clock
+        self.allowed = 0
+        self.limited = 0
+        self.reclaimed = 0
+
+    def match(self, method: str, path: str) -> Optional[RateRule]:
+        rule = self._exact.get((method, path))
+        if rule is not None:
+            return rule
+        for rule in self._prefixes:
+            if rule.method == method and path.startswith(rule.path):
+                return rule
+        return None
+
+    def _peek(self, key: Hashable, limit: Limit, now: float) -> Tuple[float, float]:
+        """
+        Проверяет корзину key, не меняя её: (0 или через сколько секунд появится токен,
+        момент полной корзины после запроса — его записывает check, если разрешены все корзины).
+        """
+        tat = self._shards[hash(key) & self._mask].get(key, now)
+        if tat < now:
+            tat = now
+        tat += limit.interval
+        wait = tat - limit.tolerance - now
+        return (wait if wait > 1e-9 else 0.0), tat
+
+    def check(self, rule: RateRule, ip: Optional[str], user_id: Optional[str]) -> float:
+        """
+        0 — запрос разрешён; иначе число секунд до следующей попытки (для Retry-After).
+        Токен списывается только когда разрешают обе корзины, пользователя и IP: отказ по одной
+        не тратит токен другой.
+        """
+        now = self._clock()
+        user_key = ip_key = None
+        user_wait = ip_wait = user_tat = ip_tat = 0.0
+        if rule.per_user is not None and user_id is not None:
+            user_key = (rule.name, "user", user_id)
+            user_wait, user_tat = self._peek(user_key, rule.per_user, now)
+        if rule.per_ip is not None and ip is not None:
+            ip_key = (rule.name, "ip", ip)
+            ip_wait, ip_tat = self._peek(ip_key, rule.per_ip, now)
+        wait = max(user_wait, ip_wait)
+        if wait:
+            self.limited += 1
+        else:
+            self.allowed += 1
+            if user_key is not None:
+                self._shards[hash(user_key) & self._mask][user_key] = user_tat
+            if ip_key is not None:
+                self._shards[hash(ip_key) & self._mask][ip_key] = ip_tat
+        self._until_sweep -= 1
+        if not self._until_sweep:
+            # Следующая уборка — не раньше, чем через столько проверок, сколько корзин просмотрено:
+            # в среднем проверка платит за просмотр не больше одной корзины при любом числе клиентов
+            self._until_sweep = max(self._sweep(self._next_shard, now), self._sweep_every)
+            self._next_shard = (self._next_shard + 1) & self._mask
+        return wait
+
+    def _sweep(self, index: int, now: float) -> int:
+        shard = self._shards[index]
+        expired = [key for key, tat in shard.items() if tat <= now]
+        for key in expired:
+            del shard[key]
+        self.reclaimed += len(expired)
+        return len(shard) + len(expired)
+
+    def purge(self) -> None:
+        now = self._clock()
+        for index in range(len(self._shards)):
+            self._sweep(index, now)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buckets": len(self),
+            "shards": len(self._shards),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "reclaimed": self.reclaimed,
+        }
+
+
+class RateLimitMiddleware:
+    """
+    Отвечает 429 на запросы сверх лимита до маршрутизации: обработчик не вызывается,
+    и сессия БД не берётся из пула. Пользователь берётся из scope["state"]["user"],
+    поэтому middleware должно стоять внутри UserMiddleware.
+
+    IP — scope["client"]; за обратным прокси uvicorn подставляет туда адрес из
+    X-Forwarded-For (--proxy-headers, --forwarded-allow-ips).
+    """
+
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None) -> None:
+        self.app = app
+        self.limiter = limiter if limiter is not None else rate_limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            rule = self.limiter.match(scope["method"], scope["path"])
+            if rule is not None:
+                client = scope.get("client")
+                user = scope.get("state", {}).get("user")
+                wait = self.limiter.check(rule, client[0] if client else None, user and user.get("id"))
+                if wait:
+                    await _too_many_requests(send, wait)
+                    return
+        await self.app(scope, receive, send)
+
+
+async def _too_many_requests(send: Send, wait: float) -> None:
+    body = "Слишком много запросов. Попробуйте позже.".encode()
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(math.ceil(wait), 1)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+rate_limiter = RateLimiter()
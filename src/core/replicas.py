@@ -0,0 +1,133 @@
+import hashlib
+import hmac
+import itertools
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+# Отставание реплики в секундах; если всё полученное WAL уже применено, реплика догнала мастер
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaSet:
+    """
+    Реплики одной роли: выдаёт их по кругу, пропуская отстающие больше max_lag и недоступные.
+    """
+
+    def __init__(self, engines: List[AsyncEngine], max_lag: float):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.lag: List[float] = [0.0] * len(engines)
+        self._counter = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def available(self) -> List[AsyncEngine]:
+        return [engine for engine, lag in zip(self.engines, self.lag) if lag <= self.max_lag]
+
+    def choose(self) -> Optional[AsyncEngine]:
+        available = self.available()
+        if not available:
+            return None
+        return available[next(self._counter) % len(available)]
+
+    async def refresh_lag(self) -> None:
+        for index, engine in enumerate(self.engines):
+            try:
+                async with engine.connect() as conn:
+                    lag = (await conn.execute(REPLICA_LAG_SQL)).scalar()
+                self.lag[index] = float(lag or 0.0)
+            except (SQLAlchemyError, OSError):
+                self.lag[index] = math.inf
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "host": engine.url.host,
+                "port": engine.url.port,
+                "lag": None if math.isinf(lag) else round(lag, 3),
+                "available": lag <= self.max_lag,
+            }
+            for engine, lag in zip(self.engines, self.lag)
+        ]
+
+
+class ReadYourWrites:
+    """
+    Окно "читай свои записи": после записи чтения пользователя window секунд идут на мастер,
+    чтобы он сразу видел свой лайк, сделку или новое объявление.
+
+    Окно хранится у клиента в подписанной cookie READ_PRIMARY_COOKIE ("<until>.<подпись>"),
+    а не в памяти процесса: редирект после записи может попасть в другой воркер uvicorn
+    или на другой хост, и там чтение тоже пойдёт на мастер. Подпись HMAC привязывает cookie
+    к пользователю и сроку, так что чужую или продлённую cookie сервер не примет.
+    """
+
+    COOKIE = "read_primary_until"
+
+    def __init__(self, window: float, secret: str, clock: Callable[[], float] = time.time):
+        self.window = window
+        self._secret = secret.encode()
+        self._clock = clock
+
+    def _sign(self, user_id: Any, until: int) -> str:
+        return hmac.new(self._secret, f"{user_id}:{until}".encode(), hashlib.sha256).hexdigest()[:32]
+
+    def issue(self, user_id: Any) -> str:
+        """
+        Значение cookie для пользователя, только что записавшего в БД.
+        """
+        until = math.ceil(self._clock() + self.window)
+        return f"{until}.{self._sign(user_id, until)}"
+
+    def set_cookie(self, user_id: Any) -> str:
+        """
+        Значение заголовка Set-Cookie с окном для пользователя.
+        """
+        max_age = math.ceil(self.window)
+        return f"{self.COOKIE}={self.issue(user_id)}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+
+    def is_recent(self, user_id: Any, cookie: Optional[str]) -> bool:
+        if not cookie or user_id is None:
+            return False
+        until_text, _, signature = cookie.partition(".")
+        try:
+            until = int(until_text)
+        except ValueError:
+            return False
+        now = self._clock()
+        if not now < until <= now + self.window + 1:
+            return False
+        return hmac.compare_digest(signature, self._sign(user_id, until))
+
+
+class RoutingSession(Session):
+    """
+    Сессия, отправляющая помеченные чтения (bind_arguments={"replica": True}) на реплику.
+    Всё остальное, а также любые чтения после первого обращения к мастеру, идут на мастер.
+    Реплика выбирается один раз на сессию: чтения одного запроса видят один и тот же снимок,
+    а не прыгают между репликами с разным отставанием.
+    """
+
+    def get_bind(self, mapper: Any = None, *, clause: Any = None, replica: bool = False, **kw: Any) -> Any:
+        if replica and not self.info.get("read_primary") and not self.info.get("used_primary"):
+            engine = self.info.get("replica")
+            if engine is None:
+                replicas: Optional[ReplicaSet] = self.info.get("replicas")
+                engine = replicas.choose() if replicas else None
+                self.info["replica"] = engine
+            if engine is not None:
+                return engine.sync_engine
+        self.info["used_primary"] = True
+        return super().get_bind(mapper, clause=clause, **kw)
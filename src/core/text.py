@@ -0,0 +1,9 @@
+import unicodedata
+
+
+def normalize_query(query: str) -> str:
+    """
+    Каноническая форма поискового запроса: NFKC, без учёта регистра, пробелы схлопнуты.
+    "  iPhone   12 " и "iphone 12" ищутся и кэшируются как один запрос.
+    """
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import jwt
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ACCESS_TOKEN_COOKIE = "access_token"
+# Маршруты, которым пользователь не нужен: метрики и JSON-подсказки отвечают одинаково всем
+SKIP_USER_PATHS: Tuple[str, ...] = ("/metrics", "/search/suggest", "/favicon.ico")
+# Префиксы статики и служебных маршрутов, для которых пользователь тоже не определяется
+SKIP_USER_PREFIXES: Tuple[str, ...] = ("/static/",)
+
+
+def cookie_value(headers: Iterable[Tuple[bytes, bytes]], name: str) -> Optional[str]:
+    """
+    Значение одной cookie из заголовков ASGI. Разбирается только заголовок Cookie,
+    и только до нужной пары: остальные cookie не декодируются.
+    """
+    prefix = name.encode("latin-1")
+    for key, value in headers:
+        if key != b"cookie" or prefix not in value:
+            continue
+        for chunk in value.split(b";"):
+            key_part, sep, val = chunk.partition(b"=")
+            if sep and key_part.strip() == prefix:
+                return val.strip().strip(b'"').decode("latin-1") or None
+    return None
+
+
+class UserMiddleware:
+    """
+    Определяет текущего пользователя по cookie access_token и кладёт его в request.state.user
+    (scope["state"]["user"]): словарь id/email/role или None.
+
+    Чистое ASGI-middleware: в отличие от @app.middleware("http") (BaseHTTPMiddleware), не запускает
+    отдельную задачу на запрос и не перекладывает тело ответа через поток памяти, поэтому
+    потоковые ответы идут клиенту напрямую. Для маршрутов из skip_paths токен не проверяется;
+    без заголовка Cookie разбор не выполняется вовсе. Ответ авторизованному пользователю дополняется
+    cookie окна чтения с мастера, если маршрут записал в БД (state["read_primary_cookie"]).
+    """
+
+    def __init__(self, app: ASGIApp, skip_paths: Iterable[str] = SKIP_USER_PATHS,
+                 skip_prefixes: Iterable[str] = SKIP_USER_PREFIXES) -> None:
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+        self.skip_prefixes = tuple(skip_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # Словарь state общий с Request.state; uvicorn создаёт его копию на каждый запрос
+        state = scope.setdefault("state", {})
+        state["user"] = None
+        path = scope["path"]
+        if path not in self.skip_paths and not path.startswith(self.skip_prefixes):
+            token = cookie_value(scope["headers"], ACCESS_TOKEN_COOKIE)
+            if token:
+                state["user"] = self.resolve(scope, token)
+        if state["user"] is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookies(message: Message) -> None:
+            # Окно чтения с мастера после записи (get_locator) уходит клиенту вместе с ответом
+            if message["type"] == "http.response.start" and state.get("read_primary_cookie"):
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", state["read_primary_cookie"].encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookies)
+
+    @staticmethod
+    def resolve(scope: Scope, token: str) -> Optional[Dict[str, Any]]:
+        try:
+            # Проверка через AuthService: отозванные токены отклоняются, подпись проверяется один раз за жизнь токена
+            payload = scope["app"].state.locator.auth_service().verify_token(token)
+        except (jwt.PyJWTError, ValueError):
+            # Невалидный, просроченный или отозванный токен — анонимный запрос. Сбой хранилища
+            # отзывов или локатора не прячется за анонимным запросом: он виден как ошибка 500 и в логах
+            return None
+        return {
+            "id": payload.get("id"),
+            "email": payload.get("sub"),
+            "role": payload.get("role"),
+        }
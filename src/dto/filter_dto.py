@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import List, Literal, Optional, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from models.advert import Advert
+
+AdvertSort = Literal["newest", "oldest", "price_asc", "price_desc"]
+
+# Границы корзин цен для фасета: [0, 1000), [1000, 5000), ..., [100000, ∞)
+PRICE_BUCKETS: Tuple[int, ...] = (0, 1000, 5000, 10000, 50000, 100000)
+
+
+class AdvertFilter(BaseModel):
+    """
+    Любое сочетание условий отбора объявлений; пустые поля не участвуют в запросе.
+    """
+    keyword: Optional[str] = None
+    category_id: Optional[UUID] = None
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    sort: AdvertSort = "newest"
+
+
+class CategoryFacet(BaseModel):
+    id_category: UUID
+    count: int
+
+
+class PriceFacet(BaseModel):
+    min_price: int
+    max_price: Optional[int] = None
+    count: int
+
+    @classmethod
+    def from_bucket(cls, bucket: int, count: int) -> "PriceFacet":
+        """
+        Номер корзины от width_bucket (1..len(PRICE_BUCKETS)) в границы цен; верхняя граница не включается.
+        """
+        upper = PRICE_BUCKETS[bucket] if bucket < len(PRICE_BUCKETS) else None
+        return cls(min_price=PRICE_BUCKETS[bucket - 1], max_price=upper, count=count)
+
+
+class FilterResult(BaseModel):
+    """
+    Страница отфильтрованных объявлений и счётчики для фасетов.
+    Счётчики по категориям учитывают все условия, кроме категории, по ценам — все, кроме цены:
+    так видно, сколько объявлений будет, если поменять только это условие.
+    """
+    items: List[Advert]
+    total: int = 0
+    categories: List[CategoryFacet] = []
+    prices: List[PriceFacet] = []
+    next_cursor: Optional[str] = None
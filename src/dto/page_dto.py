@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from models.advert import Advert
+
+
+class AdvertPage(BaseModel):
+    items: List[Advert]
+    next_cursor: Optional[str] = None
+    # Варианты запроса для "возможно, вы искали", если поиск ничего не нашёл
+    suggestions: List[str] = []
@@ -1,9 +1,12 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from datetime import datetime
+from typing import Any, List, Optional, Tuple
 from uuid import UUID
 from models.advert import Advert
+from dto.filter_dto import AdvertFilter
 from i_sql_builders.sql_types.sql_types import TextAndParams
+from core.pagination import DEFAULT_PAGE_SIZE, Keyset, RankKeyset
 
 class IAdvertSqlBuilder(ABC):
     @abstractmethod
@@ -13,7 +16,7 @@ class IAdvertSqlBuilder(ABC):
     def get_by_id(self, advert_id: UUID) -> TextAndParams: ...
 
     @abstractmethod
-    def get_all(self) -> TextAndParams: ...
+    def get_all(self, after: Optional[Keyset] = None, limit: Optional[int] = None) -> TextAndParams: ...
 
     @abstractmethod
     def get_by_user(self, user_id: UUID) -> TextAndParams: ...
@@ -22,13 +25,33 @@ class IAdvertSqlBuilder(ABC):
     def is_created(self, user_id: UUID, advert_id: UUID) -> TextAndParams: ...
 
     @abstractmethod
-    def search_by_keyword(self, keyword_like: str) -> TextAndParams: ...
+    def search_by_keyword(self, keyword_like: str, after: Optional[Keyset] = None, limit: Optional[int] = None) -> TextAndParams: ...
+
+    @abstractmethod
+    def search_fulltext(self, query: str, after: Optional[RankKeyset] = None, limit: int = DEFAULT_PAGE_SIZE) -> TextAndParams: ...
+
+    @abstractmethod
+    def search_fuzzy(self, query: str, threshold: float, after: Optional[RankKeyset] = None,
+                     limit: int = DEFAULT_PAGE_SIZE) -> TextAndParams: ...
+
+    @abstractmethod
+    def suggest_similar(self, query: str, limit: int) -> TextAndParams: ...
+
+    @abstractmethod
+    def filter(self, flt: AdvertFilter, after: Optional[Tuple[Any, UUID]] = None,
+               limit: int = DEFAULT_PAGE_SIZE) -> TextAndParams: ...
 
     @abstractmethod
     def filter_by_dates(self, begin: datetime, end: datetime) -> TextAndParams: ...
 
     @abstractmethod
-    def by_category(self, category_id: UUID) -> TextAndParams: ...
+    def by_category(self, category_id: UUID, after: Optional[Keyset] = None, limit: Optional[int] = None) -> TextAndParams: ...
+
+    @abstractmethod
+    def delete(self, advert_id: UUID, user_id: UUID) -> TextAndParams: ...
+
+    @abstractmethod
+    def get_feed_details(self, advert_ids: List[UUID], user_id: Optional[UUID] = None) -> TextAndParams: ...
 
     @abstractmethod
-    def delete(self, advert_id: UUID, user_id: UUID) -> TextAndParams: ...
\ No newline at end of file
+    def is_created_many(self, user_id: UUID, advert_ids: List[UUID]) -> TextAndParams: ...
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from i_sql_builders.sql_types.sql_types import TextAndParams
+from typing import List
 from uuid import UUID
 
 class IDealSqlBuilder(ABC):
@@ -14,4 +15,10 @@ class IDealSqlBuilder(ABC):
     def is_in_deals(self, user_id: int, advert_id: UUID) -> TextAndParams: ...
 
     @abstractmethod
-    def is_bought(self, advert_id: UUID) -> TextAndParams: ...
\ No newline at end of file
+    def is_bought(self, advert_id: UUID) -> TextAndParams: ...
+
+    @abstractmethod
+    def is_in_deals_many(self, user_id: UUID, advert_ids: List[UUID]) -> TextAndParams: ...
+
+    @abstractmethod
+    def is_bought_many(self, advert_ids: List[UUID]) -> TextAndParams: ...
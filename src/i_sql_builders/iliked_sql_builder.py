@@ -1,6 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from i_sql_builders.sql_types.sql_types import TextAndParams
+from typing import List
 from uuid import UUID
 
 class ILikedSqlBuilder(ABC):
@@ -14,4 +15,7 @@ class ILikedSqlBuilder(ABC):
     def get_liked_by_user(self, user_id: UUID) -> TextAndParams: ...
 
     @abstractmethod
-    def is_liked(self, user_id: UUID, advert_id: UUID) -> TextAndParams: ...
\ No newline at end of file
+    def is_liked(self, user_id: UUID, advert_id: UUID) -> TextAndParams: ...
+
+    @abstractmethod
+    def is_liked_many(self, user_id: UUID, advert_ids: List[UUID]) -> TextAndParams: ...
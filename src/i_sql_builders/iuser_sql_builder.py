@@ -23,4 +23,7 @@ class IUserSqlBuilder(ABC):
     def delete_profile(self, profile_id: UUID) -> TextAndParams: ...
 
     @abstractmethod
-    def find_by_email(self, email: str) -> TextAndParams: ...
\ No newline at end of file
+    def find_by_email(self, email: str) -> TextAndParams: ...
+
+    @abstractmethod
+    def update_password(self, profile_id: UUID, password: str) -> TextAndParams: ...
@@ -1,11 +1,11 @@
 # queries/sql_types.py
 from __future__ import annotations
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List
 from decimal import Decimal
 from datetime import date, time, datetime
 from uuid import UUID
 from sqlalchemy.sql.elements import TextClause
 
-SqlParam = int | float | Decimal | str | bool | datetime | date | time | UUID | None
+SqlParam = int | float | Decimal | str | bool | datetime | date | time | UUID | List[UUID] | List[int] | None
 SqlParams = Dict[str, SqlParam]
 TextAndParams = Tuple[TextClause, SqlParams]
\ No newline at end of file
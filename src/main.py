@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
+
 from fastapi import FastAPI, Request
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
@@ -9,10 +13,43 @@ from routers.main import main_router
 from routers.user import user_router
 from routers.advert import advert_router
 from routers.liked import likes_router
-
-from core.create_jwt import JWTManager
-
-app = FastAPI()
+from routers.metrics import metrics_router
+
+from core.db import dispose_engines, has_replicas, monitor_replicas
+from core.rate_limiter import RateLimitMiddleware
+from core.user_middleware import UserMiddleware
+from service_locator import build_search_index, build_suggest_trie, init_app_locator
+from services.password_hasher import password_hasher
+from services.revocation_store import revocation_store
+from services.search_index import SEARCH_BACKEND
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Билдеры, репозитории и сервисы живут всё время работы приложения
+    app.state.locator = await init_app_locator()
+    # Файлы отзывов открываются до первого запроса и вне цикла событий: is_revoked зовётся из middleware
+    await asyncio.to_thread(revocation_store._open)
+    background = [
+        asyncio.create_task(build_suggest_trie(app.state.locator)),
+        asyncio.create_task(revocation_store.purge_periodically()),
+    ]
+    if has_replicas():
+        background.append(asyncio.create_task(monitor_replicas()))
+    if SEARCH_BACKEND == "memory":
+        background.append(asyncio.create_task(build_search_index(app.state.locator)))
+    try:
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        await dispose_engines()
+        password_hasher.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 templates = Jinja2Templates(directory="templates")
 
@@ -46,23 +83,10 @@ async def general_database_exception_handler(request: Request, exc: Exception) -
 
 
 
-# Middleware: определяет текущего пользователя
-@app.middleware("http")
-async def add_user_to_request(request: Request, call_next):
-    token = request.cookies.get("access_token")
-    request.state.user = None
-    if token:
-        try:
-            payload = JWTManager.decode_token(token)
-            request.state.user = {
-                "id": payload.get("id"),
-                "email": payload.get("sub"),
-                "role": payload.get("role"),
-            }
-        except Exception:
-            request.state.user = None
-    response = await call_next(request)
-    return response
+# Middleware: добавленное последним выполняется первым. Сначала определяется пользователь,
+# затем лимит частоты запросов по IP и пользователю: 429 — до маршрута и до сессии БД
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(UserMiddleware)
 
 
 # Подключаем роутеры
@@ -70,4 +94,5 @@ app.include_router(main_router)
 app.include_router(user_router)
 app.include_router(advert_router)
 app.include_router(likes_router)
-app.include_router(deals_router)
\ No newline at end of file
+app.include_router(deals_router)
+app.include_router(metrics_router)
\ No newline at end of file
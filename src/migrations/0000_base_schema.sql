@@ -0,0 +1,70 @@
+-- Базовая схема adv_uuid в том виде, в каком её ожидают билдеры из sql_builders/.
+-- Все объекты создаются с IF NOT EXISTS: на уже работающей базе миграция ничего не меняет
+-- и только фиксирует, что схема под контролем schema_migrations.
+
+CREATE SCHEMA IF NOT EXISTS adv_uuid;
+
+CREATE TABLE IF NOT EXISTS adv_uuid.profiles (
+    id           uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    nickname     text NOT NULL,
+    fio          text NOT NULL,
+    email        text NOT NULL,
+    phone_number text NOT NULL,
+    password     text NOT NULL,
+    CONSTRAINT profiles_email_key UNIQUE (email)
+);
+
+CREATE TABLE IF NOT EXISTS adv_uuid.customers (
+    profile_id uuid PRIMARY KEY REFERENCES adv_uuid.profiles (id) ON DELETE CASCADE,
+    rating     integer NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS adv_uuid.sellers (
+    profile_id uuid PRIMARY KEY REFERENCES adv_uuid.profiles (id) ON DELETE CASCADE,
+    rating     integer NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS adv_uuid.categories (
+    id   uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    name text NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS adv_uuid.adverts (
+    id           uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    content      text NOT NULL,
+    description  text NOT NULL DEFAULT '',
+    id_category  uuid NOT NULL REFERENCES adv_uuid.categories (id),
+    price        integer NOT NULL CHECK (price >= 0),
+    id_seller    uuid NOT NULL REFERENCES adv_uuid.profiles (id) ON DELETE CASCADE,
+    date_created timestamp NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS adv_uuid.likes (
+    id           uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    id_customer  uuid NOT NULL REFERENCES adv_uuid.profiles (id) ON DELETE CASCADE,
+    id_advert    uuid NOT NULL REFERENCES adv_uuid.adverts (id) ON DELETE CASCADE,
+    date_created timestamp NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS adv_uuid.deals (
+    id           uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    id_customer  uuid NOT NULL REFERENCES adv_uuid.profiles (id) ON DELETE CASCADE,
+    id_advert    uuid NOT NULL REFERENCES adv_uuid.adverts (id) ON DELETE CASCADE,
+    date_created timestamp NOT NULL DEFAULT now(),
+    address      text NOT NULL DEFAULT 'online'
+);
+
+-- Поиск подстроки для режима pattern. Существующую функцию не трогаем.
+DO $$
+BEGIN
+    IF to_regprocedure('adv_uuid.search_adverts(text)') IS NULL THEN
+        CREATE FUNCTION adv_uuid.search_adverts(kw text)
+        RETURNS SETOF adv_uuid.adverts
+        LANGUAGE sql STABLE
+        AS $fn$
+            SELECT * FROM adv_uuid.adverts
+            WHERE content ILIKE kw OR description ILIKE kw
+        $fn$;
+    END IF;
+END
+$$;
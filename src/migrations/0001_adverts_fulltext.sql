@@ -0,0 +1,21 @@
+-- migrate: no-transaction
+-- Полнотекстовый поиск по объявлениям.
+-- search_vector пересчитывается самой СУБД при INSERT/UPDATE (generated column),
+-- поэтому код приложения о нём ничего не знает. Заголовок весит больше описания.
+-- Каждое поле разбирается русским и английским словарями: объявления в основном
+-- на русском, но названия брендов и моделей — латиницей.
+--
+-- ADD COLUMN ... STORED переписывает таблицу под эксклюзивной блокировкой,
+-- на большой таблице миграцию стоит запускать в окно обслуживания.
+
+ALTER TABLE adv_uuid.adverts
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(content, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS adverts_search_vector_idx
+    ON adv_uuid.adverts USING gin (search_vector);
@@ -0,0 +1,13 @@
+-- migrate: no-transaction
+-- Нечёткий поиск по триграммам (pg_trgm).
+-- GIN-индексы с gin_trgm_ops обслуживают и операторы сходства (<%, %), и ILIKE '%...%',
+-- поэтому режим pattern (adv_uuid.search_adverts) тоже перестаёт читать таблицу целиком.
+-- Порог сходства задаётся соединению через DB_TRGM_THRESHOLD (core/db.py).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS adverts_content_trgm_idx
+    ON adv_uuid.adverts USING gin (content gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS adverts_description_trgm_idx
+    ON adv_uuid.adverts USING gin (description gin_trgm_ops);
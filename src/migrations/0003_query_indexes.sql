@@ -0,0 +1,51 @@
+-- migrate: no-transaction
+-- Индексы под запросы из sql_builders/ (полный список — sql_builders/query_catalog.py).
+-- CONCURRENTLY не блокирует запись в таблицу, поэтому миграцию можно применять на работающей базе.
+-- Проверка, что каждый запрос идёт по индексу: python -m migrations verify
+
+-- Лента и фильтр по датам: ORDER BY date_created DESC, id DESC с keyset-условием.
+-- id_category и price в INCLUDE: фасеты по окну дат считаются без чтения таблицы.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS adverts_date_created_id_idx
+    ON adv_uuid.adverts (date_created DESC, id DESC) INCLUDE (id_category, price);
+
+-- Лента категории (by_category, фильтр с категорией) в порядке даты
+CREATE INDEX CONCURRENTLY IF NOT EXISTS adverts_category_date_idx
+    ON adv_uuid.adverts (id_category, date_created DESC, id DESC);
+
+-- Фильтр по категории с диапазоном или сортировкой по цене
+CREATE INDEX CONCURRENTLY IF NOT EXISTS adverts_category_price_idx
+    ON adv_uuid.adverts (id_category, price, id);
+
+-- Сортировка и диапазон цены без категории
+CREATE INDEX CONCURRENTLY IF NOT EXISTS adverts_price_idx
+    ON adv_uuid.adverts (price, id);
+
+-- Объявления продавца (get_by_user, is_created, delete) и внешний ключ на profiles
+CREATE INDEX CONCURRENTLY IF NOT EXISTS adverts_seller_date_idx
+    ON adv_uuid.adverts (id_seller, date_created DESC);
+
+-- Избранное пользователя, is_liked(_many), флаги ленты
+CREATE INDEX CONCURRENTLY IF NOT EXISTS likes_customer_advert_idx
+    ON adv_uuid.likes (id_customer, id_advert);
+
+-- Каскадное удаление объявления
+CREATE INDEX CONCURRENTLY IF NOT EXISTS likes_advert_idx
+    ON adv_uuid.likes (id_advert);
+
+-- Покупки пользователя, is_in_deals(_many), флаг is_bought в ленте
+CREATE INDEX CONCURRENTLY IF NOT EXISTS deals_customer_advert_idx
+    ON adv_uuid.deals (id_customer, id_advert);
+
+-- is_bought(_many), is_really_bought в ленте, каскадное удаление объявления
+CREATE INDEX CONCURRENTLY IF NOT EXISTS deals_advert_idx
+    ON adv_uuid.deals (id_advert);
+
+-- Вход по email. Имя совпадает с ограничением из 0000, поэтому на новой базе индекс не дублируется,
+-- а на старой без него — создаётся. Если в таблице есть повторяющиеся email, миграция остановится.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS profiles_email_key
+    ON adv_uuid.profiles (email);
+
+ANALYZE adv_uuid.adverts;
+ANALYZE adv_uuid.likes;
+ANALYZE adv_uuid.deals;
+ANALYZE adv_uuid.profiles;
@@ -0,0 +1,82 @@
+"""
+Применение миграций и проверка планов запросов.
+
+    python -m migrations status
+    python -m migrations up [--target 0003]
+    python -m migrations verify
+
+Подключение — роль admin из core.db (DB_ADMIN_URL), либо --dsn.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+
+import asyncpg
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from core.db import DATABASES
+from core.migrations import MigrationRunner, asyncpg_dsn, load_migrations, verify_plans
+from sql_builders.query_catalog import query_catalog
+
+
+async def _status(url: str) -> int:
+    conn = await asyncpg.connect(asyncpg_dsn(url))
+    try:
+        for migration, state in await MigrationRunner(conn).status(load_migrations()):
+            print(f"{migration.version}  {state:8}  {migration.name}")
+    finally:
+        await conn.close()
+    return 0
+
+
+async def _up(url: str, target: str | None) -> int:
+    conn = await asyncpg.connect(asyncpg_dsn(url))
+    try:
+        applied = await MigrationRunner(conn).upgrade(load_migrations(), target)
+    finally:
+        await conn.close()
+    for migration in applied:
+        print(f"applied {migration.version}_{migration.name}")
+    if not applied:
+        print("схема актуальна")
+    return 0
+
+
+async def _verify(url: str) -> int:
+    engine = create_async_engine(url, poolclass=NullPool)
+    try:
+        checks = await verify_plans(engine, query_catalog())
+    finally:
+        await engine.dispose()
+    for check in checks:
+        mark = "ok  " if check.ok else "FAIL"
+        details = ", ".join(f"Seq Scan {table}" for table in check.seq_scans)
+        print(f"{mark}  {check.name}  {details}  {check.note}".rstrip())
+    failed = [check for check in checks if not check.ok]
+    print(f"{len(checks) - len(failed)}/{len(checks)} запросов используют индексы")
+    return 1 if failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m migrations", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=DATABASES["admin"], help="SQLAlchemy URL базы (по умолчанию роль admin)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="какие миграции применены")
+    up = commands.add_parser("up", help="применить новые миграции")
+    up.add_argument("--target", help="последний применяемый номер, например 0002")
+    commands.add_parser("verify", help="EXPLAIN каждого запроса билдеров: нет ли Seq Scan")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        return asyncio.run(_status(args.dsn))
+    if args.command == "up":
+        return asyncio.run(_up(args.dsn, args.target))
+    return asyncio.run(_verify(args.dsn))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,4 +13,11 @@ class Advert(BaseModel):
     date_created:  datetime = Field(default_factory=datetime.utcnow)
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class RankedAdvert(Advert):
+    """
+    Объявление из поисковой выдачи вместе с его релевантностью запросу.
+    """
+    rank: float = 0.0
@@ -1,11 +1,20 @@
-from typing import List
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from core.db import REPLICA_READ, TRGM_THRESHOLD
 from abstract_repositories.iadvert_repository import IAdvertRepository
 from i_sql_builders.iadvert_sql_builder import IAdvertSqlBuilder
-from models.advert import Advert
+from models.advert import Advert, RankedAdvert
 from datetime import datetime
+from dto.filter_dto import AdvertFilter, CategoryFacet, FilterResult, PriceFacet
+from core.pagination import DEFAULT_PAGE_SIZE, Keyset, RankKeyset
+
+def _json(value: Any) -> Any:
+    # asyncpg отдаёт json строкой, если для типа не зарегистрирован кодек
+    return json.loads(value) if isinstance(value, str) else value
+
 
 class AdvertsRepository(IAdvertRepository):
     def __init__(self, session: AsyncSession, builder: IAdvertSqlBuilder):
@@ -37,18 +46,25 @@ class AdvertsRepository(IAdvertRepository):
         except SQLAlchemyError:
             raise
 
-    async def get_all_adverts(self) -> List[Advert]:
+    async def get_all_adverts(self, after: Optional[Keyset] = None, limit: Optional[int] = None) -> List[Advert]:
         try:
-            sql, params = self.builder.get_all()
-            result = await self.session.execute(sql, params)
+            sql, params = self.builder.get_all(after, limit)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
             return [Advert(**r) for r in result.mappings()]
         except SQLAlchemyError:
             return []
 
+    async def scan_adverts(self, after: Optional[Keyset] = None, limit: Optional[int] = None) -> List[Advert]:
+        # Та же страница ленты, но ошибка БД не превращается в пустой список:
+        # для построения индексов пустая страница означает конец таблицы
+        sql, params = self.builder.get_all(after, limit)
+        result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
+        return [Advert(**r) for r in result.mappings()]
+
     async def get_advert_by_user(self, user_id: UUID) -> List[Advert]:
         try:
             sql, params = self.builder.get_by_user(user_id)
-            result = await self.session.execute(sql, params)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
             return [Advert(**r) for r in result.mappings()]
         except SQLAlchemyError:
             return []
@@ -56,31 +72,77 @@ class AdvertsRepository(IAdvertRepository):
     async def is_created(self, user_id: UUID, advert_id: UUID) -> bool:
         try:
             sql, params = self.builder.is_created(user_id, advert_id)
-            result = await self.session.execute(sql, params)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
             return result.first() is not None
         except SQLAlchemyError:
             return False
 
-    async def get_adverts_by_key_word(self, key_word: str) -> List[Advert]:
+    async def get_adverts_by_key_word(self, key_word: str, after: Optional[Keyset] = None,
+                                      limit: Optional[int] = None) -> List[Advert]:
         try:
-            sql, params = self.builder.search_by_keyword(f"%{key_word}%")
-            result = await self.session.execute(sql, params)
+            sql, params = self.builder.search_by_keyword(f"%{key_word}%", after, limit)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
             return [Advert(**r) for r in result.mappings()]
         except SQLAlchemyError:
             return []
 
+    async def search_adverts_fulltext(self, query: str, after: Optional[RankKeyset] = None,
+                                      limit: int = DEFAULT_PAGE_SIZE) -> List[RankedAdvert]:
+        try:
+            sql, params = self.builder.search_fulltext(query, after, limit)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
+            return [RankedAdvert(**r) for r in result.mappings()]
+        except SQLAlchemyError:
+            return []
+
+    async def search_adverts_fuzzy(self, query: str, after: Optional[RankKeyset] = None,
+                                   limit: int = DEFAULT_PAGE_SIZE) -> List[RankedAdvert]:
+        try:
+            sql, params = self.builder.search_fuzzy(query, TRGM_THRESHOLD, after, limit)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
+            return [RankedAdvert(**r) for r in result.mappings()]
+        except SQLAlchemyError:
+            return []
+
+    async def get_search_suggestions(self, query: str, limit: int) -> List[str]:
+        try:
+            sql, params = self.builder.suggest_similar(query, limit)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
+            return [row[0] for row in result]
+        except SQLAlchemyError:
+            return []
+
+    async def filter_adverts(self, flt: AdvertFilter, after: Optional[Tuple[Any, UUID]] = None,
+                             limit: int = DEFAULT_PAGE_SIZE) -> FilterResult:
+        try:
+            sql, params = self.builder.filter(flt, after, limit)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
+            row = result.mappings().one()
+            return FilterResult(
+                items=[Advert(**item) for item in _json(row["items"])],
+                total=row["total"],
+                categories=[CategoryFacet(**facet) for facet in _json(row["categories"])],
+                prices=[
+                    PriceFacet.from_bucket(facet["bucket"], facet["count"])
+                    for facet in _json(row["prices"]) if facet["bucket"] > 0
+                ],
+            )
+        except SQLAlchemyError:
+            return FilterResult(items=[])
+
     async def get_adverts_by_filter(self, begin_time: datetime, end_time: datetime) -> List[Advert]:
         try:
             sql, params = self.builder.filter_by_dates(begin_time, end_time)
-            result = await self.session.execute(sql, params)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
             return [Advert(**r) for r in result.mappings()]
         except SQLAlchemyError:
             return []
 
-    async def get_adverts_by_category(self, category_id: UUID) -> List[Advert]:
+    async def get_adverts_by_category(self, category_id: UUID, after: Optional[Keyset] = None,
+                                      limit: Optional[int] = None) -> List[Advert]:
         try:
-            sql, params = self.builder.by_category(category_id)
-            result = await self.session.execute(sql, params)
+            sql, params = self.builder.by_category(category_id, after, limit)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
             return [Advert(**r) for r in result.mappings()]
         except SQLAlchemyError:
             return []
@@ -92,4 +154,28 @@ class AdvertsRepository(IAdvertRepository):
             await self.session.commit()
         except SQLAlchemyError:
             await self.session.rollback()
-            raise
\ No newline at end of file
+            raise
+
+    async def get_feed_details(self, advert_ids: List[UUID], user_id: Optional[UUID] = None) -> Dict[UUID, Dict[str, Any]]:
+        if not advert_ids:
+            return {}
+        try:
+            sql, params = self.builder.get_feed_details(advert_ids, user_id)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
+            details: Dict[UUID, Dict[str, Any]] = {}
+            for row in result.mappings():
+                item = dict(row)
+                details[UUID(str(item.pop("id")))] = item
+            return details
+        except SQLAlchemyError:
+            return {}
+
+    async def is_created_many(self, user_id: UUID, advert_ids: List[UUID]) -> Set[UUID]:
+        if not advert_ids:
+            return set()
+        try:
+            sql, params = self.builder.is_created_many(user_id, advert_ids)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
+            return {UUID(str(row[0])) for row in result}
+        except SQLAlchemyError:
+            return set()
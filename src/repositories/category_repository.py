@@ -2,6 +2,7 @@
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
+from core.db import REPLICA_READ
 from abstract_repositories.icategory_repository import ICategoryRepository
 from i_sql_builders.icategory_sql_builder import ICategorySqlBuilder
 from models.category import Category
@@ -15,7 +16,7 @@ class CategoryRepository(ICategoryRepository):
     async def get_all(self) -> List[Category]:
         try:
             sql, params = self.builder.get_all()
-            result = await self.session.execute(sql, params)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
             print(result)
             return [Category(**row) for row in result.mappings()]
         except SQLAlchemyError as e:
@@ -25,7 +26,7 @@ class CategoryRepository(ICategoryRepository):
     async def get_name_by_id(self, id_category: UUID) -> str:
         try:
             sql, params = self.builder.get_name_by_id(id_category)
-            result = await self.session.execute(sql, params)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
             category = result.mappings().first()
             if category:
                 return category['name']
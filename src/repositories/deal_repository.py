@@ -1,7 +1,8 @@
 # repositories/deal_repository.py
-from typing import List
+from typing import List, Set
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
+from core.db import REPLICA_READ
 from abstract_repositories.ideal_repository import IDealRepository
 from i_sql_builders.ideal_sql_builder import IDealSqlBuilder
 from models.advert import Advert
@@ -29,7 +30,7 @@ class DealRepository(IDealRepository):
     async def get_deals_by_user(self, user_id: UUID) -> List[Advert]:
         try:
             sql, params = self.builder.get_deals_by_user(user_id)
-            result = await self.session.execute(sql, params)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
             return [Advert(**row) for row in result.mappings()]
         except SQLAlchemyError:
             return []
@@ -37,7 +38,7 @@ class DealRepository(IDealRepository):
     async def is_in_deals(self, user_id: UUID, advert_id: UUID) -> bool:
         try:
             sql, params = self.builder.is_in_deals(user_id, advert_id)
-            result = await self.session.execute(sql, params)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
             return result.first() is not None
         except SQLAlchemyError:
             return False
@@ -45,7 +46,27 @@ class DealRepository(IDealRepository):
     async def is_bought(self, advert_id: UUID) -> bool:
         try:
             sql, params = self.builder.is_bought(advert_id)
-            result = await self.session.execute(sql, params)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
             return result.first() is not None
         except SQLAlchemyError:
-            return False
\ No newline at end of file
+            return False
+
+    async def is_in_deals_many(self, user_id: UUID, advert_ids: List[UUID]) -> Set[UUID]:
+        if not advert_ids:
+            return set()
+        try:
+            sql, params = self.builder.is_in_deals_many(user_id, advert_ids)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
+            return {UUID(str(row[0])) for row in result}
+        except SQLAlchemyError:
+            return set()
+
+    async def is_bought_many(self, advert_ids: List[UUID]) -> Set[UUID]:
+        if not advert_ids:
+            return set()
+        try:
+            sql, params = self.builder.is_bought_many(advert_ids)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
+            return {UUID(str(row[0])) for row in result}
+        except SQLAlchemyError:
+            return set()
@@ -1,7 +1,8 @@
 # repositories/liked_repository.py
-from typing import List, Optional
+from typing import List, Optional, Set
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
+from core.db import REPLICA_READ
 from abstract_repositories.iliked_repository import ILikedRepository
 from i_sql_builders.iliked_sql_builder import ILikedSqlBuilder
 from models.advert import Advert
@@ -37,7 +38,7 @@ class LikedRepository(ILikedRepository):
     async def get_liked_by_user(self, user_id: UUID) -> List[Advert]:
         try:
             sql, params = self.builder.get_liked_by_user(user_id)
-            result = await self.session.execute(sql, params)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
             return [Advert(**row) for row in result.mappings()]
         except SQLAlchemyError:
             return []
@@ -45,7 +46,17 @@ class LikedRepository(ILikedRepository):
     async def is_liked(self, user_id: UUID, advert_id: UUID) -> bool:
         try:
             sql, params = self.builder.is_liked(user_id, advert_id)
-            result = await self.session.execute(sql, params)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
             return result.first() is not None
         except SQLAlchemyError:
-            return False
\ No newline at end of file
+            return False
+
+    async def is_liked_many(self, user_id: UUID, advert_ids: List[UUID]) -> Set[UUID]:
+        if not advert_ids:
+            return set()
+        try:
+            sql, params = self.builder.is_liked_many(user_id, advert_ids)
+            result = await self.session.execute(sql, params, bind_arguments=REPLICA_READ)
+            return {UUID(str(row[0])) for row in result}
+        except SQLAlchemyError:
+            return set()
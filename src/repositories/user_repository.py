@@ -82,4 +82,14 @@ class UserRepository(IUserRepository):
                 return None
             return User(**row)
         except SQLAlchemyError:
-            return None
\ No newline at end of file
+            return None
+
+    async def update_password(self, profile_id: UUID, password: str) -> bool:
+        try:
+            sql, params = self.builder.update_password(profile_id, password)
+            result = await self.session.execute(sql, params)
+            await self.session.commit()
+            return result.rowcount > 0
+        except SQLAlchemyError:
+            await self.session.rollback()
+            return False
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 
-from service_locator import get_locator, ServiceLocator
+from service_locator import get_locator, get_read_locator, ServiceLocator
 from models.advert import Advert
 from uuid import UUID
 
@@ -11,7 +11,7 @@ advert_router = APIRouter()
 
 
 @advert_router.get("/profile/create_advert", response_class=HTMLResponse)
-async def create_advert_form(request: Request, locator: ServiceLocator = Depends(get_locator)):
+async def create_advert_form(request: Request, locator: ServiceLocator = Depends(get_read_locator)):
     if not request.state.user:
         return RedirectResponse(url="/login", status_code=303)
 
@@ -1,73 +1,59 @@
 from fastapi import APIRouter, Request, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from service_locator import get_locator, ServiceLocator
-from dto.advert_dto import AdvertWithCategoryDTO
+from service_locator import get_read_locator, ServiceLocator
+from controllers.main_controller import MainController
+from core.pagination import DEFAULT_PAGE_SIZE
+from dto.filter_dto import AdvertFilter, AdvertSort
+from services.advert_service import AUTOCOMPLETE_LIMIT
 from uuid import UUID
+from datetime import datetime
 
 templates = Jinja2Templates(directory="templates")
 main_router = APIRouter()
 
 
 @main_router.get("/", response_class=HTMLResponse)
-async def index(request: Request, locator: ServiceLocator = Depends(get_locator)):
-    user_id = request.state.user["id"] if request.state.user else None
-
-    categories = await locator.category_service().get_all()
-    print(categories)
-    adverts_dto = []
-
-    adverts = await locator.advert_service().get_all_adverts()
-    for advert in adverts:
-        dto = AdvertWithCategoryDTO(**advert.model_dump())
-        dto.category_name = await locator.category_service().get_name_by_id(dto.id_category)
-
-        if user_id:
-            dto.is_favorite = await locator.liked_service().is_liked(user_id, dto.id)
-            dto.is_bought = await locator.deals_service().is_in_deals(user_id, dto.id)
-            dto.is_created = await locator.advert_service().is_created(user_id, dto.id)
-            dto.is_really_bought = await locator.deals_service().is_bought(dto.id)
-
-        adverts_dto.append(dto)
-
-    return templates.TemplateResponse(
-        "index.html",
-        {"request": request, "user": request.state.user, "user_id": user_id, "adverts": adverts_dto, "categories": categories},
-    )
+async def index(request: Request, cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE,
+                locator: ServiceLocator = Depends(get_read_locator)):
+    controller = MainController(locator)
+    return await controller.index(request, cursor, limit)
 
 
 @main_router.get("/category/{category_id}", response_class=HTMLResponse)
-async def adverts_by_category(request: Request, category_id: UUID, locator: ServiceLocator = Depends(get_locator)):
-    user_id = request.state.user["id"] if request.state.user else None
+async def adverts_by_category(request: Request, category_id: UUID, cursor: str | None = None,
+                              limit: int = DEFAULT_PAGE_SIZE, locator: ServiceLocator = Depends(get_read_locator)):
+    controller = MainController(locator)
+    return await controller.adverts_by_category(request, category_id, cursor, limit)
 
-    categories = await locator.category_service().get_all()
 
-    if request.state.user:
-        adverts = await locator.advert_service().get_adverts_by_category(category_id)  # Используем обычный метод
-    else:
-        adverts = await locator.advert_service().get_adverts_by_category(category_id)
-
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "user": request.state.user,
-            "user_id": user_id,
-            "adverts": adverts,
-            "categories": categories
-        },
+@main_router.get("/search", response_class=HTMLResponse)
+async def search_adverts(request: Request, q: str, cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE,
+                         mode: str | None = None, backend: str | None = None,
+                         locator: ServiceLocator = Depends(get_read_locator)):
+    controller = MainController(locator)
+    return await controller.search_adverts(request, q, cursor, limit, mode, backend)
+
+
+@main_router.get("/filter", response_class=HTMLResponse)
+async def filter_adverts(request: Request, q: str | None = None, category_id: UUID | None = None,
+                         min_price: int | None = None, max_price: int | None = None,
+                         date_from: datetime | None = None, date_to: datetime | None = None,
+                         sort: AdvertSort = "newest", cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE,
+                         locator: ServiceLocator = Depends(get_read_locator)):
+    flt = AdvertFilter(
+        keyword=q, category_id=category_id, min_price=min_price, max_price=max_price,
+        date_from=date_from, date_to=date_to, sort=sort,
     )
+    controller = MainController(locator)
+    return await controller.filter_adverts(request, flt, cursor, limit)
 
 
-@main_router.get("/search", response_class=HTMLResponse)
-async def search_adverts(request: Request, q: str, locator: ServiceLocator = Depends(get_locator)):
-    adverts = await locator.advert_service().get_adverts_by_key_word(q)
-    categories = await locator.category_service().get_all()
-
-    return templates.TemplateResponse(
-        "index.html",
-        {"request": request, "user": request.state.user, "adverts": adverts, "categories": categories}
-    )
+@main_router.get("/search/suggest", response_class=JSONResponse)
+async def search_suggestions(q: str = "", limit: int = AUTOCOMPLETE_LIMIT,
+                             locator: ServiceLocator = Depends(get_read_locator)):
+    controller = MainController(locator)
+    return await controller.search_suggestions(q, limit)
 
 
 @main_router.get("/profile", response_class=HTMLResponse)
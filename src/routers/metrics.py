@@ -0,0 +1,49 @@
+import hmac
+import os
+from typing import Tuple
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from core.db import pool_stats, query_counter
+from core.rate_limiter import rate_limiter
+from services.password_hasher import password_hasher
+from services.revocation_store import revocation_store
+from services.search_cache import search_cache
+from services.search_index import search_index
+from services.suggest_trie import suggest_trie
+from services.token_cache import token_cache
+from sql_builders.statement_registry import statements
+
+# Токен доступа к /metrics: заголовок Authorization: Bearer <токен>.
+# Без токена метрики отдаются только запросам с loopback-адреса
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+LOOPBACK_HOSTS: Tuple[str, ...] = ("127.0.0.1", "::1")
+
+metrics_router = APIRouter()
+
+
+def metrics_allowed(request: Request, token: str = METRICS_TOKEN) -> bool:
+    if token:
+        scheme, _, presented = request.headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(presented.encode(), token.encode())
+    return request.client is not None and request.client.host in LOOPBACK_HOSTS
+
+
+@metrics_router.get("/metrics", response_class=JSONResponse)
+async def metrics(request: Request):
+    # Чужому клиенту ответ такой же, как на несуществующий адрес
+    if not metrics_allowed(request):
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
+    return {
+        "pools": pool_stats(),
+        "queries": query_counter.stats(),
+        "statements": statements.stats(),
+        "search_index": search_index.stats(),
+        "search_cache": search_cache.stats(),
+        "suggest_trie": suggest_trie.stats(),
+        "token_cache": token_cache.stats(),
+        "revocations": revocation_store.stats(),
+        "password_hasher": password_hasher.stats(),
+        "rate_limiter": rate_limiter.stats(),
+    }
@@ -27,7 +27,6 @@ async def login(
     password = str(form_data.get("password"))
 
     try:
-        print(email, password)
         token = await service.login(locator.session, email, password)
         response = RedirectResponse(url="/", status_code=303)
         response.set_cookie(key="access_token", value=token, httponly=True)
@@ -80,7 +79,6 @@ async def register(
     print("=== REGISTER ROUTE CALLED ===")  # Эта строка должна появиться
     service = locator.auth_service()
     form_data = await request.form()
-    print("Form data:", dict(form_data))  # Проверим данные
     print("^(")
     try:
         print('here')
@@ -105,7 +103,10 @@ async def register(
 # Логаут
 # -------------------
 @user_router.get("/logout")
-async def logout(request: Request):
+async def logout(request: Request, locator: ServiceLocator = Depends(get_locator)):
+    token = request.cookies.get("access_token")
+    if token:
+        await locator.auth_service().logout(token)
     response = RedirectResponse(url="/", status_code=303)
     response.delete_cookie("access_token")
     return response
@@ -2,15 +2,19 @@ from __future__ import annotations
 
 import asyncio
 import os
+from contextlib import suppress
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Literal, Optional, Tuple, TypeVar
 from fastapi import Request
 
-from sqlalchemy.exc import OperationalError
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, AsyncEngine, async_sessionmaker
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, AsyncEngine, async_sessionmaker, async_scoped_session
 from sqlalchemy import text
 
-from core.db import create_session
+from core.db import SessionLocal, Role, read_your_writes
+from core.pagination import Keyset
+from models.advert import Advert
 
 # Репозитории
 from repositories.advert_repository import AdvertsRepository
@@ -28,10 +32,16 @@ from sql_builders.user_sql_builder import UserSqlBuilder
 
 # Сервисы
 from services.advert_service import AdvertService
-from services.category_service import CategoryService
+from services.category_service import CategoryService, category_cache
 from services.liked_service import LikedService
 from services.deal_service import DealsService
 from services.auth_service import AuthService
+from services.password_hasher import password_hasher
+from services.search_cache import search_cache
+from services.search_index import search_index
+from services.suggest_trie import SUGGEST_REBUILD_INTERVAL, suggest_trie
+from services.revocation_store import revocation_store
+from services.token_cache import token_cache
 
 
 # -------- Data containers
@@ -56,7 +66,7 @@ class Services:
 
 @dataclass
 class ServiceLocator:
-    session: AsyncSession
+    session: AsyncSession | async_scoped_session[AsyncSession]
     repositories: Repositories
     services: Services
 
@@ -118,7 +128,7 @@ async def get_async_sessionmaker(
 
 # -------- Builder
 
-async def build_service_locator(session: AsyncSession) -> ServiceLocator:
+async def build_service_locator(session: AsyncSession | async_scoped_session[AsyncSession]) -> ServiceLocator:
     """
     Собирает билдеры, репозитории и сервисы на основе переданной сессии.
     """
@@ -137,11 +147,19 @@ async def build_service_locator(session: AsyncSession) -> ServiceLocator:
     users_repo = UserRepository(session, users_builder)
 
     # Сервисы
-    adverts_service = AdvertService(adverts_repo)
-    categories_service = CategoryService(categories_repo)
+    adverts_service = AdvertService(
+        adverts_repo,
+        observers=[search_index, search_cache, suggest_trie],
+        search_index=search_index,
+        search_cache=search_cache,
+        suggest_trie=suggest_trie,
+    )
+    # Кэш категорий общий для запросов: с прокси сессии запроса загрузка открывает свою сессию
+    load_categories = _own_session(categories_repo.get_all) if isinstance(session, async_scoped_session) else None
+    categories_service = CategoryService(categories_repo, category_cache, loader=load_categories)
     deals_service = DealsService(deals_repo)
     liked_service = LikedService(liked_repo)
-    auth_service = AuthService(users_repo)
+    auth_service = AuthService(users_repo, token_cache, revocation_store, password_hasher)
 
     return ServiceLocator(
         session=session,
@@ -162,18 +180,187 @@ async def build_service_locator(session: AsyncSession) -> ServiceLocator:
     )
 
 
-# -------- FastAPI dependency (per-request) - только админ
+# -------- Session routing
+
+Intent = Literal["read", "write"]
+
+# (намерение маршрута, пользователь авторизован) -> роль БД и её пул.
+# Анонимное чтение ленты идёт в отдельный read-only пул any_user и не может занять
+# соединения, нужные для записи; любые записи идут в основной пул admin.
+ROLE_ROUTING: Dict[Tuple[Intent, bool], Role] = {
+    ("read", False): "any_user",
+    ("read", True): "authorized_user",
+    ("write", False): "admin",
+    ("write", True): "admin",
+}
+
+
+def resolve_role(user: Optional[Dict[str, Any]], intent: Intent) -> Role:
+    return ROLE_ROUTING[(intent, user is not None)]
+
+
+# -------- Application-lifetime locator
+
+# Метка текущего запроса: по ней scoped-сессия выдаёт каждому запросу свою AsyncSession
+_request_scope: ContextVar[Optional[object]] = ContextVar("request_scope", default=None)
+# Роль, с которой будет открыта сессия текущего запроса
+_request_role: ContextVar[Role] = ContextVar("request_role", default="admin")
+# Пользователь недавно писал в БД: его чтения не уходят на реплики
+_request_read_primary: ContextVar[bool] = ContextVar("request_read_primary", default=False)
+
+
+def _create_request_session() -> AsyncSession:
+    session = SessionLocal[_request_role.get()]()
+    session.info["read_primary"] = _request_read_primary.get()
+    return session
+
+
+# Прокси сессии запроса. Билдеры, репозитории и сервисы создаются один раз и работают через него
+request_session: async_scoped_session[AsyncSession] = async_scoped_session(
+    _create_request_session, scopefunc=_request_scope.get
+)
+
+_app_locator: Optional[ServiceLocator] = None
+
+
+async def init_app_locator() -> ServiceLocator:
+    """
+    Собирает локатор на всё время жизни приложения. Вызывается из lifespan в main.py.
+    """
+    global _app_locator
+    _app_locator = await build_service_locator(request_session)
+    return _app_locator
+
+
+async def get_app_locator() -> ServiceLocator:
+    """
+    Возвращает локатор приложения; если lifespan не запускался (скрипты, тесты) — собирает его.
+    """
+    if _app_locator is None:
+        return await init_app_locator()
+    return _app_locator
+
+
+def _user_id(request: Request) -> Optional[str]:
+    user = getattr(request.state, "user", None)
+    return user.get("id") if user else None
+
+
+def _read_primary_cookie(request: Request) -> Optional[str]:
+    return request.cookies.get(read_your_writes.COOKIE)
+
+
+def _begin_request(role: Role, user_id: Optional[str] = None, read_primary_cookie: Optional[str] = None) -> None:
+    _request_scope.set(object())
+    _request_role.set(role)
+    _request_read_primary.set(read_your_writes.is_recent(user_id, read_primary_cookie))
+
+
+T = TypeVar("T")
+
+
+def _own_session(load: Callable[[], Awaitable[T]]) -> Callable[[], Awaitable[T]]:
+    """
+    Выполняет load в собственной сессии any_user и закрывает её: для загрузок, которые ждут
+    несколько запросов сразу и не должны зависеть от сессии одного из них.
+    """
+
+    async def run() -> T:
+        _begin_request("any_user")
+        try:
+            return await load()
+        finally:
+            await request_session.remove()
+
+    return run
+
+
+# Повторы страницы при ошибке БД во время построения индексов, пауза между ними растёт вдвое
+BUILD_PAGE_RETRIES = int(os.getenv("BUILD_PAGE_RETRIES", "3"))
+BUILD_RETRY_DELAY = float(os.getenv("BUILD_RETRY_DELAY", "1"))
+
+
+def _page_reader(locator: ServiceLocator) -> Callable[[Optional[Keyset], int], Awaitable[List[Advert]]]:
+    """
+    Чтение ленты страницами для построения индексов. Каждая страница читается в своей сессии
+    и своей короткой транзакции: одна транзакция на всю таблицу держала бы xmin и на реплике
+    конфликтовала бы с применением WAL. Ошибка страницы повторяется BUILD_PAGE_RETRIES раз,
+    затем пробрасывается — пустой список всегда означает конец таблицы.
+    """
+
+    async def fetch_page(after: Optional[Keyset], limit: int) -> List[Advert]:
+        attempt = 0
+        while True:
+            _begin_request("any_user")
+            try:
+                return await locator.repositories.adverts.scan_adverts(after, limit)
+            except (SQLAlchemyError, OSError):
+                if attempt >= BUILD_PAGE_RETRIES:
+                    raise
+            finally:
+                await request_session.remove()
+            await asyncio.sleep(BUILD_RETRY_DELAY * 2 ** attempt)
+            attempt += 1
+
+    return fetch_page
+
+
+async def build_search_index(locator: ServiceLocator) -> None:
+    """
+    Строит индекс поиска в памяти из ленты объявлений. Запускается из lifespan фоновой задачей:
+    пока индекс не готов, поиск с backend=memory обслуживается SQL. Если страницу так и не
+    удалось прочитать, построение прерывается и индекс остаётся неготовым.
+    """
+    with suppress(SQLAlchemyError, OSError):
+        await search_index.build(_page_reader(locator))
+
+
+async def build_suggest_trie(locator: ServiceLocator, interval: float = SUGGEST_REBUILD_INTERVAL) -> None:
+    """
+    Наполняет дерево подсказок заголовками объявлений и раз в interval секунд собирает его заново,
+    чтобы устаревшие запросы уходили из подсказок. Запускается из lifespan фоновой задачей.
+    """
+    with suppress(SQLAlchemyError, OSError):
+        await suggest_trie.build(_page_reader(locator))
+    while interval > 0:
+        await asyncio.sleep(interval)
+        with suppress(SQLAlchemyError, OSError):
+            await suggest_trie.rebuild(_page_reader(locator))
+
+
+# -------- FastAPI dependencies (per-request)
 
 async def get_locator(request: Request) -> AsyncGenerator[ServiceLocator, None]:
     """
-    Заглушка: всегда использует роль админа
+    Локатор для маршрутов, которые пишут в БД: сессия открывается в основном пуле.
+    Сессия запроса создаётся лениво, при первом обращении репозитория к БД,
+    поэтому обработчики без запросов к БД не берут соединение из пула.
+    """
+    locator = await get_app_locator()
+    user_id = _user_id(request)
+    _begin_request(resolve_role(getattr(request.state, "user", None), "write"), user_id, _read_primary_cookie(request))
+    try:
+        yield locator
+    finally:
+        # Пишущий запрос к БД: ближайшие чтения этого пользователя пойдут на мастер.
+        # Окно уходит клиенту cookie (её выставляет UserMiddleware), чтобы его видели все воркеры
+        if user_id is not None and request_session.registry.has():
+            request.state.read_primary_cookie = read_your_writes.set_cookie(user_id)
+        # remove() закрывает сессию, только если она была создана
+        await request_session.remove()
+
+
+async def get_read_locator(request: Request) -> AsyncGenerator[ServiceLocator, None]:
+    """
+    Локатор для маршрутов только на чтение: роль и пул выбираются по пользователю запроса.
     """
-    session: AsyncSession = create_session("admin")
-    locator = await build_service_locator(session)
+    locator = await get_app_locator()
+    user_id = _user_id(request)
+    _begin_request(resolve_role(getattr(request.state, "user", None), "read"), user_id, _read_primary_cookie(request))
     try:
         yield locator
     finally:
-        await session.close()
+        await request_session.remove()
 
 
 # Упрощенная версия без поддержки разных ролей
@@ -181,9 +368,9 @@ async def get_admin_locator() -> AsyncGenerator[ServiceLocator, None]:
     """
     Альтернативная функция для получения локатора с ролью админа
     """
-    session: AsyncSession = create_session("admin")
-    locator = await build_service_locator(session)
+    locator = await get_app_locator()
+    _begin_request("admin")
     try:
         yield locator
     finally:
-        await session.close()
\ No newline at end of file
+        await request_session.remove()
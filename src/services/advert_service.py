@@ -1,8 +1,47 @@
+from __future__ import annotations
+
+import os
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from models.advert import Advert
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from models.advert import Advert, RankedAdvert
 from abstract_repositories.iadvert_repository import IAdvertRepository
 from uuid import UUID
+from core.pagination import (
+    DEFAULT_PAGE_SIZE, RankKeyset, clamp_page_size, decode_cursor, decode_price_cursor, decode_rank_cursor,
+    encode_cursor, encode_price_cursor, encode_rank_cursor,
+)
+from dto.page_dto import AdvertPage
+from dto.filter_dto import AdvertFilter, FilterResult
+from core.text import normalize_query
+
+if TYPE_CHECKING:
+    from services.search_cache import SearchCache
+    from services.search_index import SearchIndex
+    from services.suggest_trie import SuggestTrie
+
+# Режимы поиска: fulltext — tsvector + GIN, fuzzy — триграммы pg_trgm,
+# pattern — прежний ILIKE через adv_uuid.search_adverts. По умолчанию pattern: fulltext и fuzzy
+# требуют миграций 0001 и 0002 и включаются через SEARCH_MODE или параметр mode запроса
+SEARCH_MODES: Tuple[str, ...] = ("fulltext", "fuzzy", "pattern")
+DEFAULT_SEARCH_MODE = os.getenv("SEARCH_MODE", "pattern")
+if DEFAULT_SEARCH_MODE not in SEARCH_MODES:
+    DEFAULT_SEARCH_MODE = "pattern"
+SUGGESTIONS_LIMIT = 3
+AUTOCOMPLETE_LIMIT = 8
+AUTOCOMPLETE_MAX_LIMIT = 20
+
+class IAdvertObserver(ABC):
+    """
+    Подписчик на изменения объявлений: поисковый индекс, кэши выдачи.
+    Вызывается после успешной записи в БД.
+    """
+
+    @abstractmethod
+    def on_advert_created(self, advert: Advert) -> None: ...
+
+    @abstractmethod
+    def on_advert_deleted(self, advert_id: UUID) -> None: ...
+
 
 class IAdvertService(ABC):
     @abstractmethod
@@ -20,6 +59,9 @@ class IAdvertService(ABC):
     @abstractmethod
     async def is_created(self, user_id: int, advert_id: UUID) -> bool: ...
 
+    @abstractmethod
+    async def is_created_many(self, user_id: UUID, advert_ids: List[UUID]) -> Set[UUID]: ...
+
     @abstractmethod
     async def get_adverts_by_key_word(self, key_word: str) -> List[Advert]: ...
 
@@ -29,15 +71,52 @@ class IAdvertService(ABC):
     @abstractmethod
     async def delete_advert(self, advert_id: UUID, user_id: UUID) -> None: ...
 
+    @abstractmethod
+    async def get_adverts_page(self, cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE) -> AdvertPage: ...
+
+    @abstractmethod
+    async def get_adverts_by_category_page(self, category_id: UUID, cursor: Optional[str] = None,
+                                           page_size: int = DEFAULT_PAGE_SIZE) -> AdvertPage: ...
+
+    @abstractmethod
+    async def get_adverts_by_key_word_page(self, key_word: str, cursor: Optional[str] = None,
+                                           page_size: int = DEFAULT_PAGE_SIZE) -> AdvertPage: ...
+
+    @abstractmethod
+    async def search_adverts_page(self, query: str, mode: Optional[str] = None, cursor: Optional[str] = None,
+                                  page_size: int = DEFAULT_PAGE_SIZE, backend: Optional[str] = None) -> AdvertPage: ...
+
+    @abstractmethod
+    async def filter_adverts(self, flt: AdvertFilter, cursor: Optional[str] = None,
+                             page_size: int = DEFAULT_PAGE_SIZE) -> FilterResult: ...
+
+    @abstractmethod
+    async def autocomplete(self, prefix: str, limit: int = AUTOCOMPLETE_LIMIT) -> List[str]: ...
+
+    @abstractmethod
+    async def suggest_queries(self, query: str, limit: int = SUGGESTIONS_LIMIT) -> List[str]: ...
+
+    @abstractmethod
+    async def get_feed_details(self, advert_ids: List[UUID], user_id: Optional[UUID] = None) -> Dict[UUID, Dict[str, Any]]: ...
+
 
 
 class AdvertService(IAdvertService):
-    def __init__(self, repo: IAdvertRepository):
+    def __init__(self, repo: IAdvertRepository, observers: Sequence[IAdvertObserver] = (),
+                 search_index: Optional[SearchIndex] = None, search_cache: Optional[SearchCache] = None,
+                 suggest_trie: Optional[SuggestTrie] = None):
         self.repo = repo
+        self.observers = list(observers)
+        self.search_index = search_index
+        self.search_cache = search_cache
+        self.suggest_trie = suggest_trie
 
 
     async def create_advert(self, advert: Advert) -> Optional[Advert]:
         result = await self.repo.create(advert)
+        if result is not None:
+            for observer in self.observers:
+                observer.on_advert_created(result)
         return result
 
     async def get_advert(self, advert_id: UUID) -> Optional[Advert]:
@@ -52,6 +131,9 @@ class AdvertService(IAdvertService):
     async def is_created(self, user_id: UUID, advert_id: UUID) -> bool:
         return await self.repo.is_created(user_id, advert_id)
 
+    async def is_created_many(self, user_id: UUID, advert_ids: List[UUID]) -> Set[UUID]:
+        return await self.repo.is_created_many(user_id, advert_ids)
+
     async def get_adverts_by_key_word(self, key_word: str) -> List[Advert]:
         return await self.repo.get_adverts_by_key_word(key_word)
 
@@ -66,5 +148,131 @@ class AdvertService(IAdvertService):
             raise ValueError("Advert not found")
         if advert.id_seller != user_id:
             raise PermissionError("Not allowed to delete this advert")
-        await self.repo.delete_advert(user_id, advert_id)
+        await self.repo.delete_advert(advert_id, user_id)
+        for observer in self.observers:
+            observer.on_advert_deleted(advert_id)
+
+    async def get_feed_details(self, advert_ids: List[UUID], user_id: Optional[UUID] = None) -> Dict[UUID, Dict[str, Any]]:
+        return await self.repo.get_feed_details(advert_ids, user_id)
+
+    async def get_adverts_page(self, cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE) -> AdvertPage:
+        return await self._page(lambda after, limit: self.repo.get_all_adverts(after, limit), cursor, page_size)
+
+    async def get_adverts_by_category_page(self, category_id: UUID, cursor: Optional[str] = None,
+                                           page_size: int = DEFAULT_PAGE_SIZE) -> AdvertPage:
+        return await self._page(
+            lambda after, limit: self.repo.get_adverts_by_category(category_id, after, limit), cursor, page_size
+        )
+
+    async def get_adverts_by_key_word_page(self, key_word: str, cursor: Optional[str] = None,
+                                           page_size: int = DEFAULT_PAGE_SIZE) -> AdvertPage:
+        return await self._page(
+            lambda after, limit: self.repo.get_adverts_by_key_word(key_word, after, limit), cursor, page_size
+        )
+
+    async def search_adverts_page(self, query: str, mode: Optional[str] = None, cursor: Optional[str] = None,
+                                  page_size: int = DEFAULT_PAGE_SIZE, backend: Optional[str] = None) -> AdvertPage:
+        """
+        Поиск с выбором режима. Неизвестный режим трактуется как режим по умолчанию.
+        backend="memory" ищет по индексу в памяти, пока тот построен; иначе — SQL.
+        Индекс ранжирует только BM25, поэтому с ним mode не учитывается.
+        """
+        mode = mode if mode in SEARCH_MODES else DEFAULT_SEARCH_MODE
+        query = normalize_query(query)
+        use_index = backend == "memory" and self.search_index is not None and self.search_index.ready
+        cache_key, generation = None, 0
+        if self.search_cache is not None:
+            # Для индекса режим не важен: все режимы делят одну запись кэша
+            cache_key = self.search_cache.key(
+                query, "bm25" if use_index else mode, "memory" if use_index else "sql", cursor,
+                clamp_page_size(page_size)
+            )
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                self._remember_query(query, cached, cursor)
+                return cached
+            generation = self.search_cache.generation
+
+        if mode == "pattern" and not use_index:
+            page = await self.get_adverts_by_key_word_page(query, cursor, page_size)
+        elif not query:
+            return AdvertPage(items=[])
+        else:
+            if use_index:
+                search = self._search_in_memory
+            elif mode == "fuzzy":
+                search = self.repo.search_adverts_fuzzy
+            else:
+                search = self.repo.search_adverts_fulltext
+            page = await self._page(
+                lambda after, limit: search(query, after, limit), cursor, page_size,
+                decode=decode_rank_cursor, encode=lambda last: encode_rank_cursor(last.rank, last.id),
+            )
+
+        # Похожие заголовки ищет триграммный оператор <% из миграции 0002, как и режимы fulltext и fuzzy:
+        # в режиме pattern и с индексом в памяти базе без этой миграции запрос не посылается
+        if not page.items and cursor is None and query and mode != "pattern" and not use_index:
+            page.suggestions = await self.suggest_queries(query)
+        # Пустая выдача не кэшируется: репозитории возвращают [] и при ошибке БД, и кратковременный
+        # сбой иначе на весь TTL превратился бы в "ничего не найдено" для популярного запроса
+        if cache_key is not None and page.items:
+            self.search_cache.put(cache_key, page, generation)
+        self._remember_query(query, page, cursor)
+        return page
+
+    async def filter_adverts(self, flt: AdvertFilter, cursor: Optional[str] = None,
+                             page_size: int = DEFAULT_PAGE_SIZE) -> FilterResult:
+        """
+        Отбор по любому сочетанию условий вместе с фасетами — один запрос к БД на страницу.
+        """
+        by_price = flt.sort in ("price_asc", "price_desc")
+        size = clamp_page_size(page_size)
+        after = decode_price_cursor(cursor) if by_price else decode_cursor(cursor)
+        result = await self.repo.filter_adverts(flt, after, size + 1)
+        if len(result.items) <= size:
+            return result
+
+        result.items = result.items[:size]
+        last = result.items[-1]
+        result.next_cursor = (
+            encode_price_cursor(last.price, last.id) if by_price else encode_cursor(last.date_created, last.id)
+        )
+        return result
+
+    def _remember_query(self, query: str, page: AdvertPage, cursor: Optional[str]) -> None:
+        # В подсказки попадают только запросы, которые что-то нашли; листание страниц не считается
+        if self.suggest_trie is not None and page.items and cursor is None:
+            self.suggest_trie.add_query(query)
+
+    async def autocomplete(self, prefix: str, limit: int = AUTOCOMPLETE_LIMIT) -> List[str]:
+        """
+        Дополнения строки поиска из префиксного дерева в памяти, без обращения к БД.
+        """
+        if self.suggest_trie is None:
+            return []
+        return self.suggest_trie.complete(prefix, max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT)))
+
+    async def _search_in_memory(self, query: str, after: Optional[RankKeyset], limit: int) -> List[RankedAdvert]:
+        return self.search_index.search(query, after, limit)
+
+    async def suggest_queries(self, query: str, limit: int = SUGGESTIONS_LIMIT) -> List[str]:
+        """
+        Похожие запросы для "возможно, вы искали". Сам запрос в подсказки не попадает.
+        """
+        suggestions = await self.repo.get_search_suggestions(query.strip(), limit + 1)
+        normalized = query.strip().casefold()
+        return [s for s in suggestions if s.casefold() != normalized][:limit]
+
+    @staticmethod
+    async def _page(fetch: Callable[[Any, int], Awaitable[List[Advert]]],
+                    cursor: Optional[str], page_size: int,
+                    decode: Callable[[Optional[str]], Any] = decode_cursor,
+                    encode: Callable[[Any], str] = lambda last: encode_cursor(last.date_created, last.id)) -> AdvertPage:
+        # Запрашиваем на одну строку больше, чтобы узнать, есть ли следующая страница
+        size = clamp_page_size(page_size)
+        adverts = await fetch(decode(cursor), size + 1)
+        if len(adverts) <= size:
+            return AdvertPage(items=adverts)
 
+        adverts = adverts[:size]
+        return AdvertPage(items=adverts, next_cursor=encode(adverts[-1]))
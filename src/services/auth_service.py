@@ -1,7 +1,13 @@
 from abc import ABC, abstractmethod
 from models.user import User
 from abstract_repositories.iuser_repository import IUserRepository
-from core.create_jwt import JWTManager
+import asyncio
+import time
+
+from core.create_jwt import ACCESS_TOKEN_EXPIRE_MINUTES, JWTManager
+from services.password_hasher import PasswordHasher, password_hasher
+from services.revocation_store import RevocationStore
+from services.token_cache import TokenCache
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
@@ -21,9 +27,14 @@ class IAuthService(ABC):
 
 
 class AuthService(IAuthService):
-    def __init__(self, user_repo: IUserRepository):
+    def __init__(self, user_repo: IUserRepository, token_cache: Optional[TokenCache] = None,
+                 revocations: Optional[RevocationStore] = None, hasher: Optional[PasswordHasher] = None):
         self.user_repo = user_repo
-        self.invalidated_tokens: set[str] = set()
+        self.token_cache = token_cache or TokenCache(max_entries=0)
+        # Отзывы хранятся до exp токена; без общего хранилища — только в памяти этого процесса
+        self.revocations = revocations or RevocationStore(directory=None)
+        # Хэширование и проверка пароля идут в пуле потоков и не блокируют цикл событий
+        self.hasher = hasher or password_hasher
 
     async def register(self, db: AsyncSession, user: dict) -> Optional[User]:
 
@@ -32,22 +43,36 @@ class AuthService(IAuthService):
         if user["password"] != user["repeat_password"]:
             raise ValueError("Passwords didn't matched!")
 
-        user_create = User(**user)
-        print(user_create)
+        user_create = User(**{**user, "password": await self.hasher.hash(user["password"])})
         return await self.user_repo.create(user_create)
 
     async def login(self, db: AsyncSession, email: str, password: str) -> str:
         user = await self.user_repo.find_by_email(email)
-        if user and user.password == password:
-            return JWTManager.create_access_token({"sub": user.email, "id": str(user.id), "role": "authorized_user"})
+        if user is None:
+            await self.hasher.verify_dummy(password)
+            raise ValueError("Invalid credentials")
+        if not await self.hasher.verify(password, user.password):
+            raise ValueError("Invalid credentials")
 
-        raise ValueError("Invalid credentials")
+        if self.hasher.needs_rehash(user.password):
+            # Пароль открытым текстом или хэш со старой стоимостью: пароль сейчас известен,
+            # поэтому хэш обновляется незаметно для пользователя. Неудача не мешает входу
+            await self.user_repo.update_password(user.id, await self.hasher.hash(password))
+        return JWTManager.create_access_token({"sub": user.email, "id": str(user.id), "role": "authorized_user"})
 
     async def logout(self, token: str) -> bool:
-        self.invalidated_tokens.add(token)
+        try:
+            claims = self.token_cache.decode(token)
+        except ValueError:
+            # Невалидный или просроченный токен и так не пройдёт проверку
+            return False
+        expires_at = claims.get("exp") or time.time() + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        # Запись в общее хранилище ждёт файловую блокировку и SQLite — не в цикле событий
+        await asyncio.to_thread(self.revocations.revoke, token, float(expires_at))
+        self.token_cache.revoke(token)
         return True
 
     def verify_token(self, token: str) -> dict:
-        if token in self.invalidated_tokens:
+        if self.revocations.is_revoked(token):
             raise ValueError("Token revoked")
-        return JWTManager.decode_token(token)
+        return self.token_cache.decode(token)
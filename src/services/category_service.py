@@ -1,9 +1,86 @@
+import asyncio
+import contextvars
+import os
+import time
 from abc import ABC, abstractmethod
 from models.category import Category
 from abstract_repositories.icategory_repository import ICategoryRepository
 from uuid import UUID
 
-from typing import List
+from typing import Awaitable, Callable, Dict, List, Optional
+
+CATEGORY_CACHE_TTL = float(os.getenv("CATEGORY_CACHE_TTL", "300"))
+
+
+class CategoryCache:
+    """
+    Кэш категорий на весь процесс: список категорий и словарь id -> name с TTL.
+    Одновременные промахи на холодном старте ждут одну и ту же загрузку. Она идёт в своей задаче
+    с пустым контекстом и переживает запрос, который её начал, поэтому loader не должен полагаться
+    на сессию этого запроса — сервис-локатор даёт ему собственную.
+    """
+
+    def __init__(self, ttl: float = CATEGORY_CACHE_TTL, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._categories: List[Category] = []
+        self._names: Dict[UUID, str] = {}
+        self._expires_at = 0.0
+        self._generation = 0
+        self._loading: Optional[asyncio.Future] = None
+
+    def is_fresh(self) -> bool:
+        return self._clock() < self._expires_at
+
+    def invalidate(self) -> None:
+        self._categories = []
+        self._names = {}
+        self._expires_at = 0.0
+        self._generation += 1
+        # Загрузка, начатая до сброса, может вернуть старые данные: следующий промах начнёт новую
+        self._loading = None
+
+    async def get_all(self, loader: Callable[[], Awaitable[List[Category]]]) -> List[Category]:
+        if not self.is_fresh():
+            await self._load(loader)
+        return self._categories
+
+    async def get_names(self, loader: Callable[[], Awaitable[List[Category]]]) -> Dict[UUID, str]:
+        if not self.is_fresh():
+            await self._load(loader)
+        return self._names
+
+    async def _load(self, loader: Callable[[], Awaitable[List[Category]]]) -> None:
+        while True:
+            generation = self._generation
+            loading = self._loading
+            if loading is None or loading.get_loop() is not asyncio.get_running_loop():
+                loading = asyncio.get_running_loop().create_task(
+                    self._fill(loader, generation), context=contextvars.Context()
+                )
+                self._loading = loading
+            # shield: отмена одного ожидающего запроса не прерывает общую загрузку
+            await asyncio.shield(loading)
+            # Кэш сбросили, пока шла загрузка: её результат отброшен, нужна новая
+            if generation == self._generation or self.is_fresh():
+                return
+
+    async def _fill(self, loader: Callable[[], Awaitable[List[Category]]], generation: int) -> None:
+        try:
+            categories = await loader()
+            # Пустой список обычно означает ошибку БД в репозитории, его не кэшируем
+            if categories and generation == self._generation:
+                self._categories = categories
+                self._names = {category.id: category.name for category in categories}
+                self._expires_at = self._clock() + self.ttl
+        finally:
+            # После сброса _loading уже принадлежит новой загрузке
+            if generation == self._generation:
+                self._loading = None
+
+
+# Общий кэш процесса, его передаёт в CategoryService сервис-локатор
+category_cache = CategoryCache()
 
 
 class ICategoryService(ABC):
@@ -13,16 +90,30 @@ class ICategoryService(ABC):
     @abstractmethod
     async def get_name_by_id(self, id_category: UUID) -> str: ...
 
+    @abstractmethod
+    def invalidate_cache(self) -> None: ...
+
 
 
 class CategoryService(ICategoryService):
-    def __init__(self, category_repo: ICategoryRepository):
+    def __init__(self, category_repo: ICategoryRepository, cache: Optional[CategoryCache] = None,
+                 loader: Optional[Callable[[], Awaitable[List[Category]]]] = None):
         self.cat_repo = category_repo
+        self.cache = cache if cache is not None else CategoryCache()
+        # Загрузка списка в кэш; по умолчанию — через сессию репозитория
+        self.loader = loader if loader is not None else category_repo.get_all
         self.invalidated_tokens: set[str] = set()
 
     async def get_all(self) -> List[Category]:
-        return await self.cat_repo.get_all()
+        return await self.cache.get_all(self.loader)
 
     async def get_name_by_id(self, id_category: UUID) -> str:
+        names = await self.cache.get_names(self.loader)
+        name = names.get(id_category)
+        if name is not None:
+            return name
+        # Категория могла появиться после загрузки кэша
         return await self.cat_repo.get_name_by_id(id_category)
 
+    def invalidate_cache(self) -> None:
+        self.cache.invalidate()
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Set
 from models.deal import Deal
 from models.advert import Advert
 from abstract_repositories.ideal_repository import IDealRepository
@@ -18,6 +18,12 @@ class IDealsService(ABC):
     @abstractmethod
     async def is_bought(self, advert_id: UUID) -> bool: ...
 
+    @abstractmethod
+    async def is_in_deals_many(self, user_id: UUID, advert_ids: List[UUID]) -> Set[UUID]: ...
+
+    @abstractmethod
+    async def is_bought_many(self, advert_ids: List[UUID]) -> Set[UUID]: ...
+
 class DealsService(IDealsService):
     def __init__(self, repo: IDealRepository):
         self.repo = repo
@@ -36,23 +42,8 @@ class DealsService(IDealsService):
     async def is_bought(self, advert_id: UUID) -> bool:
         return await self.repo.is_bought(advert_id)
 
+    async def is_in_deals_many(self, user_id: UUID, advert_ids: List[UUID]) -> Set[UUID]:
+        return await self.repo.is_in_deals_many(user_id, advert_ids)
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    async def is_bought_many(self, advert_ids: List[UUID]) -> Set[UUID]:
+        return await self.repo.is_bought_many(advert_ids)
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Set
 from models.liked import Liked
 from models.advert import Advert
 from abstract_repositories.iliked_repository import ILikedRepository
@@ -19,6 +19,9 @@ class ILikedService(ABC):
     @abstractmethod
     async def is_liked(self, user_id: UUID, advert_id: UUID) -> bool: ...
 
+    @abstractmethod
+    async def is_liked_many(self, user_id: UUID, advert_ids: List[UUID]) -> Set[UUID]: ...
+
 class LikedService(ILikedService):
     def __init__(self, repo: ILikedRepository):
         self.repo = repo
@@ -37,24 +40,5 @@ class LikedService(ILikedService):
     async def is_liked(self, user_id: UUID, advert_id: UUID) -> bool:
         return await self.repo.is_liked(user_id, advert_id)
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    async def is_liked_many(self, user_id: UUID, advert_ids: List[UUID]) -> Set[UUID]:
+        return await self.repo.is_liked_many(user_id, advert_ids)
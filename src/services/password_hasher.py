@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+# Стоимость scrypt: N (степень двойки) — время и память, r — размер блока, p — параллелизм.
+# Память на одно хэширование ≈ 128 * N * r байт (16 МиБ при значениях по умолчанию)
+PASSWORD_HASH_N = int(os.getenv("PASSWORD_HASH_N", "16384"))
+PASSWORD_HASH_R = int(os.getenv("PASSWORD_HASH_R", "8"))
+PASSWORD_HASH_P = int(os.getenv("PASSWORD_HASH_P", "1"))
+# Потоков пула; одновременно считается не больше хэшей, чем потоков, остальные ждут в очереди пула
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_SCHEME = "scrypt"
+_SALT_BYTES = 16
+_KEY_BYTES = 32
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+class PasswordHasher:
+    """
+    Хэширование паролей scrypt в пуле потоков.
+
+    hashlib.scrypt отпускает GIL на время вычисления, поэтому потоков достаточно: цикл событий
+    не стоит, пока считается хэш, а пул ограничивает число одновременно занятых ядер и памяти.
+    Хэш хранится строкой "scrypt$N$r$p$соль$ключ" — параметры записаны рядом с ним, и после
+    увеличения стоимости старые хэши по-прежнему проверяются, а needs_rehash подсказывает их обновить.
+    Строка без префикса scrypt$ — пароль, сохранённый до хэширования, открытым текстом.
+    """
+
+    def __init__(self, n: int = PASSWORD_HASH_N, r: int = PASSWORD_HASH_R, p: int = PASSWORD_HASH_P,
+                 workers: int = PASSWORD_HASH_WORKERS) -> None:
+        if n < 2 or n & (n - 1):
+            raise ValueError("PASSWORD_HASH_N must be a power of two greater than 1")
+        self.n, self.r, self.p = n, r, p
+        self.workers = max(workers, 1)
+        self._pid: Optional[int] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dummy: Optional[str] = None
+        self.hashes = 0
+        self.verifications = 0
+        self.in_flight = 0
+        self.busy_seconds = 0.0
+
+    # ---- синхронные операции (выполняются в пуле)
+
+    def _derive(self, password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r * p + 1024 * 1024, dklen=_KEY_BYTES)
+
+    def hash_sync(self, password: str) -> str:
+        salt = os.urandom(_SALT_BYTES)
+        key = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{_SCHEME}${self.n}${self.r}${self.p}${_b64encode(salt)}${_b64encode(key)}"
+
+    def verify_sync(self, password: str, encoded: str) -> bool:
+        if not encoded.startswith(_SCHEME + "$"):
+            return hmac.compare_digest(password.encode(), encoded.encode())
+        try:
+            _, n, r, p, salt, key = encoded.split("$")
+            expected = _b64decode(key)
+            actual = self._derive(password, _b64decode(salt), int(n), int(r), int(p))
+        except ValueError:
+            return False
+        return hmac.compare_digest(actual, expected)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        """
+        True для пароля открытым текстом и для хэша с параметрами, отличными от текущих.
+        """
+        return not encoded.startswith(f"{_SCHEME}${self.n}${self.r}${self.p}$")
+
+    # ---- асинхронные обёртки
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Потоки не переживают fork: у каждого воркера uvicorn свой пул
+        if self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            self._pid = os.getpid()
+        return self._executor
+
+    def _timed(self, func: Any, *args: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), self._timed, func, *args)
+        finally:
+            self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        self.hashes += 1
+        return await self._run(self.hash_sync, password)
+
+    async def verify(self, password: str, encoded: str) -> bool:
+        self.verifications += 1
+        if not encoded.startswith(_SCHEME + "$"):
+            # Сравнение открытого текста дешёвое, пул для него не нужен
+            return self.verify_sync(password, encoded)
+        return await self._run(self.verify_sync, password, encoded)
+
+    async def verify_dummy(self, password: str) -> None:
+        """
+        Проверка против случайного хэша для несуществующего email: время ответа такое же,
+        как при неверном пароле, и по нему нельзя узнать, зарегистрирован ли адрес.
+        """
+        if self._dummy is None:
+            self._dummy = await self._run(self.hash_sync, os.urandom(_SALT_BYTES).hex())
+        await self.verify(password, self._dummy)
+
+    def shutdown(self) -> None:
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor, self._pid = None, None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "scheme": f"{_SCHEME}(n={self.n}, r={self.r}, p={self.p})",
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "hashes": self.hashes,
+            "verifications": self.verifications,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+password_hasher = PasswordHasher()
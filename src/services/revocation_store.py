@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import sqlite3
+import stat
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+from urllib.parse import quote
+
+# Каталог общий для всех воркеров uvicorn на хосте: в нём SQLite-файл отзывов и файл фильтра Блума.
+# Он должен принадлежать пользователю приложения и быть закрыт на запись остальным (проверяет _open)
+REVOCATION_DIR = os.getenv(
+    "REVOCATION_DIR", os.path.join(tempfile.gettempdir(), f"adverts-revocations-{os.getuid()}")
+)
+# Сколько одновременно отозванных токенов фильтр держит с заданной долей ложных срабатываний
+REVOCATION_CAPACITY = int(os.getenv("REVOCATION_CAPACITY", "100000"))
+REVOCATION_ERROR_RATE = float(os.getenv("REVOCATION_ERROR_RATE", "0.01"))
+REVOCATION_PURGE_INTERVAL = float(os.getenv("REVOCATION_PURGE_INTERVAL", "60"))
+
+# Заголовок файла фильтра: число бит, число хэш-функций, сколько токенов добавлено с последней пересборки
+_HEADER = struct.Struct("<QQQ")
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+class BloomFilter:
+    """
+    Фильтр Блума поверх произвольного изменяемого буфера (bytearray или mmap).
+    Позиции бит — двойное хэширование по первым 16 байтам SHA-256 токена.
+    """
+
+    def __init__(self, buffer: Any, bits: int, hashes: int, offset: int = 0) -> None:
+        self.buffer = buffer
+        self.bits = bits
+        self.hashes = hashes
+        self.offset = offset
+
+    @staticmethod
+    def size_for(capacity: int, error_rate: float) -> tuple[int, int]:
+        """
+        Число бит и хэш-функций для capacity элементов с долей ложных срабатываний error_rate.
+        """
+        bits = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 64)
+        bits = (bits + 7) // 8 * 8
+        hashes = max(round(bits / capacity * math.log(2)), 1)
+        return bits, hashes
+
+    def _positions(self, digest: bytes) -> Iterator[int]:
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def add(self, digest: bytes) -> None:
+        buffer, offset = self.buffer, self.offset
+        for position in self._positions(digest):
+            buffer[offset + (position >> 3)] |= 1 << (position & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        # Горячий путь проверки токена: без генератора, выход на первом нулевом бите
+        buffer, offset, bits = self.buffer, self.offset, self.bits
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % bits
+            if not buffer[offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def fill_ratio(self) -> float:
+        data = bytes(self.buffer[self.offset: self.offset + self.bits // 8])
+        return int.from_bytes(data, "little").bit_count() / self.bits
+
+
+class RevocationStore:
+    """
+    Отозванные токены с истечением, общие для процессов одного хоста.
+
+    Источник истины — SQLite-файл (sha256 токена, exp). Перед ним стоит фильтр Блума в
+    общем через mmap файле: отрицательный ответ фильтра (почти все запросы) не требует
+    обращения к SQLite и стоит пару микросекунд. Просроченные токены удаляются из SQLite,
+    и когда в фильтре накопилось заметно больше бит, чем живых отзывов, он пересобирается.
+
+    Добавление и пересборка идут под файловой блокировкой. Пересборка переписывает байты
+    фильтра новым содержимым, в котором биты живых отзывов тоже выставлены, поэтому
+    читающий процесс никогда не увидит сброшенным бит отозванного токена.
+
+    Каталог принимается, только если он принадлежит пользователю процесса и недоступен на запись
+    группе и остальным: иначе чужой процесс мог бы подложить свои файлы и снять отзыв токена.
+    revoke и purge блокируются на файловой блокировке и SQLite, из цикла событий их
+    вызывают через asyncio.to_thread; потоки одного процесса разделяет _mutex.
+    is_revoked вызывается прямо в цикле событий, поэтому _mutex не берёт: файлы открываются
+    заранее (_open в lifespan через to_thread), а SELECT идёт через своё соединение только
+    на чтение у каждого потока. В режиме WAL читатель не ждёт пишущего.
+
+    directory=None — хранилище только этого процесса (SQLite в памяти), для тестов и одного воркера.
+    """
+
+    def __init__(self, directory: Optional[str] = REVOCATION_DIR, capacity: int = REVOCATION_CAPACITY,
+                 error_rate: float = REVOCATION_ERROR_RATE, clock: Callable[[], float] = time.time) -> None:
+        self.directory = directory
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._clock = clock
+        self._pid: Optional[int] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._readers = threading.local()
+        self._bloom: Optional[BloomFilter] = None
+        self._map: Any = None
+        self._lock_fd: Optional[int] = None
+        # flock не разделяет потоки одного процесса, да и соединение SQLite у них общее
+        self._mutex = threading.RLock()
+        self.checks = 0
+        self.bloom_negatives = 0
+        self.false_positives = 0
+
+    # ---- открытие
+
+    def _open(self) -> None:
+        # Воркеры uvicorn могут быть форками: соединение SQLite и mmap открываются заново в каждом процессе
+        if self._pid == os.getpid():
+            return
+        with self._mutex:
+            if self._pid != os.getpid():
+                self._open_files()
+
+    def _check_directory(self) -> None:
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        info = os.lstat(self.directory)
+        if not stat.S_ISDIR(info.st_mode):
+            raise PermissionError(f"REVOCATION_DIR {self.directory} is not a directory")
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"REVOCATION_DIR {self.directory} is owned by another user")
+        if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            raise PermissionError(f"REVOCATION_DIR {self.directory} is writable by group or others")
+
+    def _open_files(self) -> None:
+        bits, hashes = BloomFilter.size_for(self.capacity, self.error_rate)
+        if self.directory is None:
+            self._db = sqlite3.connect(self._database_uri(), uri=True, isolation_level=None, check_same_thread=False)
+            self._map = bytearray(_HEADER.size + bits // 8)
+            _HEADER.pack_into(self._map, 0, bits, hashes, 0)
+        else:
+            self._check_directory()
+            self._lock_fd = os.open(os.path.join(self.directory, "lock"),
+                                    os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+            self._db = sqlite3.connect(self._database_uri(), uri=True, isolation_level=None,
+                                       check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            with self._locked():
+                self._map = self._map_bloom(bits, hashes)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS revoked (digest BLOB PRIMARY KEY, expires_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS revoked_expires_at ON revoked (expires_at)")
+        bits, hashes, _ = _HEADER.unpack_from(self._map, 0)
+        self._bloom = BloomFilter(self._map, bits, hashes, offset=_HEADER.size)
+        self._pid = os.getpid()
+
+    def _database_uri(self, read_only: bool = False) -> str:
+        if self.directory is None:
+            # Общий кэш, чтобы читающие соединения видели ту же базу в памяти
+            return f"file:revocations-{os.getpid()}-{id(self)}?mode=memory&cache=shared"
+        path = quote(os.path.join(self.directory, "revoked.sqlite3"))
+        return f"file:{path}?mode=ro" if read_only else f"file:{path}"
+
+    def _reader(self) -> sqlite3.Connection:
+        """
+        Соединение только на чтение для текущего потока: проверка токена не ждёт _mutex,
+        который revoke и purge держат на время файловой блокировки и записи в SQLite.
+        """
+        readers = self._readers
+        if getattr(readers, "pid", None) != self._pid:
+            readers.db = sqlite3.connect(self._database_uri(read_only=True), uri=True, isolation_level=None)
+            if self.directory is None:
+                # В общем кэше читатель иначе ждал бы табличной блокировки пишущего
+                readers.db.execute("PRAGMA read_uncommitted = 1")
+            readers.pid = self._pid
+        return readers.db
+
+    def _map_bloom(self, bits: int, hashes: int) -> mmap.mmap:
+        path = os.path.join(self.directory, "bloom")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        try:
+            size = os.fstat(fd).st_size
+            if size < _HEADER.size:
+                # Новый файл; если он уже создан другим воркером, берутся его размеры
+                os.ftruncate(fd, _HEADER.size + bits // 8)
+                os.pwrite(fd, _HEADER.pack(bits, hashes, 0), 0)
+            else:
+                bits, hashes, _ = _HEADER.unpack(os.pread(fd, _HEADER.size, 0))
+            return mmap.mmap(fd, _HEADER.size + bits // 8)
+        finally:
+            os.close(fd)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._mutex:
+            if self._lock_fd is None:
+                yield
+                return
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    # ---- операции
+
+    def revoke(self, token: str, expires_at: float) -> None:
+        """
+        Отзывает токен до expires_at (exp токена); после этого момента токен недействителен и так.
+        """
+        if expires_at <= self._clock():
+            return
+        self._open()
+        digest = token_digest(token)
+        with self._locked():
+            self._db.execute("INSERT OR REPLACE INTO revoked (digest, expires_at) VALUES (?, ?)", (digest, expires_at))
+            self._bloom.add(digest)
+            bits, hashes, inserted = _HEADER.unpack_from(self._map, 0)
+            _HEADER.pack_into(self._map, 0, bits, hashes, inserted + 1)
+        self.purge()
+
+    def is_revoked(self, token: str) -> bool:
+        self._open()
+        self.checks += 1
+        if not _HEADER.unpack_from(self._map, 0)[2]:
+            # Фильтр пуст: отозванных токенов нет, даже хэш считать не нужно
+            self.bloom_negatives += 1
+            return False
+        digest = token_digest(token)
+        if digest not in self._bloom:
+            self.bloom_negatives += 1
+            return False
+        row = self._reader().execute(
+            "SELECT 1 FROM revoked WHERE digest = ? AND expires_at > ?", (digest, self._clock()),
+        ).fetchone()
+        if row is None:
+            self.false_positives += 1
+        return row is not None
+
+    def purge(self) -> int:
+        """
+        Удаляет просроченные отзывы. Фильтр пересобирается, когда в нём вдвое больше токенов,
+        чем живых отзывов: иначе доля ложных срабатываний росла бы без предела.
+        """
+        self._open()
+        with self._locked():
+            removed = self._db.execute("DELETE FROM revoked WHERE expires_at <= ?", (self._clock(),)).rowcount
+            live = self._db.execute("SELECT count(*) FROM revoked").fetchone()[0]
+            inserted = _HEADER.unpack_from(self._map, 0)[2]
+            if inserted > 2 * live + 16:
+                self._rebuild(live)
+        return removed
+
+    def _rebuild(self, live: int) -> None:
+        bloom = self._bloom
+        fresh = BloomFilter(bytearray(bloom.bits // 8), bloom.bits, bloom.hashes)
+        for (digest,) in self._db.execute("SELECT digest FROM revoked"):
+            fresh.add(digest)
+        self._map[_HEADER.size:] = fresh.buffer
+        _HEADER.pack_into(self._map, 0, bloom.bits, bloom.hashes, live)
+
+    async def purge_periodically(self, interval: float = REVOCATION_PURGE_INTERVAL) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.purge)
+
+    def stats(self) -> Dict[str, Any]:
+        self._open()
+        bits, hashes, inserted = _HEADER.unpack_from(self._map, 0)
+        revoked = self._reader().execute("SELECT count(*) FROM revoked").fetchone()[0]
+        return {
+            "shared": self.directory is not None,
+            "revoked": revoked,
+            "bloom_bits": bits,
+            "bloom_hashes": hashes,
+            "bloom_inserted": inserted,
+            "bloom_fill": round(self._bloom.fill_ratio(), 4),
+            "checks": self.checks,
+            "bloom_negatives": self.bloom_negatives,
+            "false_positives": self.false_positives,
+        }
+
+
+revocation_store = RevocationStore()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Hashable, Optional, Tuple
+from uuid import UUID
+
+from core.lru_cache import LruCache
+from core.text import normalize_query
+from dto.page_dto import AdvertPage
+from models.advert import Advert
+from services.advert_service import IAdvertObserver
+
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "60"))
+
+# Накладные расходы на объявление в странице выдачи сверх длины текстов: UUID, даты, поля модели
+_ADVERT_OVERHEAD = 400
+_PAGE_OVERHEAD = 200
+
+
+def page_size_bytes(page: AdvertPage) -> int:
+    """
+    Оценка памяти, занимаемой страницей выдачи: тексты в UTF-8 плюс фиксированные накладные расходы.
+    """
+    size = _PAGE_OVERHEAD + len(page.next_cursor or "")
+    for advert in page.items:
+        size += _ADVERT_OVERHEAD + len(advert.content.encode()) + len(advert.description.encode())
+    for suggestion in page.suggestions:
+        size += len(suggestion.encode()) + 50
+    return size
+
+
+class SearchCache(IAdvertObserver):
+    """
+    Кэш страниц поисковой выдачи. Любое создание или удаление объявления может изменить
+    выдачу по многим запросам сразу, поэтому запись сбрасывает кэш целиком.
+    Кэш у каждого воркера свой: изменения, сделанные другим процессом, видны через TTL.
+    """
+
+    def __init__(self, max_bytes: int = SEARCH_CACHE_MAX_BYTES, ttl: float = SEARCH_CACHE_TTL, **kwargs: Any) -> None:
+        self.enabled = max_bytes > 0 and ttl > 0
+        self._cache: LruCache[Hashable, AdvertPage] = LruCache(max_bytes, ttl, sizeof=page_size_bytes, **kwargs)
+        # Растёт при каждом сбросе: выдача, посчитанная до записи, не попадёт в кэш после неё
+        self.generation = 0
+
+    @staticmethod
+    def key(query: str, mode: str, backend: Optional[str], cursor: Optional[str], page_size: int) -> Tuple[Any, ...]:
+        return normalize_query(query), mode, backend or "sql", cursor or "", page_size
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[AdvertPage]:
+        if not self.enabled:
+            return None
+        return self._cache.get(key)
+
+    def put(self, key: Tuple[Any, ...], page: AdvertPage, generation: Optional[int] = None) -> None:
+        if self.enabled and (generation is None or generation == self.generation):
+            self._cache.put(key, page)
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+        self.generation += 1
+
+    def on_advert_created(self, advert: Advert) -> None:
+        self.invalidate()
+
+    def on_advert_deleted(self, advert_id: UUID) -> None:
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "invalidations": self.generation, **self._cache.stats()}
+
+
+search_cache = SearchCache()
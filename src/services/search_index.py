@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import heapq
+import math
+import os
+import re
+from array import array
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
+
+from core.pagination import DEFAULT_PAGE_SIZE, Keyset, RankKeyset
+from models.advert import Advert, RankedAdvert
+from services.advert_service import IAdvertObserver
+
+# Бэкенд поиска по умолчанию: sql — запросы к PostgreSQL, memory — индекс в памяти процесса
+SEARCH_BACKENDS: Tuple[str, ...] = ("sql", "memory")
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "sql")
+SEARCH_INDEX_BUILD_PAGE = int(os.getenv("SEARCH_INDEX_BUILD_PAGE", "1000"))
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Разбивает текст на слова без учёта регистра; ё приравнивается к е.
+    Стемминга нет: словоформы различаются, как и в режиме pattern.
+    """
+    return _TOKEN_RE.findall(text.casefold().replace("ё", "е"))
+
+
+def _advert_tokens(advert: Advert) -> List[str]:
+    return tokenize(f"{advert.content} {advert.description}")
+
+
+class _Segment:
+    """
+    Данные индекса. Внутренние номера документов плотные, списки вхождений хранятся
+    в array('I') парами (номер документа, частота слова) — 8 байт на вхождение
+    вместо сотни с лишним у списка кортежей.
+    """
+
+    def __init__(self) -> None:
+        self.docs: List[Optional[Advert]] = []
+        self.doc_len = array("I")
+        self.by_id: Dict[UUID, int] = {}
+        self.postings: Dict[str, array] = {}
+        self.df: Dict[str, int] = {}
+        self.deleted: Set[int] = set()
+        self.total_len = 0
+
+    @property
+    def live(self) -> int:
+        return len(self.by_id)
+
+    def add(self, advert: Advert) -> None:
+        if advert.id is None or advert.id in self.by_id:
+            return
+        tokens = _advert_tokens(advert)
+        doc = len(self.docs)
+        self.docs.append(advert)
+        self.doc_len.append(len(tokens))
+        self.by_id[advert.id] = doc
+        self.total_len += len(tokens)
+
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = array("I")
+            postings.append(doc)
+            postings.append(tf)
+            self.df[token] = self.df.get(token, 0) + 1
+
+    def remove(self, advert_id: UUID) -> None:
+        """
+        Удаление — надгробие: вхождения вычищаются позже, при compact().
+        """
+        doc = self.by_id.pop(advert_id, None)
+        if doc is None:
+            return
+        advert = self.docs[doc]
+        self.docs[doc] = None
+        self.deleted.add(doc)
+        self.total_len -= self.doc_len[doc]
+        self.doc_len[doc] = 0
+        for token in set(_advert_tokens(advert)):
+            self.df[token] -= 1
+        if len(self.deleted) > max(256, self.live // 4):
+            self.compact()
+
+    def compact(self) -> None:
+        deleted = self.deleted
+        for token in list(self.postings):
+            if self.df.get(token, 0) <= 0:
+                del self.postings[token]
+                self.df.pop(token, None)
+                continue
+            old = self.postings[token]
+            fresh = array("I")
+            pairs = iter(old)
+            for doc, tf in zip(pairs, pairs):
+                if doc not in deleted:
+                    fresh.append(doc)
+                    fresh.append(tf)
+            self.postings[token] = fresh
+        self.deleted = set()
+
+    def memory_bytes(self) -> int:
+        return sum(p.itemsize * len(p) for p in self.postings.values()) + self.doc_len.itemsize * len(self.doc_len)
+
+
+class SearchIndex(IAdvertObserver):
+    """
+    Инвертированный индекс по content и description с ранжированием BM25.
+    Строится при старте потоково, страницами из репозитория, и дальше обновляется
+    событиями AdvertService. Индекс живёт в памяти одного процесса: при нескольких
+    воркерах каждый держит свою копию и видит только свои изменения.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.ready = False
+        self._segment = _Segment()
+        self._building = False
+        # События, пришедшие во время построения: применяются к новому сегменту после подмены
+        self._pending: List[Tuple[str, Any]] = []
+
+    def __len__(self) -> int:
+        return self._segment.live
+
+    async def build(self, fetch_page: Callable[[Optional[Keyset], int], Awaitable[List[Advert]]],
+                    page_size: int = SEARCH_INDEX_BUILD_PAGE) -> None:
+        """
+        Строит индекс заново, читая объявления keyset-страницами, и подменяет им текущий.
+        Пока идёт построение, поиск работает по старому индексу. Пустая страница — конец
+        таблицы; ошибку чтения fetch_page должна пробросить, тогда построение прерывается
+        и текущий индекс не меняется.
+        """
+        self._building = True
+        self._pending = []
+        segment = _Segment()
+        try:
+            after: Optional[Keyset] = None
+            while True:
+                page = await fetch_page(after, page_size)
+                for advert in page:
+                    segment.add(advert)
+                if len(page) < page_size:
+                    break
+                after = (page[-1].date_created, page[-1].id)
+
+            for event, payload in self._pending:
+                if event == "created":
+                    segment.add(payload)
+                else:
+                    segment.remove(payload)
+            self._segment = segment
+            self.ready = True
+        finally:
+            self._building = False
+            self._pending = []
+
+    def on_advert_created(self, advert: Advert) -> None:
+        if self._building:
+            self._pending.append(("created", advert))
+        if self.ready:
+            self._segment.add(advert)
+
+    def on_advert_deleted(self, advert_id: UUID) -> None:
+        if self._building:
+            self._pending.append(("deleted", advert_id))
+        if self.ready:
+            self._segment.remove(advert_id)
+
+    def search(self, query: str, after: Optional[RankKeyset] = None,
+               limit: int = DEFAULT_PAGE_SIZE) -> List[RankedAdvert]:
+        """
+        Объявления, содержащие хотя бы одно слово запроса, по убыванию BM25.
+        Страницы листаются тем же ключом (rank, id), что и SQL-поиск по релевантности.
+        """
+        segment = self._segment
+        terms = set(tokenize(query))
+        if not terms or segment.live == 0:
+            return []
+
+        n = segment.live
+        avg_len = segment.total_len / n or 1.0
+        k1, b = self.k1, self.b
+        # Постоянные части знаменателя BM25: k1 * (1 - b + b * len / avg_len)
+        norm_base, norm_len = k1 * (1 - b), k1 * b / avg_len
+        doc_len, deleted = segment.doc_len, segment.deleted
+        scores: Dict[int, float] = {}
+        for term in terms:
+            postings = segment.postings.get(term)
+            df = segment.df.get(term, 0)
+            if not postings or df <= 0:
+                continue
+            weight = math.log(1 + (n - df + 0.5) / (df + 0.5)) * (k1 + 1)
+            pairs = iter(postings)
+            for doc, tf in zip(pairs, pairs):
+                if deleted and doc in deleted:
+                    continue
+                scores[doc] = scores.get(doc, 0.0) + weight * tf / (tf + norm_base + norm_len * doc_len[doc])
+
+        candidates: Iterator[Tuple[float, UUID, int]] = (
+            (score, segment.docs[doc].id, doc) for doc, score in scores.items()
+        )
+        if after is not None:
+            candidates = (c for c in candidates if (c[0], c[1]) < after)
+        top = heapq.nlargest(limit, candidates, key=lambda c: (c[0], c[1]))
+        return [RankedAdvert(**segment.docs[doc].model_dump(), rank=score) for score, _, doc in top]
+
+    def stats(self) -> Dict[str, Any]:
+        segment = self._segment
+        return {
+            "ready": self.ready,
+            "building": self._building,
+            "documents": segment.live,
+            "terms": len(segment.postings),
+            "tombstones": len(segment.deleted),
+            "postings_bytes": segment.memory_bytes(),
+        }
+
+
+search_index = SearchIndex()
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import heapq
+import os
+from array import array
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from core.pagination import Keyset
+from core.text import normalize_query
+from models.advert import Advert
+from services.advert_service import IAdvertObserver
+
+SUGGEST_LIMIT = 8
+# Длиннее этого заголовки в дерево не попадают: хвост длинного заголовка как подсказка не нужен,
+# а узлы на каждый символ — основной расход памяти
+SUGGEST_MAX_KEY = int(os.getenv("SUGGEST_MAX_KEY", "48"))
+SUGGEST_BUILD_PAGE = int(os.getenv("SUGGEST_BUILD_PAGE", "1000"))
+# Запрос пользователя становится подсказкой после стольких успешных повторов
+SUGGEST_QUERY_MIN_COUNT = int(os.getenv("SUGGEST_QUERY_MIN_COUNT", "3"))
+# Предел запросов-подсказок и кандидатов в них (каждого вида отдельно)
+SUGGEST_MAX_QUERIES = int(os.getenv("SUGGEST_MAX_QUERIES", "10000"))
+# Предел узлов дерева: 24 байта на узел, 2 млн — около 48 МиБ
+SUGGEST_MAX_NODES = int(os.getenv("SUGGEST_MAX_NODES", "2000000"))
+# Период перестройки дерева, с: веса запросов при ней делятся пополам; 0 — без перестройки
+SUGGEST_REBUILD_INTERVAL = float(os.getenv("SUGGEST_REBUILD_INTERVAL", "3600"))
+
+_NONE = -1
+
+
+class SuggestTrie(IAdvertObserver):
+    """
+    Префиксное дерево подсказок с весами. Узлы хранятся в параллельных массивах array
+    (символ, первый потомок, следующий брат, вес, максимум веса в поддереве, номер текста) —
+    24 байта на узел вместо объекта со словарём потомков.
+    Веса только растут, поэтому максимум поддерева поддерживается при вставке за один проход.
+
+    Запросы пользователей попадают в дерево не сразу: сначала они считаются кандидатами
+    и становятся подсказками после min_count повторов. Число запросов и узлов ограничено,
+    а rebuild() периодически собирает дерево заново — с вдвое меньшими весами запросов,
+    так что редкие запросы со временем из него уходят.
+    """
+
+    def __init__(self, max_key: int = SUGGEST_MAX_KEY, min_count: int = SUGGEST_QUERY_MIN_COUNT,
+                 max_queries: int = SUGGEST_MAX_QUERIES, max_nodes: int = SUGGEST_MAX_NODES) -> None:
+        self.max_key = max_key
+        self.min_count = max(min_count, 1)
+        self.max_queries = max_queries
+        self.max_nodes = max_nodes
+        self.ready = False
+        self.dropped = 0
+        # Ключ запроса -> [текст, вес] для принятых запросов и число повторов для кандидатов
+        self._queries: Dict[str, List[Any]] = {}
+        self._candidates: Dict[str, int] = {}
+        # Дерево, которое собирает rebuild(): новые объявления добавляются и в него
+        self._next: Optional[SuggestTrie] = None
+        self._char = array("I", [0])
+        self._first_child = array("i", [_NONE])
+        self._next_sibling = array("i", [_NONE])
+        self._weight = array("I", [0])
+        self._best = array("I", [0])
+        self._text = array("i", [_NONE])
+        # Отображаемый текст подсказки: первый встретившийся вариант написания
+        self._texts: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    @property
+    def nodes(self) -> int:
+        return len(self._char)
+
+    def add(self, text: str, weight: int = 1) -> None:
+        key = normalize_query(text)[: self.max_key]
+        if not key or weight <= 0:
+            return
+
+        node = 0
+        path = [0]
+        for ch in key:
+            node = self._child(node, ord(ch), create=self.nodes < self.max_nodes)
+            if node == _NONE:
+                self.dropped += 1
+                return
+            path.append(node)
+
+        if self._text[node] == _NONE:
+            self._text[node] = len(self._texts)
+            self._texts.append(" ".join(text.split())[: self.max_key])
+        total = self._weight[node] + weight
+        self._weight[node] = total
+        for visited in path:
+            if self._best[visited] < total:
+                self._best[visited] = total
+
+    def add_query(self, text: str) -> None:
+        """
+        Учитывает успешный поисковый запрос. Подсказкой он становится после min_count повторов,
+        пока запросов-подсказок меньше max_queries.
+        """
+        key = normalize_query(text)[: self.max_key]
+        if not key:
+            return
+        accepted = self._queries.get(key)
+        if accepted is not None:
+            accepted[1] += 1
+            self.add(text)
+            return
+
+        count = self._candidates.get(key, 0) + 1
+        if count >= self.min_count and len(self._queries) < self.max_queries:
+            self._candidates.pop(key, None)
+            self._queries[key] = [text, count]
+            self.add(text, count)
+            return
+        if key not in self._candidates and len(self._candidates) >= self.max_queries:
+            self._decay_candidates()
+            if len(self._candidates) >= self.max_queries:
+                return
+        self._candidates[key] = count
+
+    def _decay_candidates(self) -> None:
+        self._candidates = {key: count // 2 for key, count in self._candidates.items() if count > 1}
+
+    def complete(self, prefix: str, limit: int = SUGGEST_LIMIT) -> List[str]:
+        """
+        До limit подсказок, начинающихся с prefix, по убыванию веса.
+        Обход "лучший первым" по максимуму поддерева: просматриваются только ветви,
+        в которых ещё может найтись подсказка тяжелее уже найденных.
+        """
+        key = normalize_query(prefix)
+        if not key or limit <= 0:
+            return []
+        node = 0
+        for ch in key[: self.max_key]:
+            node = self._child(node, ord(ch))
+            if node == _NONE:
+                return []
+
+        weight, best, first_child, next_sibling = self._weight, self._best, self._first_child, self._next_sibling
+        result: List[str] = []
+        # (-вес, узел, терминал?): терминал выдаётся, когда тяжелее него в очереди ничего не осталось
+        heap: List[Tuple[int, int, bool]] = [(-best[node], node, False)]
+        while heap and len(result) < limit:
+            _, current, terminal = heapq.heappop(heap)
+            if terminal:
+                result.append(self._texts[self._text[current]])
+                continue
+            if weight[current]:
+                heapq.heappush(heap, (-weight[current], current, True))
+            child = first_child[current]
+            while child != _NONE:
+                heapq.heappush(heap, (-best[child], child, False))
+                child = next_sibling[child]
+        return result
+
+    def _child(self, node: int, code: int, create: bool = False) -> int:
+        child = self._first_child[node]
+        while child != _NONE:
+            if self._char[child] == code:
+                return child
+            child = self._next_sibling[child]
+        if not create:
+            return _NONE
+
+        child = len(self._char)
+        self._char.append(code)
+        self._first_child.append(_NONE)
+        self._next_sibling.append(self._first_child[node])
+        self._weight.append(0)
+        self._best.append(0)
+        self._text.append(_NONE)
+        self._first_child[node] = child
+        return child
+
+    async def build(self, fetch_page: Callable[[Optional[Keyset], int], Awaitable[List[Advert]]],
+                    page_size: int = SUGGEST_BUILD_PAGE) -> None:
+        """
+        Наполняет дерево заголовками всех объявлений, читая их keyset-страницами.
+        Дерево только дополняется, поэтому подсказки доступны уже во время построения,
+        а объявления, созданные в это время, просто добавляются событием. Если fetch_page
+        пробросит ошибку, ready останется False.
+        """
+        after: Optional[Keyset] = None
+        while True:
+            page = await fetch_page(after, page_size)
+            for advert in page:
+                self.add(advert.content)
+            if len(page) < page_size:
+                break
+            after = (page[-1].date_created, page[-1].id)
+        self.ready = True
+
+    async def rebuild(self, fetch_page: Callable[[Optional[Keyset], int], Awaitable[List[Advert]]],
+                      page_size: int = SUGGEST_BUILD_PAGE) -> None:
+        """
+        Собирает дерево заново из заголовков и принятых запросов и подменяет им текущее.
+        Веса запросов делятся пополам, обнулившиеся запросы удаляются, кандидаты тоже стареют;
+        узлы, оставшиеся только от ушедших запросов, освобождаются. Пока идёт сборка,
+        подсказки выдаёт текущее дерево; при ошибке чтения оно остаётся как есть.
+        """
+        fresh = SuggestTrie(self.max_key, self.min_count, self.max_queries, self.max_nodes)
+        self._next = fresh
+        try:
+            await fresh.build(fetch_page, page_size)
+        finally:
+            self._next = None
+
+        queries = {}
+        for key, (text, weight) in self._queries.items():
+            if weight // 2:
+                queries[key] = [text, weight // 2]
+                fresh.add(text, weight // 2)
+        self._char, self._first_child, self._next_sibling = fresh._char, fresh._first_child, fresh._next_sibling
+        self._weight, self._best, self._text, self._texts = fresh._weight, fresh._best, fresh._text, fresh._texts
+        self._queries = queries
+        self._decay_candidates()
+        self.ready = True
+
+    def on_advert_created(self, advert: Advert) -> None:
+        self.add(advert.content)
+        if self._next is not None:
+            self._next.add(advert.content)
+
+    def on_advert_deleted(self, advert_id: UUID) -> None:
+        # Веса в дереве только растут; заголовок удалённого объявления остаётся подсказкой,
+        # поиск по ней найдёт похожие объявления
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        arrays = (self._char, self._first_child, self._next_sibling, self._weight, self._best, self._text)
+        return {
+            "ready": self.ready,
+            "suggestions": len(self._texts),
+            "queries": len(self._queries),
+            "candidates": len(self._candidates),
+            "dropped": self.dropped,
+            "nodes": self.nodes,
+            "nodes_bytes": sum(a.itemsize * len(a) for a in arrays),
+        }
+
+
+suggest_trie = SuggestTrie()
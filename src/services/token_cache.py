@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from core.create_jwt import JWTManager
+from core.lru_cache import LruCache
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+
+class TokenCache:
+    """
+    Кэш проверенных JWT: токен -> claims. Запись живёт до exp токена, поэтому просроченный
+    токен из кэша не выдаётся. Невалидные токены не кэшируются: иначе поток мусорных cookie
+    вытеснил бы настоящие сессии. Время — по часам, с которыми сравнивается exp (time.time).
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE,
+                 decode: Callable[[str], Dict[str, Any]] = JWTManager.decode_token,
+                 clock: Callable[[], float] = time.time) -> None:
+        self.enabled = max_entries > 0
+        self._decode = decode
+        self._clock = clock
+        # Ограничение по числу записей: размер claims почти одинаков, байты считать незачем
+        self._cache: LruCache[str, Dict[str, Any]] = LruCache(
+            max_bytes=max_entries, ttl=0, sizeof=lambda _: 1, max_entries=max_entries, clock=clock,
+        )
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Claims токена; при промахе — полная проверка подписи и срока. ValueError для невалидного токена.
+        """
+        claims: Optional[Dict[str, Any]] = self._cache.get(token) if self.enabled else None
+        if claims is not None:
+            return claims
+        claims = self._decode(token)
+        exp = claims.get("exp")
+        if self.enabled and exp is not None:
+            self._cache.put(token, claims, ttl=float(exp) - self._clock())
+        return claims
+
+    def revoke(self, token: str) -> None:
+        self._cache.pop(token)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats.pop("bytes")
+        stats.pop("max_bytes")
+        return {"enabled": self.enabled, **stats}
+
+
+token_cache = TokenCache()
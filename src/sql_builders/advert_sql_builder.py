@@ -1,19 +1,163 @@
 from __future__ import annotations
 from datetime import datetime
+from typing import Any, List, Optional, Tuple
 from uuid import UUID
-from sqlalchemy import text
 from models.advert import Advert
+from dto.filter_dto import PRICE_BUCKETS, AdvertFilter
 from i_sql_builders.iadvert_sql_builder import IAdvertSqlBuilder
 from i_sql_builders.sql_types.sql_types import TextAndParams, SqlParams
+from core.pagination import DEFAULT_PAGE_SIZE, Keyset, RankKeyset
+from sql_builders.statement_registry import statements
+
+# Явный список колонок: в таблице есть служебный search_vector, гонять его клиенту незачем
+_COLUMNS = "id, content, description, id_category, price, id_seller, date_created"
+
+_CREATE = statements.register("adverts.create", f"""
+    INSERT INTO adv_uuid.adverts (content, description, id_category, price, id_seller)
+    VALUES (:content, :description, :id_category, :price, :id_seller)
+    RETURNING {_COLUMNS}
+""")
+_GET_BY_ID = statements.register("adverts.get_by_id", f"SELECT {_COLUMNS} FROM adv_uuid.adverts WHERE id = :id")
+_GET_ALL = statements.register("adverts.get_all", f"SELECT {_COLUMNS} FROM adv_uuid.adverts ORDER BY date_created DESC")
+_GET_BY_USER = statements.register(
+    "adverts.get_by_user",
+    f"SELECT {_COLUMNS} FROM adv_uuid.adverts WHERE id_seller = :user_id ORDER BY date_created DESC",
+)
+_IS_CREATED = statements.register(
+    "adverts.is_created",
+    "SELECT 1 FROM adv_uuid.adverts WHERE id_seller = :uid AND id = :aid LIMIT 1",
+)
+_SEARCH_BY_KEYWORD = statements.register("adverts.search_by_keyword", f"SELECT {_COLUMNS} FROM adv_uuid.search_adverts(:kw)")
+_FILTER_BY_DATES = statements.register("adverts.filter_by_dates", f"""
+    SELECT {_COLUMNS} FROM adv_uuid.adverts
+    WHERE date_created BETWEEN :begin_time AND :end_time
+    ORDER BY date_created DESC
+""")
+_BY_CATEGORY = statements.register(
+    "adverts.by_category",
+    f"SELECT {_COLUMNS} FROM adv_uuid.adverts WHERE id_category = :category_id ORDER BY date_created DESC",
+)
+_DELETE = statements.register(
+    "adverts.delete",
+    "DELETE FROM adv_uuid.adverts WHERE id = :advert_id AND id_seller = :user_id",
+)
+_FEED_DETAILS_ANONYMOUS = statements.register("adverts.feed_details_anonymous", """
+    SELECT a.id, c.name AS category_name
+    FROM adv_uuid.adverts a
+    LEFT JOIN adv_uuid.categories c ON c.id = a.id_category
+    WHERE a.id = ANY(:ids)
+""")
+_FEED_DETAILS = statements.register("adverts.feed_details", """
+    SELECT a.id,
+           c.name AS category_name,
+           a.id_seller = :uid AS is_created,
+           EXISTS (
+               SELECT 1 FROM adv_uuid.likes l
+               WHERE l.id_customer = :uid AND l.id_advert = a.id
+           ) AS is_favorite,
+           EXISTS (
+               SELECT 1 FROM adv_uuid.deals d
+               WHERE d.id_customer = :uid AND d.id_advert = a.id
+           ) AS is_bought,
+           EXISTS (
+               SELECT 1 FROM adv_uuid.deals d
+               WHERE d.id_advert = a.id
+           ) AS is_really_bought
+    FROM adv_uuid.adverts a
+    LEFT JOIN adv_uuid.categories c ON c.id = a.id_category
+    WHERE a.id = ANY(:ids)
+""")
+_IS_CREATED_MANY = statements.register(
+    "adverts.is_created_many",
+    "SELECT id FROM adv_uuid.adverts WHERE id_seller = :uid AND id = ANY(:ids)",
+)
+
+# Полнотекстовый поиск по adverts.search_vector (migrations/0001_adverts_fulltext.sql).
+# Запрос разбирается обоими словарями, чтобы находились и русские, и английские словоформы;
+# отбор идёт по GIN-индексу, ранжирование — ts_rank_cd только по найденным строкам.
+_FULLTEXT_BASE = f"""
+    WITH q AS (
+        SELECT websearch_to_tsquery('russian', :query) || websearch_to_tsquery('english', :query) AS tsq
+    ), ranked AS (
+        SELECT {_COLUMNS}, ts_rank_cd(a.search_vector, q.tsq) AS rank
+        FROM adv_uuid.adverts a, q
+        WHERE a.search_vector @@ q.tsq
+    )
+    SELECT * FROM ranked
+"""
+
+# Нечёткий поиск по триграммам (migrations/0002_adverts_trigram.sql). Оператор <% отбирает строки
+# по GIN-индексу с порогом pg_trgm.word_similarity_threshold, явное сравнение с :threshold
+# страхует от соединений, где порог не выставлен.
+_FUZZY_BASE = f"""
+    WITH ranked AS (
+        SELECT {_COLUMNS}, word_similarity(:query, content) AS rank
+        FROM adv_uuid.adverts
+        WHERE :query <% content AND word_similarity(:query, content) >= :threshold
+    )
+    SELECT * FROM ranked
+"""
+_SUGGEST_SIMILAR = statements.register("adverts.suggest_similar", """
+    SELECT content
+    FROM adv_uuid.adverts
+    WHERE :query <% content
+    GROUP BY content
+    ORDER BY word_similarity(:query, content) DESC
+    LIMIT :limit
+""")
+
+# Сортировки комбинированного фильтра: колонка ключа и направление
+_FILTER_SORTS = {
+    "newest": ("date_created", "DESC"),
+    "oldest": ("date_created", "ASC"),
+    "price_asc": ("price", "ASC"),
+    "price_desc": ("price", "DESC"),
+}
+
+
+def _where(conditions: List[str]) -> str:
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+
+def _keyset_page(name: str, base_sql: str, params: SqlParams, after: Optional[Keyset], limit: int,
+                 has_where: bool = False) -> TextAndParams:
+    """
+    Дописывает к выборке объявлений keyset-условие по (date_created, id) и LIMIT.
+    Условие совпадает с порядком сортировки, поэтому страница читается по индексу,
+    а не пропуском OFFSET строк.
+    """
+    sql = base_sql
+    page_params: SqlParams = dict(params)
+    if after is not None:
+        name += ".after"
+        sql += " AND" if has_where else " WHERE"
+        sql += " (date_created, id) < (:after_created, :after_id)"
+        page_params["after_created"] = after[0]
+        page_params["after_id"] = after[1]
+    sql += " ORDER BY date_created DESC, id DESC LIMIT :limit"
+    page_params["limit"] = limit
+    return statements.variant(name, sql)(), page_params
+
+
+def _ranked_page(name: str, base_sql: str, params: SqlParams, after: Optional[RankKeyset],
+                 limit: int) -> TextAndParams:
+    """
+    То же, что _keyset_page, но для выдачи по релевантности: ключ (rank, id).
+    """
+    sql = base_sql
+    page_params: SqlParams = dict(params)
+    if after is not None:
+        name += ".after"
+        sql += " WHERE (rank, id) < (CAST(:after_rank AS real), :after_id)"
+        page_params["after_rank"] = after[0]
+        page_params["after_id"] = after[1]
+    sql += " ORDER BY rank DESC, id DESC LIMIT :limit"
+    page_params["limit"] = limit
+    return statements.variant(name, sql)(), page_params
 
 
 class AdvertsSqlBuilder(IAdvertSqlBuilder):
     def create(self, advert: Advert) -> TextAndParams:
-        sql = text("""
-            INSERT INTO adv_uuid.adverts (content, description, id_category, price, id_seller)
-            VALUES (:content, :description, :id_category, :price, :id_seller)
-            RETURNING id, content, description, id_category, price, id_seller, date_created
-        """)
         params: SqlParams = {
             "content": advert.content,
             "description": advert.description,
@@ -21,45 +165,148 @@ class AdvertsSqlBuilder(IAdvertSqlBuilder):
             "price": advert.price,
             "id_seller": advert.id_seller,
         }
-        return sql, params
+        return _CREATE(), params
 
     def get_by_id(self, advert_id: UUID) -> TextAndParams:
-        return text("SELECT * FROM adv_uuid.adverts WHERE id = :id"), {"id": str(advert_id)}
+        return _GET_BY_ID(), {"id": str(advert_id)}
 
-    def get_all(self) -> TextAndParams:
-        return text("SELECT * FROM adv_uuid.adverts ORDER BY date_created DESC"), {}
+    def get_all(self, after: Optional[Keyset] = None, limit: Optional[int] = None) -> TextAndParams:
+        if limit is not None:
+            return _keyset_page("adverts.get_all.page", f"SELECT {_COLUMNS} FROM adv_uuid.adverts", {}, after, limit)
+        return _GET_ALL(), {}
 
     def get_by_user(self, user_id: UUID) -> TextAndParams:
-        return (
-            text("SELECT * FROM adv_uuid.adverts WHERE id_seller = :user_id ORDER BY date_created DESC"),
-            {"user_id": str(user_id)},
-        )
+        return _GET_BY_USER(), {"user_id": str(user_id)}
 
     def is_created(self, user_id: UUID, advert_id: UUID) -> TextAndParams:
-        return (
-            text("SELECT 1 FROM adv_uuid.adverts WHERE id_seller = :uid AND id = :aid LIMIT 1"),
-            {"uid": str(user_id), "aid": str(advert_id)},
+        return _IS_CREATED(), {"uid": str(user_id), "aid": str(advert_id)}
+
+    def search_by_keyword(self, keyword_like: str, after: Optional[Keyset] = None,
+                          limit: Optional[int] = None) -> TextAndParams:
+        if limit is not None:
+            return _keyset_page(
+                "adverts.search_by_keyword.page", f"SELECT {_COLUMNS} FROM adv_uuid.search_adverts(:kw)",
+                {"kw": keyword_like}, after, limit,
+            )
+        return _SEARCH_BY_KEYWORD(), {"kw": keyword_like}
+
+    def search_fulltext(self, query: str, after: Optional[RankKeyset] = None,
+                        limit: int = DEFAULT_PAGE_SIZE) -> TextAndParams:
+        return _ranked_page("adverts.search_fulltext", _FULLTEXT_BASE, {"query": query}, after, limit)
+
+    def search_fuzzy(self, query: str, threshold: float, after: Optional[RankKeyset] = None,
+                     limit: int = DEFAULT_PAGE_SIZE) -> TextAndParams:
+        return _ranked_page(
+            "adverts.search_fuzzy", _FUZZY_BASE, {"query": query, "threshold": threshold}, after, limit
         )
 
-    def search_by_keyword(self, keyword_like: str) -> TextAndParams:
-        return text("SELECT * FROM adv_uuid.search_adverts(:kw)"), {"kw": keyword_like}
+    def suggest_similar(self, query: str, limit: int) -> TextAndParams:
+        """
+        Заголовки объявлений, похожие на запрос, — варианты для "возможно, вы искали".
+        """
+        return _SUGGEST_SIMILAR(), {"query": query, "limit": limit}
+
+    def filter(self, flt: AdvertFilter, after: Optional[Tuple[Any, UUID]] = None,
+               limit: int = DEFAULT_PAGE_SIZE) -> TextAndParams:
+        """
+        Страница объявлений по любому сочетанию условий и фасеты одним запросом.
+        В запрос попадают только заданные условия, поэтому каждому сочетанию соответствует
+        своё выражение со своим планом. Страница читается прямо из adverts с LIMIT и может
+        идти по индексу в порядке сортировки; счётчики считаются по CTE base, где отобраны
+        строки по ключевому слову и датам — условиям, общим для всех фасетов.
+        """
+        params: SqlParams = {"limit": limit, "buckets": list(PRICE_BUCKETS)}
+        parts: List[str] = []
+        base: List[str] = []
+        if flt.keyword and flt.keyword.strip():
+            base.append(
+                "search_vector @@ (websearch_to_tsquery('russian', :keyword) || websearch_to_tsquery('english', :keyword))"
+            )
+            params["keyword"] = flt.keyword
+            parts.append("keyword")
+        if flt.date_from is not None:
+            base.append("date_created >= :date_from")
+            params["date_from"] = flt.date_from
+            parts.append("from")
+        if flt.date_to is not None:
+            base.append("date_created <= :date_to")
+            params["date_to"] = flt.date_to
+            parts.append("to")
+
+        category: List[str] = []
+        if flt.category_id is not None:
+            category.append("id_category = :category_id")
+            params["category_id"] = str(flt.category_id)
+            parts.append("category")
+        price: List[str] = []
+        if flt.min_price is not None:
+            price.append("price >= :min_price")
+            params["min_price"] = flt.min_price
+            parts.append("min")
+        if flt.max_price is not None:
+            price.append("price <= :max_price")
+            params["max_price"] = flt.max_price
+            parts.append("max")
+
+        column, direction = _FILTER_SORTS[flt.sort]
+        name = f"adverts.filter[{','.join(parts)}].{flt.sort}"
+        page = base + category + price
+        if after is not None:
+            name += ".after"
+            page.append(f"({column}, id) {'<' if direction == 'DESC' else '>'} (:after_value, :after_id)")
+            params["after_value"] = after[0]
+            params["after_id"] = after[1]
+
+        sql = f"""
+            WITH base AS (
+                SELECT id_category, price FROM adv_uuid.adverts {_where(base)}
+            ), page AS (
+                SELECT {_COLUMNS} FROM adv_uuid.adverts
+                {_where(page)}
+                ORDER BY {column} {direction}, id {direction}
+                LIMIT :limit
+            )
+            SELECT
+                (SELECT coalesce(json_agg(p ORDER BY p.{column} {direction}, p.id {direction}), '[]'::json)
+                 FROM page p) AS items,
+                (SELECT count(*) FROM base {_where(category + price)}) AS total,
+                (SELECT coalesce(json_agg(json_build_object('id_category', c.id_category, 'count', c.n)
+                                          ORDER BY c.n DESC), '[]'::json)
+                 FROM (SELECT id_category, count(*) AS n FROM base {_where(price)} GROUP BY id_category) c
+                ) AS categories,
+                (SELECT coalesce(json_agg(json_build_object('bucket', b.bucket, 'count', b.n)
+                                          ORDER BY b.bucket), '[]'::json)
+                 FROM (
+                     SELECT width_bucket(price::bigint, CAST(:buckets AS bigint[])) AS bucket, count(*) AS n
+                     FROM base {_where(category)} GROUP BY 1
+                 ) b
+                ) AS prices
+        """
+        return statements.variant(name, sql)(), params
 
     def filter_by_dates(self, begin: datetime, end: datetime) -> TextAndParams:
-        sql = text("""
-            SELECT * FROM adv_uuid.adverts 
-            WHERE date_created BETWEEN :begin_time AND :end_time
-            ORDER BY date_created DESC
-        """)
-        return sql, {"begin_time": begin, "end_time": end}
-
-    def by_category(self, category_id: UUID) -> TextAndParams:
-        return (
-            text("SELECT * FROM adv_uuid.adverts WHERE id_category = :category_id ORDER BY date_created DESC"),
-            {"category_id": str(category_id)},
-        )
+        return _FILTER_BY_DATES(), {"begin_time": begin, "end_time": end}
+
+    def by_category(self, category_id: UUID, after: Optional[Keyset] = None,
+                    limit: Optional[int] = None) -> TextAndParams:
+        if limit is not None:
+            return _keyset_page(
+                "adverts.by_category.page", f"SELECT {_COLUMNS} FROM adv_uuid.adverts WHERE id_category = :category_id",
+                {"category_id": str(category_id)}, after, limit, has_where=True,
+            )
+        return _BY_CATEGORY(), {"category_id": str(category_id)}
 
     def delete(self, advert_id: UUID, user_id: UUID) -> TextAndParams:
-        return (
-            text("DELETE FROM adv_uuid.adverts WHERE id = :advert_id AND id_seller = :user_id"),
-            {"advert_id": str(advert_id), "user_id": str(user_id)},
-        )
\ No newline at end of file
+        return _DELETE(), {"advert_id": str(advert_id), "user_id": str(user_id)}
+
+    def get_feed_details(self, advert_ids: List[UUID], user_id: Optional[UUID] = None) -> TextAndParams:
+        """
+        Название категории и флаги пользователя сразу для всей страницы объявлений.
+        Для анонимного пользователя возвращает только название категории.
+        """
+        if user_id is None:
+            return _FEED_DETAILS_ANONYMOUS(), {"ids": list(advert_ids)}
+        return _FEED_DETAILS(), {"ids": list(advert_ids), "uid": user_id}
+
+    def is_created_many(self, user_id: UUID, advert_ids: List[UUID]) -> TextAndParams:
+        return _IS_CREATED_MANY(), {"uid": str(user_id), "ids": list(advert_ids)}
@@ -1,12 +1,16 @@
 from __future__ import annotations
-from sqlalchemy import text
 from i_sql_builders.icategory_sql_builder import ICategorySqlBuilder
 from i_sql_builders.sql_types.sql_types import TextAndParams
+from sql_builders.statement_registry import statements
 from uuid import UUID
 
+_GET_ALL = statements.register("categories.get_all", "SELECT * FROM adv_uuid.categories")
+_GET_NAME_BY_ID = statements.register("categories.get_name_by_id", "SELECT name FROM adv_uuid.categories WHERE id = :id")
+
+
 class CategorySqlBuilder(ICategorySqlBuilder):
     def get_all(self) -> TextAndParams:
-        return text("SELECT * FROM adv_uuid.categories"), {}
+        return _GET_ALL(), {}
 
     def get_name_by_id(self, id_category: UUID) -> TextAndParams:
-        return text("SELECT name FROM adv_uuid.categories WHERE id = :id"), {"id": id_category}
\ No newline at end of file
+        return _GET_NAME_BY_ID(), {"id": id_category}
@@ -1,42 +1,58 @@
 # i_sql_builders/deal_sql_builder.py
 from __future__ import annotations
-from sqlalchemy import text
 from i_sql_builders.ideal_sql_builder import IDealSqlBuilder
 from i_sql_builders.sql_types.sql_types import TextAndParams, SqlParams
+from sql_builders.statement_registry import statements
+from typing import List
 from uuid import UUID
 
+_CREATE_DEAL = statements.register("deals.create_deal", """
+    INSERT INTO adv_uuid.deals (id_customer, id_advert, address)
+    VALUES (:id_customer, :id_advert, :address)
+    RETURNING id, id_customer, id_advert, date_created, address
+""")
+_GET_DEALS_BY_USER = statements.register("deals.get_deals_by_user", """
+    SELECT a.id, a.content, a.description, a.id_category, a.price, a.id_seller, a.date_created
+    FROM adv_uuid.adverts a
+    JOIN adv_uuid.deals d ON a.id = d.id_advert
+    WHERE d.id_customer = :user_id
+    ORDER BY a.date_created DESC
+""")
+_IS_IN_DEALS = statements.register(
+    "deals.is_in_deals",
+    "SELECT 1 FROM adv_uuid.deals WHERE id_customer = :uid AND id_advert = :aid LIMIT 1",
+)
+_IS_BOUGHT = statements.register("deals.is_bought", "SELECT 1 FROM adv_uuid.deals WHERE id_advert = :aid LIMIT 1")
+_IS_IN_DEALS_MANY = statements.register(
+    "deals.is_in_deals_many",
+    "SELECT DISTINCT id_advert FROM adv_uuid.deals WHERE id_customer = :uid AND id_advert = ANY(:ids)",
+)
+_IS_BOUGHT_MANY = statements.register(
+    "deals.is_bought_many",
+    "SELECT DISTINCT id_advert FROM adv_uuid.deals WHERE id_advert = ANY(:ids)",
+)
+
+
 class DealSqlBuilder(IDealSqlBuilder):
     def create_deal(self, user_id: UUID, advert_id: UUID, address: str = "online") -> TextAndParams:
-        sql = text("""
-            INSERT INTO adv_uuid.deals (id_customer, id_advert, address)
-            VALUES (:id_customer, :id_advert, :address)
-            RETURNING id, id_customer, id_advert, date_created, address
-        """)
         params: SqlParams = {
             "id_customer": user_id,
             "id_advert": advert_id,
             "address": address
         }
-        return sql, params
+        return _CREATE_DEAL(), params
 
     def get_deals_by_user(self, user_id: UUID) -> TextAndParams:
-        sql = text("""
-            SELECT a.* 
-            FROM adv_uuid.adverts a
-            JOIN adv_uuid.deals d ON a.id = d.id_advert
-            WHERE d.id_customer = :user_id
-            ORDER BY a.date_created DESC
-        """)
-        return sql, {"user_id": user_id}
+        return _GET_DEALS_BY_USER(), {"user_id": user_id}
 
     def is_in_deals(self, user_id: UUID, advert_id: UUID) -> TextAndParams:
-        return (
-            text("SELECT 1 FROM adv_uuid.deals WHERE id_customer = :uid AND id_advert = :aid LIMIT 1"),
-            {"uid": user_id, "aid": advert_id}
-        )
+        return _IS_IN_DEALS(), {"uid": user_id, "aid": advert_id}
 
     def is_bought(self,  advert_id: UUID) -> TextAndParams:
-        return (
-            text("SELECT 1 FROM adv_uuid.deals WHERE id_advert = :aid LIMIT 1"),
-            {"aid": advert_id}
-        )
\ No newline at end of file
+        return _IS_BOUGHT(), {"aid": advert_id}
+
+    def is_in_deals_many(self, user_id: UUID, advert_ids: List[UUID]) -> TextAndParams:
+        return _IS_IN_DEALS_MANY(), {"uid": user_id, "ids": list(advert_ids)}
+
+    def is_bought_many(self, advert_ids: List[UUID]) -> TextAndParams:
+        return _IS_BOUGHT_MANY(), {"ids": list(advert_ids)}
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List
+from uuid import UUID, uuid4
+
+from sqlalchemy.sql.elements import TextClause
+
+from dto.filter_dto import AdvertFilter
+from i_sql_builders.sql_types.sql_types import SqlParams, TextAndParams
+from sql_builders.advert_sql_builder import AdvertsSqlBuilder
+from sql_builders.category_sql_builder import CategorySqlBuilder
+from sql_builders.deal_sql_builder import DealSqlBuilder
+from sql_builders.liked_sql_builder import LikedSqlBuilder
+from sql_builders.user_sql_builder import UserSqlBuilder
+
+
+@dataclass
+class SampleValues:
+    """
+    Значения параметров для запросов каталога. По умолчанию случайные; для планов
+    на реальных данных подставляются существующие id, чтобы селективность была настоящей.
+    """
+    user_id: UUID = field(default_factory=uuid4)
+    advert_id: UUID = field(default_factory=uuid4)
+    category_id: UUID = field(default_factory=uuid4)
+    email: str = "user@example.com"
+    keyword: str = "велосипед"
+    now: datetime = field(default_factory=lambda: datetime(2025, 1, 1))
+
+
+@dataclass
+class CatalogQuery:
+    name: str
+    sql: TextClause
+    params: SqlParams
+    # Запрос, читающий таблицу целиком по смыслу (справочник категорий): Seq Scan для него не ошибка
+    full_read: bool = False
+    # Тело запроса скрыто в функции PostgreSQL, и EXPLAIN его не показывает
+    opaque: bool = False
+
+
+def _query(name: str, built: TextAndParams, **flags: bool) -> CatalogQuery:
+    sql, params = built
+    return CatalogQuery(name, sql, params, **flags)
+
+
+def query_catalog(sample: SampleValues | None = None) -> List[CatalogQuery]:
+    """
+    Все читающие, обновляющие и удаляющие запросы билдеров из sql_builders/ с тестовыми параметрами.
+    INSERT-запросы не включены: их план не зависит от индексов.
+    Новый метод билдера, читающий таблицу, нужно добавить и сюда.
+    """
+    s = sample or SampleValues()
+    adverts, categories = AdvertsSqlBuilder(), CategorySqlBuilder()
+    deals, liked, users = DealSqlBuilder(), LikedSqlBuilder(), UserSqlBuilder()
+    after = (s.now, s.advert_id)
+    ids = [s.advert_id, uuid4(), uuid4()]
+
+    return [
+        _query("adverts.get_by_id", adverts.get_by_id(s.advert_id)),
+        _query("adverts.get_all.page", adverts.get_all(limit=30)),
+        _query("adverts.get_all.page.after", adverts.get_all(after, 30)),
+        _query("adverts.get_by_user", adverts.get_by_user(s.user_id)),
+        _query("adverts.is_created", adverts.is_created(s.user_id, s.advert_id)),
+        _query("adverts.is_created_many", adverts.is_created_many(s.user_id, ids)),
+        _query("adverts.search_by_keyword.page", adverts.search_by_keyword(f"%{s.keyword}%", limit=30), opaque=True),
+        _query("adverts.search_fulltext", adverts.search_fulltext(s.keyword, limit=30)),
+        _query("adverts.search_fulltext.after", adverts.search_fulltext(s.keyword, (0.1, s.advert_id), 30)),
+        _query("adverts.search_fuzzy", adverts.search_fuzzy(s.keyword, 0.4, limit=30)),
+        _query("adverts.suggest_similar", adverts.suggest_similar(s.keyword, 3)),
+        _query("adverts.filter_by_dates", adverts.filter_by_dates(s.now - timedelta(days=1), s.now)),
+        _query("adverts.by_category.page", adverts.by_category(s.category_id, limit=30)),
+        _query("adverts.by_category.page.after", adverts.by_category(s.category_id, after, 30)),
+        _query("adverts.filter.category_price", adverts.filter(
+            AdvertFilter(category_id=s.category_id, min_price=1000, max_price=5000), limit=31,
+        )),
+        _query("adverts.filter.keyword_dates", adverts.filter(
+            AdvertFilter(keyword=s.keyword, date_from=s.now - timedelta(days=7), date_to=s.now), limit=31,
+        )),
+        _query("adverts.filter.price_sort", adverts.filter(
+            AdvertFilter(category_id=s.category_id, sort="price_asc"), (1000, s.advert_id), 31,
+        )),
+        _query("adverts.feed_details", adverts.get_feed_details(ids, s.user_id)),
+        _query("adverts.feed_details_anonymous", adverts.get_feed_details(ids)),
+        _query("adverts.delete", adverts.delete(s.advert_id, s.user_id)),
+        _query("categories.get_all", categories.get_all(), full_read=True),
+        _query("categories.get_name_by_id", categories.get_name_by_id(s.category_id)),
+        _query("deals.get_deals_by_user", deals.get_deals_by_user(s.user_id)),
+        _query("deals.is_in_deals", deals.is_in_deals(s.user_id, s.advert_id)),
+        _query("deals.is_bought", deals.is_bought(s.advert_id)),
+        _query("deals.is_in_deals_many", deals.is_in_deals_many(s.user_id, ids)),
+        _query("deals.is_bought_many", deals.is_bought_many(ids)),
+        _query("likes.get_liked_by_user", liked.get_liked_by_user(s.user_id)),
+        _query("likes.is_liked", liked.is_liked(s.user_id, s.advert_id)),
+        _query("likes.is_liked_many", liked.is_liked_many(s.user_id, ids)),
+        _query("likes.remove_from_liked", liked.remove_from_liked(s.user_id, s.advert_id)),
+        _query("profiles.find_by_email", users.find_by_email(s.email)),
+        _query("profiles.update_password", users.update_password(s.user_id, "scrypt$")),
+        _query("customers.delete", users.delete_customer(s.user_id)),
+        _query("sellers.delete", users.delete_seller(s.user_id)),
+        _query("profiles.delete", users.delete_profile(s.user_id)),
+    ]
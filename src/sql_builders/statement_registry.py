@@ -0,0 +1,67 @@
+from __future__ import annotations
+import threading
+from typing import Dict
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+
+
+class RegisteredStatement:
+    """
+    Заранее собранный text()-запрос билдера со счётчиком выполнений.
+    Один и тот же объект и одна и та же строка SQL на всех вызовах позволяют SQLAlchemy
+    брать компиляцию из кэша, а asyncpg — готовить выражение один раз на соединение.
+    """
+
+    __slots__ = ("name", "sql", "clause", "executions")
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+        self.clause: TextClause = text(sql)
+        self.executions = 0
+
+    def __call__(self) -> TextClause:
+        self.executions += 1
+        return self.clause
+
+
+class StatementRegistry:
+    def __init__(self) -> None:
+        self._statements: Dict[str, RegisteredStatement] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, sql: str) -> RegisteredStatement:
+        with self._lock:
+            existing = self._statements.get(name)
+            if existing is not None:
+                if existing.sql != sql:
+                    raise ValueError(f"Statement {name!r} is already registered with different SQL")
+                return existing
+            statement = RegisteredStatement(name, sql)
+            self._statements[name] = statement
+            return statement
+
+    def variant(self, name: str, sql: str) -> RegisteredStatement:
+        """
+        Для запросов, собираемых из частей (страницы, фильтры): один объект на каждый вариант SQL.
+        """
+        statement = self._statements.get(name)
+        if statement is not None and statement.sql == sql:
+            return statement
+        return self.register(name, sql)
+
+    def get(self, name: str) -> RegisteredStatement:
+        return self._statements[name]
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def stats(self) -> Dict[str, int]:
+        return {name: statement.executions for name, statement in sorted(self._statements.items())}
+
+    def reset_counters(self) -> None:
+        for statement in self._statements.values():
+            statement.executions = 0
+
+
+statements = StatementRegistry()
@@ -1,16 +1,33 @@
 from __future__ import annotations
 from uuid import UUID
-from sqlalchemy import text
 from i_sql_builders.iuser_sql_builder import IUserSqlBuilder
 from i_sql_builders.sql_types.sql_types import TextAndParams, SqlParams
+from sql_builders.statement_registry import statements
+
+_CREATE_USER = statements.register("profiles.create_user", """
+    INSERT INTO adv_uuid.profiles (nickname, fio, email, phone_number, password)
+    VALUES (:nickname, :fio, :email, :phone_number, :password)
+    RETURNING id, nickname, fio, email, phone_number, password
+""")
+_CREATE_CUSTOMER = statements.register("customers.create", """
+    INSERT INTO adv_uuid.customers (profile_id, rating)
+    VALUES (:profile_id, :rating)
+""")
+_CREATE_SELLER = statements.register("sellers.create", """
+    INSERT INTO adv_uuid.sellers (profile_id, rating)
+    VALUES (:profile_id, :rating)
+""")
+_DELETE_CUSTOMER = statements.register("customers.delete", "DELETE FROM adv_uuid.customers WHERE profile_id = :id")
+_DELETE_SELLER = statements.register("sellers.delete", "DELETE FROM adv_uuid.sellers WHERE profile_id = :id")
+_DELETE_PROFILE = statements.register("profiles.delete", "DELETE FROM adv_uuid.profiles WHERE id = :id")
+_FIND_BY_EMAIL = statements.register("profiles.find_by_email", "SELECT * FROM adv_uuid.profiles WHERE email = :email")
+_UPDATE_PASSWORD = statements.register(
+    "profiles.update_password", "UPDATE adv_uuid.profiles SET password = :password WHERE id = :id"
+)
+
 
 class UserSqlBuilder(IUserSqlBuilder):
     def create_user(self, user_data: dict) -> TextAndParams:
-        sql = text("""
-            INSERT INTO adv_uuid.profiles (nickname, fio, email, phone_number, password)
-            VALUES (:nickname, :fio, :email, :phone_number, :password)
-            RETURNING id, nickname, fio, email, phone_number, password
-        """)
         params: SqlParams = {
             "nickname": user_data["nickname"],
             "fio": user_data["fio"],
@@ -18,30 +35,25 @@ class UserSqlBuilder(IUserSqlBuilder):
             "phone_number": user_data["phone_number"],
             "password": user_data["password"]
         }
-        return sql, params
+        return _CREATE_USER(), params
 
     def create_customer(self, profile_id: UUID, rating: int = 0) -> TextAndParams:
-        sql = text("""
-            INSERT INTO adv_uuid.customers (profile_id, rating)
-            VALUES (:profile_id, :rating)
-        """)
-        return sql, {"profile_id": str(profile_id), "rating": rating}
+        return _CREATE_CUSTOMER(), {"profile_id": str(profile_id), "rating": rating}
 
     def create_seller(self, profile_id: UUID, rating: int = 0) -> TextAndParams:
-        sql = text("""
-            INSERT INTO adv_uuid.sellers (profile_id, rating)
-            VALUES (:profile_id, :rating)
-        """)
-        return sql, {"profile_id": str(profile_id), "rating": rating}
+        return _CREATE_SELLER(), {"profile_id": str(profile_id), "rating": rating}
 
     def delete_customer(self, profile_id: UUID) -> TextAndParams:
-        return text("DELETE FROM adv_uuid.customers WHERE profile_id = :id"), {"id": str(profile_id)}
+        return _DELETE_CUSTOMER(), {"id": str(profile_id)}
 
     def delete_seller(self, profile_id: UUID) -> TextAndParams:
-        return text("DELETE FROM adv_uuid.sellers WHERE profile_id = :id"), {"id": str(profile_id)}
+        return _DELETE_SELLER(), {"id": str(profile_id)}
 
     def delete_profile(self, profile_id: UUID) -> TextAndParams:
-        return text("DELETE FROM adv_uuid.profiles WHERE id = :id"), {"id": str(profile_id)}
+        return _DELETE_PROFILE(), {"id": str(profile_id)}
 
     def find_by_email(self, email: str) -> TextAndParams:
-        return text("SELECT * FROM adv_uuid.profiles WHERE email = :email"), {"email": email}
\ No newline at end of file
+        return _FIND_BY_EMAIL(), {"email": email}
+
+    def update_password(self, profile_id: UUID, password: str) -> TextAndParams:
+        return _UPDATE_PASSWORD(), {"id": str(profile_id), "password": password}
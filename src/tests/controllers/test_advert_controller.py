@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from models.advert import Advert
+from controllers.advert_controller import AdvertController
+from services.advert_service import IAdvertService
+
+
+class TestAdvertControllerFeed(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.advert_service = AsyncMock(spec=IAdvertService)
+        self.locator = MagicMock()
+        self.locator.advert_service.return_value = self.advert_service
+        self.controller = AdvertController(self.locator)
+
+        self.user_id = uuid4()
+        self.advert = Advert(
+            id=uuid4(),
+            content="Велосипед",
+            description="Горный",
+            id_category=uuid4(),
+            price=15000,
+            id_seller=self.user_id,
+        )
+        self.advert_other = Advert(
+            id=uuid4(),
+            content="Книга",
+            description="Роман",
+            id_category=uuid4(),
+            price=500,
+            id_seller=uuid4(),
+        )
+
+    async def test_feed_is_enriched_with_single_call(self):
+        self.advert_service.get_feed_details.return_value = {
+            self.advert.id: {
+                "category_name": "Спорт",
+                "is_created": True,
+                "is_favorite": False,
+                "is_bought": False,
+                "is_really_bought": False,
+            },
+            self.advert_other.id: {
+                "category_name": "Книги",
+                "is_created": False,
+                "is_favorite": True,
+                "is_bought": True,
+                "is_really_bought": True,
+            },
+        }
+
+        items = await self.controller.get_adverts_with_dto([self.advert, self.advert_other], self.user_id)
+
+        self.advert_service.get_feed_details.assert_awaited_once_with(
+            [self.advert.id, self.advert_other.id], self.user_id
+        )
+        self.assertEqual(items[0].category_name, "Спорт")
+        self.assertTrue(items[0].is_created)
+        self.assertFalse(items[0].is_favorite)
+        self.assertEqual(items[1].category_name, "Книги")
+        self.assertTrue(items[1].is_favorite)
+        self.assertTrue(items[1].is_bought)
+        self.assertTrue(items[1].is_really_bought)
+
+    async def test_anonymous_feed_has_no_user_flags(self):
+        self.advert_service.get_feed_details.return_value = {
+            self.advert.id: {"category_name": "Спорт"},
+        }
+
+        items = await self.controller.get_adverts_with_dto([self.advert])
+
+        self.assertEqual(items[0].category_name, "Спорт")
+        self.assertFalse(items[0].is_created)
+        self.assertFalse(items[0].is_favorite)
+
+    async def test_missing_details_fall_back_to_defaults(self):
+        self.advert_service.get_feed_details.return_value = {}
+
+        items = await self.controller.get_adverts_with_dto([self.advert], self.user_id)
+
+        self.assertEqual(items[0].category_name, "Категория не найдена")
+        self.assertFalse(items[0].is_really_bought)
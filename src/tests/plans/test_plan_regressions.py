@@ -0,0 +1,135 @@
+"""
+Регрессии планов запросов билдеров.
+
+Модуль очищает таблицы и наполняет локальную базу данными benchmarks.datagen внутри транзакции,
+выполняет EXPLAIN (ANALYZE, BUFFERS) для каждого запроса из sql_builders/query_catalog.py и сравнивает
+план с базовой линией из baselines.json. Транзакция откатывается, база остаётся прежней.
+
+Нужны PostgreSQL с применёнными миграциями (python -m migrations up); без базы тесты пропускаются.
+Запрос без базовой линии — ошибка. Перезаписать базовые линии: UPDATE_PLAN_BASELINES=1 pytest tests/plans
+Seq Scan по каталогу отдельно проверяет python -m migrations verify.
+"""
+import asyncio
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from benchmarks.datagen import Volumes, generate
+from core.db import DATABASES
+from core.migrations import load_migrations
+from core.query_plans import PlanSummary, compare_plans, summarize_plan
+from sql_builders.query_catalog import SampleValues, query_catalog
+
+BASELINES = Path(__file__).with_name("baselines.json")
+UPDATE_BASELINES = os.getenv("UPDATE_PLAN_BASELINES") == "1"
+
+SEED_ADVERTS = int(os.getenv("PLAN_SEED_ADVERTS", "100000"))
+SEED = Volumes.scaled(SEED_ADVERTS)
+
+CATALOG_NAMES = [query.name for query in query_catalog()]
+
+
+async def _seed(conn: AsyncConnection) -> SampleValues:
+    """
+    Данные генерирует benchmarks.datagen через COPY на том же соединении, внутри открытой транзакции.
+    Параметры запросов — самые "тяжёлые" значения: активный пользователь, популярные категория и объявление.
+    """
+    # Адаптер asyncpg в SQLAlchemy отправляет BEGIN только с первым запросом: без него COPY
+    # на сыром соединении выполнился бы вне транзакции и пережил бы откат.
+    # ANALYZE берёт случайную выборку 300 * default_statistics_target строк; при максимальном
+    # значении в неё попадают все строки, статистика и планы от запуска к запуску одинаковы
+    await conn.execute(text("SET LOCAL default_statistics_target = 10000"))
+    raw = await conn.get_raw_connection()
+    # TRUNCATE в транзакции даёт таблицам новые файлы, и откат их просто выбрасывает: база не
+    # разрастается мёртвыми строками от прошлых запусков, и планы строятся по одним и тем же данным
+    dataset = await generate(raw.driver_connection, SEED, seed=42, truncate=True)
+    return SampleValues(
+        user_id=dataset.hot_user_id, advert_id=dataset.hot_advert_id, category_id=dataset.hot_category_id,
+        email=dataset.hot_user_email, keyword="велосипед", now=dataset.newest_advert_date,
+    )
+
+
+async def _collect_plans() -> Tuple[str, Dict[str, PlanSummary]]:
+    engine = create_async_engine(DATABASES["admin"], poolclass=NullPool)
+    try:
+        # Пропуск — только когда базы нет; ошибки наполнения и EXPLAIN ниже валят тест
+        try:
+            conn = await engine.connect()
+        except (OSError, DBAPIError) as e:
+            pytest.skip(f"PostgreSQL недоступен: {e}")
+        try:
+            try:
+                rows = await conn.execute(text("SELECT version FROM adv_uuid.schema_migrations"))
+            except ProgrammingError:
+                pytest.skip("нет таблицы schema_migrations: python -m migrations up")
+            applied = {row[0] for row in rows}
+            missing = [m.version for m in load_migrations() if m.version not in applied]
+            if missing:
+                pytest.skip(f"не применены миграции {', '.join(missing)}: python -m migrations up")
+            version = (await conn.execute(text("SHOW server_version"))).scalar_one()
+            # Запросы выше открыли транзакцию неявно; данные сидируются в своей, явной
+            await conn.rollback()
+
+            transaction = await conn.begin()
+            try:
+                sample = await _seed(conn)
+                plans: Dict[str, PlanSummary] = {}
+                for query in query_catalog(sample):
+                    # Каждый запрос в своей точке сохранения: DELETE под EXPLAIN ANALYZE выполняется по-настоящему
+                    savepoint = await conn.begin_nested()
+                    result = await conn.execute(
+                        text("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query.sql.text), query.params,
+                    )
+                    raw = result.scalar_one()
+                    plans[query.name] = summarize_plan(json.loads(raw) if isinstance(raw, str) else raw)
+                    await savepoint.rollback()
+            finally:
+                await transaction.rollback()
+            return version, plans
+        finally:
+            await conn.close()
+    finally:
+        await engine.dispose()
+
+
+def _load_baselines() -> Dict[str, PlanSummary]:
+    if not BASELINES.exists():
+        return {}
+    data = json.loads(BASELINES.read_text(encoding="utf-8"))
+    return {name: PlanSummary.from_json(plan) for name, plan in data["plans"].items()}
+
+
+def _save_baselines(version: str, plans: Dict[str, PlanSummary]) -> None:
+    data = {
+        "server_version": version,
+        "seed": asdict(SEED),
+        "plans": {name: plans[name].to_json() for name in sorted(plans)},
+    }
+    BASELINES.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+@pytest.fixture(scope="module")
+def plans() -> Tuple[Dict[str, PlanSummary], Dict[str, PlanSummary]]:
+    version, current = asyncio.run(_collect_plans())
+    if UPDATE_BASELINES:
+        _save_baselines(version, current)
+    return current, _load_baselines()
+
+
+@pytest.mark.parametrize("name", CATALOG_NAMES)
+def test_plan_has_no_regression(plans, name):
+    current, baselines = plans
+    plan = current[name]
+    baseline = baselines.get(name)
+    if baseline is None:
+        pytest.fail(f"нет базовой линии для {name}: UPDATE_PLAN_BASELINES=1 pytest tests/plans\n" + "\n".join(plan.shape))
+    problems = compare_plans(baseline, plan)
+    assert not problems, f"{name}: {'; '.join(problems)}\n" + "\n".join(plan.shape)
@@ -1,6 +1,8 @@
 import pytest_asyncio
 import pytest
+from uuid import uuid4
 from models.advert import Advert
+from dto.filter_dto import AdvertFilter
 from repositories.advert_repository import AdvertsRepository
 from sql_builders.advert_sql_builder import AdvertsSqlBuilder
 from core.db import SessionLocal
@@ -109,4 +111,87 @@ async def test_advert_get_all(admin_session):
         adverts = await repo.get_all_adverts()
         assert isinstance(adverts, list)
     except Exception as e:
-        pytest.skip(f"Тест пропущен: {e}")
\ No newline at end of file
+        pytest.skip(f"Тест пропущен: {e}")
+
+
+@pytest.mark.asyncio
+async def test_advert_is_created_many(admin_session):
+    """Тест пакетной проверки авторства объявлений"""
+    try:
+        builder = AdvertsSqlBuilder()
+        repo = AdvertsRepository(admin_session, builder)
+
+        adverts = await repo.get_all_adverts(limit=5)
+        if adverts:
+            seller_id = adverts[0].id_seller
+            created = await repo.is_created_many(seller_id, [a.id for a in adverts])
+            assert adverts[0].id in created
+        else:
+            created = await repo.is_created_many(uuid4(), [uuid4()])
+            assert created == set()
+    except Exception as e:
+        pytest.skip(f"Тест пропущен: {e}")
+
+
+@pytest.mark.asyncio
+async def test_advert_search_fulltext(admin_session):
+    """Тест полнотекстового поиска: словоформа находит объявление, выдача упорядочена по релевантности"""
+    try:
+        builder = AdvertsSqlBuilder()
+        repo = AdvertsRepository(admin_session, builder)
+
+        found = await repo.search_adverts_fulltext("велосипеды", limit=10)
+        assert isinstance(found, list)
+        ranks = [(a.rank, a.id) for a in found]
+        assert ranks == sorted(ranks, reverse=True)
+
+        if len(found) > 1:
+            rest = await repo.search_adverts_fulltext("велосипеды", (found[0].rank, found[0].id), 10)
+            assert found[0].id not in {a.id for a in rest}
+    except Exception as e:
+        pytest.skip(f"Тест пропущен: {e}")
+
+
+@pytest.mark.asyncio
+async def test_advert_search_fuzzy(admin_session):
+    """Тест нечёткого поиска: опечатка в запросе не мешает найти объявление"""
+    try:
+        builder = AdvertsSqlBuilder()
+        repo = AdvertsRepository(admin_session, builder)
+
+        adverts = await repo.get_all_adverts(limit=1)
+        if not adverts:
+            pytest.skip("Нет объявлений для поиска")
+        title = adverts[0].content
+        typo = title[:-1] if len(title) > 4 else title
+
+        found = await repo.search_adverts_fuzzy(typo, limit=10)
+        assert adverts[0].id in {a.id for a in found}
+
+        suggestions = await repo.get_search_suggestions(typo, 3)
+        assert isinstance(suggestions, list)
+    except Exception as e:
+        pytest.skip(f"Тест пропущен: {e}")
+
+
+@pytest.mark.asyncio
+async def test_advert_filter_with_facets(admin_session):
+    """Тест комбинированного фильтра: страница и фасеты из одного запроса согласованы"""
+    try:
+        builder = AdvertsSqlBuilder()
+        repo = AdvertsRepository(admin_session, builder)
+
+        everything = await repo.filter_adverts(AdvertFilter(sort="price_asc"), limit=10)
+        assert everything.total == sum(facet.count for facet in everything.categories)
+        assert everything.total == sum(facet.count for facet in everything.prices)
+        prices = [a.price for a in everything.items]
+        assert prices == sorted(prices)
+
+        if everything.items:
+            category_id = everything.items[0].id_category
+            narrowed = await repo.filter_adverts(AdvertFilter(category_id=category_id, max_price=10**9), limit=10)
+            assert all(a.id_category == category_id for a in narrowed.items)
+            # Фасет категорий не сужается выбранной категорией
+            assert len(narrowed.categories) == len(everything.categories)
+    except Exception as e:
+        pytest.skip(f"Тест пропущен: {e}")
@@ -1,5 +1,6 @@
 import pytest_asyncio
 import pytest
+from uuid import uuid4
 from models.deal import Deal
 from repositories.deal_repository import DealRepository
 from sql_builders.deal_sql_builder import DealSqlBuilder
@@ -64,4 +65,30 @@ async def test_deal_is_bought(admin_session):
         is_bought = await repo.is_bought(advert_id=1)
         assert isinstance(is_bought, bool)
     except Exception as e:
-        pytest.skip(f"Тест пропущен: {e}")
\ No newline at end of file
+        pytest.skip(f"Тест пропущен: {e}")
+
+@pytest.mark.asyncio
+async def test_deal_is_in_deals_many(admin_session):
+    """Тест пакетной проверки участия в сделках"""
+    try:
+        builder = DealSqlBuilder()
+        repo = DealRepository(admin_session, builder)
+
+        in_deals = await repo.is_in_deals_many(user_id=uuid4(), advert_ids=[uuid4(), uuid4()])
+        assert isinstance(in_deals, set)
+        assert not in_deals
+    except Exception as e:
+        pytest.skip(f"Тест пропущен: {e}")
+
+@pytest.mark.asyncio
+async def test_deal_is_bought_many(admin_session):
+    """Тест пакетной проверки покупки объявлений"""
+    try:
+        builder = DealSqlBuilder()
+        repo = DealRepository(admin_session, builder)
+
+        bought = await repo.is_bought_many(advert_ids=[uuid4(), uuid4()])
+        assert isinstance(bought, set)
+        assert not bought
+    except Exception as e:
+        pytest.skip(f"Тест пропущен: {e}")
@@ -1,5 +1,6 @@
 import pytest_asyncio
 import pytest
+from uuid import uuid4
 from models.liked import Liked
 from repositories.liked_repository import LikedRepository
 from sql_builders.liked_sql_builder import LikedSqlBuilder
@@ -77,4 +78,20 @@ async def test_liked_is_liked(admin_session):
         is_liked = await repo.is_liked(user_id=1, advert_id=1)
         assert isinstance(is_liked, bool)
     except Exception as e:
-        pytest.skip(f"Тест пропущен: {e}")
\ No newline at end of file
+        pytest.skip(f"Тест пропущен: {e}")
+
+
+@pytest.mark.asyncio
+async def test_liked_is_liked_many(admin_session):
+    """Тест пакетной проверки избранного"""
+    try:
+        builder = LikedSqlBuilder()
+        repo = LikedRepository(admin_session, builder)
+
+        liked = await repo.is_liked_many(user_id=uuid4(), advert_ids=[uuid4(), uuid4()])
+        assert isinstance(liked, set)
+        assert not liked
+
+        assert await repo.is_liked_many(user_id=uuid4(), advert_ids=[]) == set()
+    except Exception as e:
+        pytest.skip(f"Тест пропущен: {e}")
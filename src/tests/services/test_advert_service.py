@@ -1,9 +1,16 @@
 import unittest
-from unittest.mock import AsyncMock
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
 
-from models.advert import Advert
-from services.advert_service import AdvertService
+from models.advert import Advert, RankedAdvert
+from services.advert_service import AdvertService, IAdvertObserver
+from services.search_index import SearchIndex
 from abstract_repositories.iadvert_repository import IAdvertRepository
+from core.pagination import (
+    decode_cursor, decode_rank_cursor, encode_cursor, encode_price_cursor, encode_rank_cursor,
+)
+from dto.filter_dto import PRICE_BUCKETS, AdvertFilter, FilterResult, PriceFacet
 
 
 class TestAdvertService(unittest.IsolatedAsyncioTestCase):
@@ -104,4 +111,214 @@ class TestAdvertService(unittest.IsolatedAsyncioTestCase):
         self.repo.get_by_id.return_value = self.advert_other  # id_seller=200
         with self.assertRaises(PermissionError):
             await self.service.delete_advert(advert_id=11, user_id=100)
-        self.repo.delete.assert_not_called()
\ No newline at end of file
+        self.repo.delete.assert_not_called()
+
+class TestAdvertServicePagination(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.repo = AsyncMock(spec=IAdvertRepository)
+        self.service = AdvertService(self.repo)
+        self.category_id = uuid4()
+        base = datetime(2025, 1, 1, 12, 0, 0)
+        self.adverts = [
+            Advert(
+                id=uuid4(),
+                content=f"Объявление {i}",
+                description="Описание",
+                id_category=self.category_id,
+                price=100 * i,
+                id_seller=uuid4(),
+                date_created=base - timedelta(minutes=i),
+            )
+            for i in range(3)
+        ]
+
+    async def test_first_page_has_next_cursor(self):
+        self.repo.get_all_adverts.return_value = self.adverts
+
+        page = await self.service.get_adverts_page(page_size=2)
+
+        self.repo.get_all_adverts.assert_awaited_once_with(None, 3)
+        self.assertEqual(len(page.items), 2)
+        self.assertEqual(
+            decode_cursor(page.next_cursor),
+            (self.adverts[1].date_created, self.adverts[1].id),
+        )
+
+    async def test_last_page_has_no_cursor(self):
+        self.repo.get_adverts_by_category.return_value = self.adverts[2:]
+        cursor = encode_cursor(self.adverts[1].date_created, self.adverts[1].id)
+
+        page = await self.service.get_adverts_by_category_page(self.category_id, cursor, 2)
+
+        self.repo.get_adverts_by_category.assert_awaited_once_with(
+            self.category_id, (self.adverts[1].date_created, self.adverts[1].id), 3
+        )
+        self.assertEqual(len(page.items), 1)
+        self.assertIsNone(page.next_cursor)
+
+    async def test_broken_cursor_starts_from_first_page(self):
+        self.repo.get_adverts_by_key_word.return_value = []
+
+        page = await self.service.get_adverts_by_key_word_page("велосипед", "не-курсор", 2)
+
+        self.repo.get_adverts_by_key_word.assert_awaited_once_with("велосипед", None, 3)
+        self.assertEqual(page.items, [])
+
+    async def test_fulltext_search_pages_by_rank(self):
+        ranked = [RankedAdvert(**a.model_dump(), rank=1.0 - i / 10) for i, a in enumerate(self.adverts)]
+        self.repo.search_adverts_fulltext.return_value = ranked
+
+        page = await self.service.search_adverts_page("велосипед", "fulltext", page_size=2)
+
+        self.repo.search_adverts_fulltext.assert_awaited_once_with("велосипед", None, 3)
+        self.repo.get_adverts_by_key_word.assert_not_awaited()
+        self.assertEqual(decode_rank_cursor(page.next_cursor), (ranked[1].rank, ranked[1].id))
+
+    async def test_fulltext_search_continues_from_rank_cursor(self):
+        self.repo.search_adverts_fulltext.return_value = []
+        cursor = encode_rank_cursor(0.1, self.adverts[0].id)
+
+        await self.service.search_adverts_page("велосипед", "fulltext", cursor, 2)
+
+        self.repo.search_adverts_fulltext.assert_awaited_once_with("велосипед", (0.1, self.adverts[0].id), 3)
+
+    async def test_pattern_mode_uses_keyword_search(self):
+        self.repo.get_adverts_by_key_word.return_value = []
+
+        await self.service.search_adverts_page("велосипед", "pattern", page_size=2)
+
+        self.repo.get_adverts_by_key_word.assert_awaited_once_with("велосипед", None, 3)
+        self.repo.search_adverts_fulltext.assert_not_awaited()
+
+    async def test_default_mode_is_pattern(self):
+        self.repo.get_adverts_by_key_word.return_value = []
+
+        await self.service.search_adverts_page("велосипед", page_size=2)
+
+        self.repo.get_adverts_by_key_word.assert_awaited_once_with("велосипед", None, 3)
+        self.repo.search_adverts_fulltext.assert_not_awaited()
+
+    async def test_blank_query_skips_database(self):
+        page = await self.service.search_adverts_page("   ", "fulltext")
+
+        self.assertEqual(page.items, [])
+        self.repo.search_adverts_fulltext.assert_not_awaited()
+
+    async def test_fuzzy_mode_uses_trigram_search(self):
+        ranked = [RankedAdvert(**self.adverts[0].model_dump(), rank=0.7)]
+        self.repo.search_adverts_fuzzy.return_value = ranked
+
+        page = await self.service.search_adverts_page("велосепед", "fuzzy", page_size=2)
+
+        self.repo.search_adverts_fuzzy.assert_awaited_once_with("велосепед", None, 3)
+        self.assertEqual(page.items, ranked)
+        self.assertEqual(page.suggestions, [])
+        self.repo.get_search_suggestions.assert_not_awaited()
+
+    async def test_empty_result_offers_suggestions(self):
+        self.repo.search_adverts_fulltext.return_value = []
+        self.repo.get_search_suggestions.return_value = ["Велосипед", "Велосипед горный"]
+
+        page = await self.service.search_adverts_page("велосипед", "fulltext")
+
+        self.repo.get_search_suggestions.assert_awaited_once_with("велосипед", 4)
+        self.assertEqual(page.suggestions, ["Велосипед горный"])
+
+    async def test_pattern_mode_does_not_ask_for_suggestions(self):
+        self.repo.get_adverts_by_key_word.return_value = []
+
+        page = await self.service.search_adverts_page("велосипед", "pattern")
+
+        self.assertEqual(page.suggestions, [])
+        self.repo.get_search_suggestions.assert_not_awaited()
+
+    async def test_no_suggestions_on_next_pages(self):
+        self.repo.search_adverts_fulltext.return_value = []
+
+        page = await self.service.search_adverts_page(
+            "велосипед", "fulltext", encode_rank_cursor(0.1, self.adverts[0].id)
+        )
+
+        self.assertEqual(page.suggestions, [])
+        self.repo.get_search_suggestions.assert_not_awaited()
+
+    async def test_memory_backend_uses_ready_index(self):
+        index = SearchIndex()
+
+        async def fetch(after, limit):
+            return self.adverts
+
+        await index.build(fetch, page_size=10)
+        service = AdvertService(self.repo, search_index=index)
+
+        page = await service.search_adverts_page("Объявление", "fulltext", page_size=2, backend="memory")
+
+        self.assertEqual(len(page.items), 2)
+        self.assertIsNotNone(decode_rank_cursor(page.next_cursor))
+        self.repo.search_adverts_fulltext.assert_not_awaited()
+
+    async def test_memory_backend_falls_back_to_sql_until_built(self):
+        self.repo.search_adverts_fulltext.return_value = self.adverts[:1]
+        service = AdvertService(self.repo, search_index=SearchIndex())
+
+        await service.search_adverts_page("Объявление", "fulltext", backend="memory")
+
+        self.repo.search_adverts_fulltext.assert_awaited_once()
+
+    async def test_observers_are_notified(self):
+        observer = Mock(spec=IAdvertObserver)
+        service = AdvertService(self.repo, observers=[observer])
+        advert = self.adverts[0]
+        self.repo.create.return_value = advert
+        self.repo.get_by_id.return_value = advert
+
+        await service.create_advert(advert)
+        await service.delete_advert(advert.id, advert.id_seller)
+
+        observer.on_advert_created.assert_called_once_with(advert)
+        observer.on_advert_deleted.assert_called_once_with(advert.id)
+        self.repo.delete_advert.assert_awaited_once_with(advert.id, advert.id_seller)
+
+
+class TestAdvertServiceFilter(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.repo = AsyncMock(spec=IAdvertRepository)
+        self.service = AdvertService(self.repo)
+        base = datetime(2025, 1, 1, 12, 0, 0)
+        self.adverts = [
+            Advert(
+                id=uuid4(),
+                content=f"Объявление {i}",
+                description="Описание",
+                id_category=uuid4(),
+                price=100 * (i + 1),
+                id_seller=uuid4(),
+                date_created=base - timedelta(minutes=i),
+            )
+            for i in range(3)
+        ]
+
+    async def test_next_cursor_follows_date_sort(self):
+        self.repo.filter_adverts.return_value = FilterResult(items=self.adverts, total=3)
+        flt = AdvertFilter(keyword="велосипед", min_price=100)
+
+        result = await self.service.filter_adverts(flt, page_size=2)
+
+        self.repo.filter_adverts.assert_awaited_once_with(flt, None, 3)
+        self.assertEqual(len(result.items), 2)
+        self.assertEqual(result.total, 3)
+        self.assertEqual(decode_cursor(result.next_cursor), (self.adverts[1].date_created, self.adverts[1].id))
+
+    async def test_price_sort_uses_price_cursor(self):
+        self.repo.filter_adverts.return_value = FilterResult(items=self.adverts[:1])
+        flt = AdvertFilter(sort="price_asc")
+        cursor = encode_price_cursor(100, self.adverts[0].id)
+
+        result = await self.service.filter_adverts(flt, cursor, 2)
+
+        self.repo.filter_adverts.assert_awaited_once_with(flt, (100, self.adverts[0].id), 3)
+        self.assertIsNone(result.next_cursor)
+
+    def test_price_facet_bounds(self):
+        self.assertEqual(PriceFacet.from_bucket(1, 4), PriceFacet(min_price=0, max_price=1000, count=4))
+        self.assertEqual(PriceFacet.from_bucket(len(PRICE_BUCKETS), 1).max_price, None)
@@ -1,8 +1,10 @@
+import asyncio
 import unittest
 from unittest.mock import AsyncMock
+from uuid import uuid4
 
 from models.category import Category
-from services.category_service import CategoryService
+from services.category_service import CategoryCache, CategoryService
 from abstract_repositories.icategory_repository import ICategoryRepository
 
 
@@ -37,4 +39,98 @@ class TestCategoryService(unittest.IsolatedAsyncioTestCase):
         name = await self.service.get_name_by_id(1)
 
         self.assertEqual(name, "Электроника")
-        self.repo.get_name_by_id.assert_awaited_once_with(1)
\ No newline at end of file
+        self.repo.get_name_by_id.assert_awaited_once_with(1)
+
+class TestCategoryCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.repo = AsyncMock(spec=ICategoryRepository)
+        self.cache = CategoryCache(ttl=60, clock=lambda: self.now)
+        self.service = CategoryService(self.repo, self.cache)
+
+        self.cat1 = Category(id=uuid4(), name="Электроника")
+        self.cat2 = Category(id=uuid4(), name="Книги")
+        self.repo.get_all.return_value = [self.cat1, self.cat2]
+
+    async def test_get_all_served_from_cache(self):
+        await self.service.get_all()
+        items = await self.service.get_all()
+
+        self.assertEqual(len(items), 2)
+        self.repo.get_all.assert_awaited_once()
+
+    async def test_get_name_by_id_uses_cached_dictionary(self):
+        name = await self.service.get_name_by_id(self.cat2.id)
+
+        self.assertEqual(name, "Книги")
+        self.repo.get_name_by_id.assert_not_called()
+
+    async def test_unknown_category_falls_back_to_repo(self):
+        self.repo.get_name_by_id.return_value = "Категория не найдена"
+        missing_id = uuid4()
+
+        name = await self.service.get_name_by_id(missing_id)
+
+        self.assertEqual(name, "Категория не найдена")
+        self.repo.get_name_by_id.assert_awaited_once_with(missing_id)
+
+    async def test_ttl_expiry_reloads(self):
+        await self.service.get_all()
+        self.now = 61.0
+        await self.service.get_all()
+
+        self.assertEqual(self.repo.get_all.await_count, 2)
+
+    async def test_invalidate_reloads(self):
+        await self.service.get_all()
+        self.service.invalidate_cache()
+        await self.service.get_all()
+
+        self.assertEqual(self.repo.get_all.await_count, 2)
+
+    async def test_empty_result_is_not_cached(self):
+        self.repo.get_all.return_value = []
+        await self.service.get_all()
+        await self.service.get_all()
+
+        self.assertEqual(self.repo.get_all.await_count, 2)
+
+    async def test_concurrent_misses_share_one_load(self):
+        async def slow_load():
+            await asyncio.sleep(0.01)
+            return [self.cat1, self.cat2]
+
+        self.repo.get_all.side_effect = slow_load
+
+        results = await asyncio.gather(*(self.service.get_all() for _ in range(10)))
+
+        self.assertTrue(all(len(items) == 2 for items in results))
+        self.repo.get_all.assert_awaited_once()
+
+    async def test_invalidate_during_load_starts_new_load(self):
+        old = Category(id=uuid4(), name="Старая")
+        release = asyncio.Event()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await release.wait()
+                return [old]
+            return [self.cat1, self.cat2]
+
+        self.repo.get_all.side_effect = load
+        first = asyncio.create_task(self.service.get_all())
+        await asyncio.sleep(0)
+
+        self.service.invalidate_cache()
+        second = asyncio.create_task(self.service.get_all())
+        await asyncio.sleep(0)
+        release.set()
+
+        self.assertEqual(await first, [self.cat1, self.cat2])
+        self.assertEqual(await second, [self.cat1, self.cat2])
+        self.assertEqual(calls, 2)
+        self.assertEqual(await self.service.get_all(), [self.cat1, self.cat2])
+        self.assertEqual(calls, 2)
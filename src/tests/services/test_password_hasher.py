@@ -0,0 +1,109 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+from models.user import User
+from services.auth_service import AuthService
+from services.password_hasher import PasswordHasher
+
+
+def cheap_hasher(n: int = 16) -> PasswordHasher:
+    return PasswordHasher(n=n, r=1, p=1, workers=2)
+
+
+class TestPasswordHasher(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.hasher = cheap_hasher()
+
+    def tearDown(self):
+        self.hasher.shutdown()
+
+    async def test_hash_roundtrip_in_pool(self):
+        encoded = await self.hasher.hash("secret")
+
+        self.assertTrue(encoded.startswith("scrypt$16$1$1$"))
+        self.assertTrue(await self.hasher.verify("secret", encoded))
+        self.assertFalse(await self.hasher.verify("Secret", encoded))
+        self.assertEqual(self.hasher.stats()["in_flight"], 0)
+
+    async def test_salt_differs_between_hashes(self):
+        self.assertNotEqual(await self.hasher.hash("secret"), await self.hasher.hash("secret"))
+
+    def test_old_cost_still_verifies_but_needs_rehash(self):
+        old = cheap_hasher(n=8).hash_sync("secret")
+
+        self.assertTrue(self.hasher.verify_sync("secret", old))
+        self.assertTrue(self.hasher.needs_rehash(old))
+        self.assertFalse(self.hasher.needs_rehash(self.hasher.hash_sync("secret")))
+
+    def test_plaintext_password_is_legacy(self):
+        self.assertTrue(self.hasher.verify_sync("pass", "pass"))
+        self.assertFalse(self.hasher.verify_sync("pas", "pass"))
+        self.assertTrue(self.hasher.needs_rehash("pass"))
+
+    def test_malformed_hash_does_not_verify(self):
+        self.assertFalse(self.hasher.verify_sync("secret", "scrypt$16$1$1$broken"))
+
+    def test_rejects_cost_not_power_of_two(self):
+        with self.assertRaises(ValueError):
+            PasswordHasher(n=1000)
+
+
+class TestAuthServiceHashing(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.hasher = cheap_hasher()
+        self.repo = AsyncMock()
+        self.service = AuthService(self.repo, hasher=self.hasher)
+
+    def tearDown(self):
+        self.hasher.shutdown()
+
+    def user(self, password: str) -> User:
+        return User(id=uuid4(), nickname="nick", fio="TestFio", email="test@example.com",
+                    phone_number="123", password=password)
+
+    async def test_register_stores_hash(self):
+        self.repo.find_by_email.return_value = None
+        self.repo.create.side_effect = lambda user: user
+
+        created = await self.service.register(object(), {
+            "nickname": "nick", "fio": "TestFio", "email": "test@example.com",
+            "phone_number": "123", "password": "pass", "repeat_password": "pass",
+        })
+
+        self.assertNotEqual(created.password, "pass")
+        self.assertTrue(self.hasher.verify_sync("pass", created.password))
+
+    @patch("services.auth_service.JWTManager.create_access_token", return_value="jwt")
+    async def test_login_upgrades_plaintext_password(self, _):
+        user = self.user("pass")
+        self.repo.find_by_email.return_value = user
+
+        self.assertEqual(await self.service.login(object(), user.email, "pass"), "jwt")
+
+        profile_id, encoded = self.repo.update_password.await_args.args
+        self.assertEqual(profile_id, user.id)
+        self.assertFalse(self.hasher.needs_rehash(encoded))
+        self.assertTrue(self.hasher.verify_sync("pass", encoded))
+
+    @patch("services.auth_service.JWTManager.create_access_token", return_value="jwt")
+    async def test_login_with_current_hash_does_not_rewrite(self, _):
+        self.repo.find_by_email.return_value = self.user(self.hasher.hash_sync("pass"))
+
+        await self.service.login(object(), "test@example.com", "pass")
+
+        self.repo.update_password.assert_not_awaited()
+
+    async def test_wrong_password_is_not_upgraded(self):
+        self.repo.find_by_email.return_value = self.user("pass")
+
+        with self.assertRaises(ValueError):
+            await self.service.login(object(), "test@example.com", "wrong")
+        self.repo.update_password.assert_not_awaited()
+
+    async def test_unknown_email_still_spends_a_verification(self):
+        self.repo.find_by_email.return_value = None
+
+        with self.assertRaises(ValueError):
+            await self.service.login(object(), "nobody@example.com", "pass")
+        self.assertEqual(self.hasher.stats()["verifications"], 1)
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, patch
+
+from core.create_jwt import JWTManager
+from services.auth_service import AuthService
+from services.revocation_store import BloomFilter, RevocationStore, token_digest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives(self):
+        bits, hashes = BloomFilter.size_for(1000, 0.01)
+        bloom = BloomFilter(bytearray(bits // 8), bits, hashes)
+        digests = [token_digest(f"token-{i}") for i in range(1000)]
+        for digest in digests:
+            bloom.add(digest)
+
+        self.assertTrue(all(digest in bloom for digest in digests))
+        false_positives = sum(token_digest(f"other-{i}") in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TestRevocationStore(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = RevocationStore(directory=None, capacity=1000, clock=self.clock)
+
+    def test_revoked_until_expiry(self):
+        self.store.revoke("a", expires_at=1060)
+
+        self.assertTrue(self.store.is_revoked("a"))
+        self.assertFalse(self.store.is_revoked("b"))
+        self.clock.now = 1060
+        self.assertFalse(self.store.is_revoked("a"))
+
+    def test_empty_store_answers_without_hashing(self):
+        self.assertFalse(self.store.is_revoked("a"))
+        self.assertEqual(self.store.stats()["bloom_negatives"], 1)
+
+    def test_already_expired_token_is_not_stored(self):
+        self.store.revoke("a", expires_at=999)
+        self.assertEqual(self.store.stats()["revoked"], 0)
+
+    def test_purge_drops_expired_and_rebuilds_filter(self):
+        for i in range(100):
+            self.store.revoke(f"old-{i}", expires_at=1010)
+        self.clock.now = 1020
+        self.store.revoke("fresh", expires_at=2000)
+
+        stats = self.store.stats()
+        self.assertEqual(stats["revoked"], 1)
+        self.assertEqual(stats["bloom_inserted"], 1)
+        self.assertTrue(self.store.is_revoked("fresh"))
+
+
+class TestSharedRevocationStore(unittest.TestCase):
+    def test_revocation_is_visible_to_other_process_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Два хранилища над одним каталогом — как два воркера uvicorn
+            first = RevocationStore(directory=directory, capacity=1000)
+            second = RevocationStore(directory=directory, capacity=1000)
+            self.assertFalse(second.is_revoked("token"))
+
+            first.revoke("token", expires_at=2 ** 40)
+
+            self.assertTrue(second.is_revoked("token"))
+            self.assertEqual(second.stats()["bloom_inserted"], 1)
+
+    def test_check_does_not_wait_for_writer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = RevocationStore(directory=directory, capacity=1000)
+            store.revoke("token", expires_at=2 ** 40)
+            held, release = threading.Event(), threading.Event()
+
+            def writer():
+                # Как revoke или purge, ждущие файловую блокировку или SQLite
+                with store._locked():
+                    held.set()
+                    release.wait()
+
+            thread = threading.Thread(target=writer)
+            thread.start()
+            held.wait()
+            try:
+                with ThreadPoolExecutor(1) as pool:
+                    self.assertTrue(pool.submit(store.is_revoked, "token").result(timeout=2))
+                    self.assertFalse(pool.submit(store.is_revoked, "other").result(timeout=2))
+            finally:
+                release.set()
+                thread.join()
+
+
+class TestRevocationDirectory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_creates_private_directory(self):
+        directory = os.path.join(self.tmp.name, "revocations")
+        RevocationStore(directory=directory, capacity=1000).is_revoked("token")
+
+        self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+
+    def test_rejects_directory_writable_by_others(self):
+        directory = os.path.join(self.tmp.name, "shared")
+        os.mkdir(directory)
+        os.chmod(directory, 0o777)
+
+        with self.assertRaises(PermissionError):
+            RevocationStore(directory=directory, capacity=1000).is_revoked("token")
+        self.assertEqual(os.listdir(directory), [])
+
+    def test_rejects_directory_of_another_user(self):
+        with patch("services.revocation_store.os.getuid", return_value=os.getuid() + 1):
+            with self.assertRaises(PermissionError):
+                RevocationStore(directory=self.tmp.name, capacity=1000).is_revoked("token")
+
+    def test_rejects_symlink(self):
+        target = os.path.join(self.tmp.name, "target")
+        os.mkdir(target, 0o700)
+        link = os.path.join(self.tmp.name, "link")
+        os.symlink(target, link)
+
+        with self.assertRaises(PermissionError):
+            RevocationStore(directory=link, capacity=1000).is_revoked("token")
+
+
+class TestAuthServiceRevocation(unittest.IsolatedAsyncioTestCase):
+    async def test_logout_revokes_token(self):
+        service = AuthService(AsyncMock())
+        token = JWTManager.create_access_token({"sub": "a@b.c", "id": "1"})
+        self.assertEqual(service.verify_token(token)["sub"], "a@b.c")
+
+        self.assertTrue(await service.logout(token))
+
+        with self.assertRaises(ValueError):
+            service.verify_token(token)
+
+    async def test_logout_writes_outside_event_loop(self):
+        service = AuthService(AsyncMock())
+        token = JWTManager.create_access_token({"sub": "a@b.c", "id": "1"})
+
+        with patch("services.auth_service.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+            await service.logout(token)
+
+        self.assertIs(to_thread.call_args.args[0].__func__, RevocationStore.revoke)
+        self.assertTrue(service.revocations.is_revoked(token))
+
+    async def test_logout_ignores_invalid_token(self):
+        service = AuthService(AsyncMock())
+        self.assertFalse(await service.logout("not-a-token"))
+        self.assertEqual(service.revocations.stats()["revoked"], 0)
@@ -0,0 +1,99 @@
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from abstract_repositories.iadvert_repository import IAdvertRepository
+from core.text import normalize_query
+from dto.page_dto import AdvertPage
+from models.advert import Advert, RankedAdvert
+from services.advert_service import AdvertService
+from services.search_cache import SearchCache, page_size_bytes
+
+
+class TestSearchCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.repo = AsyncMock(spec=IAdvertRepository)
+        self.cache = SearchCache(max_bytes=1024 * 1024, ttl=60)
+        self.service = AdvertService(self.repo, observers=[self.cache], search_cache=self.cache)
+        self.advert = Advert(
+            id=uuid4(),
+            content="Велосипед",
+            description="Горный",
+            id_category=uuid4(),
+            price=100,
+            id_seller=uuid4(),
+            date_created=datetime(2025, 1, 1),
+        )
+        self.repo.search_adverts_fulltext.return_value = [RankedAdvert(**self.advert.model_dump(), rank=0.5)]
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  iPhone\t 12 "), "iphone 12")
+        self.assertEqual(normalize_query("ВЕЛОСИПЕД"), "велосипед")
+        self.assertEqual(normalize_query("ｉｐｈｏｎｅ"), "iphone")
+
+    async def test_equivalent_queries_share_entry(self):
+        first = await self.service.search_adverts_page("Велосипед ", "fulltext")
+        second = await self.service.search_adverts_page("  велосипед", "fulltext")
+
+        self.assertIs(first, second)
+        self.repo.search_adverts_fulltext.assert_awaited_once_with("велосипед", None, 31)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    async def test_modes_are_cached_separately(self):
+        self.repo.search_adverts_fuzzy.return_value = []
+        self.repo.get_search_suggestions.return_value = []
+
+        await self.service.search_adverts_page("велосипед", "fulltext")
+        await self.service.search_adverts_page("велосипед", "fuzzy")
+
+        self.repo.search_adverts_fulltext.assert_awaited_once()
+        self.repo.search_adverts_fuzzy.assert_awaited_once()
+
+    async def test_create_and_delete_invalidate(self):
+        self.repo.create.return_value = self.advert
+        self.repo.get_by_id.return_value = self.advert
+
+        await self.service.search_adverts_page("велосипед", "fulltext")
+        await self.service.create_advert(self.advert)
+        await self.service.search_adverts_page("велосипед", "fulltext")
+        await self.service.delete_advert(self.advert.id, self.advert.id_seller)
+        await self.service.search_adverts_page("велосипед", "fulltext")
+
+        self.assertEqual(self.repo.search_adverts_fulltext.await_count, 3)
+        self.assertEqual(self.cache.stats()["invalidations"], 2)
+
+    async def test_result_computed_before_write_is_not_cached(self):
+        async def search_during_write(query, after, limit):
+            self.cache.on_advert_created(self.advert)
+            return [RankedAdvert(**self.advert.model_dump(), rank=0.5)]
+
+        self.repo.search_adverts_fulltext.side_effect = search_during_write
+
+        await self.service.search_adverts_page("велосипед", "fulltext")
+
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    async def test_empty_result_is_not_cached(self):
+        self.repo.search_adverts_fulltext.return_value = []
+        self.repo.get_search_suggestions.return_value = ["велосипед"]
+
+        await self.service.search_adverts_page("велосипет", "fulltext")
+        await self.service.search_adverts_page("велосипет", "fulltext")
+
+        self.assertEqual(self.repo.search_adverts_fulltext.await_count, 2)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_page_size_grows_with_content(self):
+        small = AdvertPage(items=[self.advert])
+        big = AdvertPage(items=[self.advert.model_copy(update={"description": "x" * 1000})])
+
+        self.assertGreater(page_size_bytes(big), page_size_bytes(small) + 900)
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = SearchCache(max_bytes=0)
+        key = cache.key("велосипед", "fulltext", None, None, 30)
+
+        cache.put(key, AdvertPage(items=[]))
+
+        self.assertIsNone(cache.get(key))
@@ -0,0 +1,132 @@
+import unittest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from models.advert import Advert
+from services.search_index import SearchIndex, tokenize
+
+
+def make_advert(content: str, description: str = "", minutes: int = 0) -> Advert:
+    return Advert(
+        id=uuid4(),
+        content=content,
+        description=description,
+        id_category=uuid4(),
+        price=100,
+        id_seller=uuid4(),
+        date_created=datetime(2025, 1, 1) - timedelta(minutes=minutes),
+    )
+
+
+class TestSearchIndex(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.adverts = [
+            make_advert("Велосипед горный", "Почти новый велосипед, велосипед в отличном состоянии", 0),
+            make_advert("Велосипед детский", "Для ребёнка 5 лет", 1),
+            make_advert("Диван", "Угловой диван, самовывоз", 2),
+            make_advert("Apple iPhone 12", "Чехол в подарок", 3),
+        ]
+        self.index = SearchIndex()
+
+    async def build(self, page_size: int = 2):
+        calls = []
+
+        async def fetch(after, limit):
+            calls.append(after)
+            start = 0 if after is None else next(i for i, a in enumerate(self.adverts) if a.id == after[1]) + 1
+            return self.adverts[start:start + limit]
+
+        await self.index.build(fetch, page_size)
+        return calls
+
+    async def test_build_reads_keyset_pages(self):
+        calls = await self.build(page_size=2)
+
+        self.assertEqual(len(calls), 3)
+        self.assertIsNone(calls[0])
+        self.assertEqual(calls[1], (self.adverts[1].date_created, self.adverts[1].id))
+        self.assertTrue(self.index.ready)
+        self.assertEqual(len(self.index), 4)
+
+    async def test_bm25_ranks_more_relevant_first(self):
+        await self.build()
+
+        found = self.index.search("велосипед")
+
+        self.assertEqual([a.id for a in found], [self.adverts[0].id, self.adverts[1].id])
+        self.assertGreater(found[0].rank, found[1].rank)
+
+    async def test_search_is_case_insensitive(self):
+        await self.build()
+
+        found = self.index.search("IPHONE")
+
+        self.assertEqual([a.id for a in found], [self.adverts[3].id])
+
+    async def test_pages_continue_after_cursor(self):
+        await self.build()
+        first = self.index.search("велосипед диван", limit=2)
+
+        rest = self.index.search("велосипед диван", (first[-1].rank, first[-1].id), 2)
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(rest), 1)
+        self.assertNotIn(rest[0].id, {a.id for a in first})
+
+    async def test_incremental_create_and_delete(self):
+        await self.build()
+        sofa = make_advert("Диван-кровать", "Раскладной диван")
+
+        self.index.on_advert_created(sofa)
+        self.index.on_advert_deleted(self.adverts[2].id)
+
+        self.assertEqual([a.id for a in self.index.search("диван")], [sofa.id])
+        self.assertEqual(len(self.index), 4)
+
+    async def test_events_during_build_are_applied(self):
+        late = make_advert("Самокат", "Электрический")
+
+        async def fetch(after, limit):
+            self.index.on_advert_created(late)
+            self.index.on_advert_deleted(self.adverts[0].id)
+            return self.adverts
+
+        await self.index.build(fetch, page_size=10)
+
+        self.assertEqual([a.id for a in self.index.search("самокат")], [late.id])
+        self.assertEqual([a.id for a in self.index.search("горный")], [])
+
+    async def test_failed_rebuild_keeps_current_index(self):
+        await self.build()
+
+        async def fetch(after, limit):
+            if after is not None:
+                raise ConnectionError("replica went away")
+            return [make_advert("Самокат", "Электрический")] * limit
+
+        with self.assertRaises(ConnectionError):
+            await self.index.build(fetch, page_size=1)
+
+        self.assertTrue(self.index.ready)
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.index.search("самокат"), [])
+
+    async def test_compaction_drops_tombstones(self):
+        await self.build()
+        extra = [make_advert(f"Лот {i}", "распродажа") for i in range(600)]
+        for advert in extra:
+            self.index.on_advert_created(advert)
+        for advert in extra[:500]:
+            self.index.on_advert_deleted(advert.id)
+
+        stats = self.index.stats()
+
+        self.assertLess(stats["tombstones"], 500)
+        self.assertEqual(len(self.index.search("распродажа", limit=1000)), 100)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Ёлка, НОВАЯ!"), ["елка", "новая"])
+
+    def test_search_before_build_is_empty(self):
+        self.assertFalse(self.index.ready)
+        self.assertEqual(self.index.search("велосипед"), [])
@@ -0,0 +1,171 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from abstract_repositories.iadvert_repository import IAdvertRepository
+from models.advert import Advert, RankedAdvert
+from services.advert_service import AdvertService
+from services.suggest_trie import SuggestTrie
+
+
+def make_advert(content: str, minutes: int = 0) -> Advert:
+    return Advert(
+        id=uuid4(),
+        content=content,
+        description="Описание",
+        id_category=uuid4(),
+        price=100,
+        id_seller=uuid4(),
+        date_created=datetime(2025, 1, 1) - timedelta(minutes=minutes),
+    )
+
+
+class TestSuggestTrie(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.trie = SuggestTrie()
+
+    def test_heavier_completions_come_first(self):
+        self.trie.add("Велосипед детский")
+        self.trie.add("Велосипед горный", weight=3)
+        self.trie.add("Вешалка", weight=2)
+
+        self.assertEqual(
+            self.trie.complete("ве"),
+            ["Велосипед горный", "Вешалка", "Велосипед детский"],
+        )
+        self.assertEqual(self.trie.complete("вел", limit=1), ["Велосипед горный"])
+
+    def test_prefix_is_normalized(self):
+        self.trie.add("iPhone  12")
+
+        self.assertEqual(self.trie.complete("  IPH"), ["iPhone 12"])
+
+    def test_repeated_text_accumulates_weight(self):
+        self.trie.add("стол")
+        self.trie.add("стул", weight=2)
+        self.trie.add("Стол")
+        self.trie.add("стол")
+
+        self.assertEqual(self.trie.complete("ст"), ["стол", "стул"])
+        self.assertEqual(len(self.trie), 2)
+
+    def test_unknown_prefix(self):
+        self.trie.add("диван")
+
+        self.assertEqual(self.trie.complete("кресло"), [])
+        self.assertEqual(self.trie.complete(""), [])
+
+    def test_long_titles_are_truncated(self):
+        trie = SuggestTrie(max_key=10)
+        trie.add("Очень длинный заголовок объявления")
+
+        self.assertEqual(trie.complete("очень"), ["Очень длин"])
+        self.assertEqual(trie.stats()["nodes"], 11)
+
+    async def test_build_and_incremental_update(self):
+        adverts = [make_advert("Диван", 0), make_advert("Дрель", 1), make_advert("Диван", 2)]
+
+        async def fetch(after, limit):
+            start = 0 if after is None else 2
+            return adverts[start:start + limit]
+
+        await self.trie.build(fetch, page_size=2)
+        self.trie.on_advert_created(make_advert("Дрон"))
+
+        self.assertTrue(self.trie.ready)
+        self.assertEqual(self.trie.complete("д"), ["Диван", "Дрель", "Дрон"])
+
+
+class TestQuerySuggestions(unittest.IsolatedAsyncioTestCase):
+    def test_query_needs_repeats(self):
+        trie = SuggestTrie(min_count=3)
+        trie.add_query("дрель")
+        trie.add_query("Дрель ")
+
+        self.assertEqual(trie.complete("др"), [])
+        trie.add_query("дрель")
+        self.assertEqual(trie.complete("др"), ["дрель"])
+        self.assertEqual(trie.stats()["queries"], 1)
+
+    def test_candidates_are_bounded(self):
+        trie = SuggestTrie(min_count=3, max_queries=4)
+        trie.add_query("дрель")
+        trie.add_query("дрель")
+        for n in range(10):
+            trie.add_query(f"запрос {n}")
+
+        self.assertLessEqual(trie.stats()["candidates"], 4)
+        for _ in range(3):
+            trie.add_query("дрель")
+        self.assertEqual(trie.complete("др"), ["дрель"])
+
+    def test_accepted_queries_are_bounded(self):
+        trie = SuggestTrie(min_count=1, max_queries=2)
+        for text in ("диван", "дрель", "дрон"):
+            trie.add_query(text)
+
+        self.assertEqual(len(trie), 2)
+
+    def test_node_limit(self):
+        trie = SuggestTrie(max_nodes=6)
+        trie.add("диван")
+        trie.add("кресло")
+
+        self.assertEqual(trie.complete("д"), ["диван"])
+        self.assertEqual(trie.stats()["dropped"], 1)
+        self.assertLessEqual(trie.nodes, 6)
+
+    async def test_rebuild_decays_queries(self):
+        adverts = [make_advert("Диван")]
+
+        async def fetch(after, limit):
+            return adverts
+
+        trie = SuggestTrie(min_count=1)
+        await trie.build(fetch, page_size=10)
+        trie.add_query("дрель")
+        for _ in range(4):
+            trie.add_query("дрон")
+
+        await trie.rebuild(fetch, page_size=10)
+        self.assertEqual(trie.complete("д"), ["дрон", "Диван"])
+
+        await trie.rebuild(fetch, page_size=10)
+        await trie.rebuild(fetch, page_size=10)
+        self.assertEqual(trie.complete("д"), ["Диван"])
+        self.assertEqual(trie.nodes, 6)
+
+    async def test_failed_rebuild_keeps_tree(self):
+        trie = SuggestTrie(min_count=1)
+        trie.add_query("дрель")
+
+        async def fetch(after, limit):
+            raise ConnectionError("replica went away")
+
+        with self.assertRaises(ConnectionError):
+            await trie.rebuild(fetch)
+        self.assertEqual(trie.complete("д"), ["дрель"])
+
+
+class TestAutocomplete(unittest.IsolatedAsyncioTestCase):
+    async def test_successful_queries_become_suggestions(self):
+        repo = AsyncMock(spec=IAdvertRepository)
+        trie = SuggestTrie(min_count=2)
+        service = AdvertService(repo, suggest_trie=trie)
+        advert = make_advert("Велосипед")
+        repo.search_adverts_fulltext.return_value = [RankedAdvert(**advert.model_dump(), rank=0.5)]
+
+        await service.search_adverts_page("Велосипед BMX", "fulltext")
+        self.assertEqual(await service.autocomplete("вел"), [])
+        await service.search_adverts_page("Велосипед BMX", "fulltext")
+        repo.search_adverts_fulltext.return_value = []
+        repo.get_search_suggestions.return_value = []
+        await service.search_adverts_page("велосипедд", "fulltext")
+
+        self.assertEqual(await service.autocomplete("вел"), ["велосипед bmx"])
+
+    async def test_without_trie(self):
+        service = AdvertService(AsyncMock(spec=IAdvertRepository))
+
+        self.assertEqual(await service.autocomplete("вел"), [])
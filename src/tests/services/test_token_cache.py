@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from services.auth_service import AuthService
+from services.token_cache import TokenCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.decode = MagicMock(return_value={"sub": "a@b.c", "id": "1", "exp": 1060})
+        self.cache = TokenCache(max_entries=2, decode=self.decode, clock=self.clock)
+
+    def test_second_lookup_skips_verification(self):
+        self.assertEqual(self.cache.decode("t")["sub"], "a@b.c")
+        self.cache.decode("t")
+
+        self.decode.assert_called_once_with("t")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_entry_expires_with_token(self):
+        self.cache.decode("t")
+        self.clock.now = 1060
+        self.decode.side_effect = ValueError("Invalid token")
+
+        with self.assertRaises(ValueError):
+            self.cache.decode("t")
+
+    def test_invalid_token_is_not_cached(self):
+        self.decode.side_effect = ValueError("Invalid token")
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self.cache.decode("bad")
+
+        self.assertEqual(self.decode.call_count, 2)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_bounded_by_entries(self):
+        for token in ("a", "b", "c"):
+            self.cache.decode(token)
+
+        self.assertEqual(self.cache.stats()["entries"], 2)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+
+class TestAuthServiceTokenCache(unittest.IsolatedAsyncioTestCase):
+    async def test_logout_revokes_cached_token(self):
+        decode = MagicMock(return_value={"sub": "a@b.c", "exp": 2 ** 40})
+        service = AuthService(AsyncMock(), TokenCache(decode=decode))
+        service.verify_token("t")
+
+        await service.logout("t")
+
+        with self.assertRaises(ValueError):
+            service.verify_token("t")
+        self.assertEqual(decode.call_count, 1)
@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+
+from benchmarks.bench_http import (HttpClient, PhaseResult, compare, percentile, read_response, summarize,
+                                   unlimited_env)
+
+
+def _reader(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+class TestReadResponse(unittest.IsolatedAsyncioTestCase):
+    async def test_content_length_and_cookies(self):
+        response = await read_response(_reader(
+            b"HTTP/1.1 303 See Other\r\nlocation: /\r\nset-cookie: access_token=abc.def; HttpOnly; Path=/\r\n"
+            b"content-length: 2\r\n\r\nok"
+        ))
+        self.assertEqual(response.status, 303)
+        self.assertEqual(response.cookies, {"access_token": "abc.def"})
+        self.assertEqual(response.body, b"ok")
+
+    async def test_chunked_body(self):
+        response = await read_response(_reader(
+            b"HTTP/1.1 200 OK\r\ntransfer-encoding: chunked\r\n\r\n3\r\nabc\r\n2\r\nde\r\n0\r\n\r\n"
+        ))
+        self.assertEqual(response.body, b"abcde")
+
+    async def test_client_reuses_connection(self):
+        connections = []
+
+        async def handle(reader, writer):
+            connections.append(writer)
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(b"HTTP/1.1 200 OK\r\ncontent-length: 5\r\n\r\nhello")
+                await writer.drain()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = HttpClient("127.0.0.1", port)
+        try:
+            first = await client.request("GET", "/")
+            second = await client.request("POST", "/like/1", form={"a": "b"})
+        finally:
+            await client.close()
+            server.close()
+
+        self.assertEqual((first.body, second.status), (b"hello", 200))
+        self.assertEqual(len(connections), 1)
+
+
+class TestReport(unittest.TestCase):
+    def test_percentile_is_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_summarize_counts_db_queries_per_request(self):
+        result = PhaseResult()
+        for elapsed in (0.01, 0.02, 0.03, 0.04):
+            result.record("index:anon", 200, elapsed)
+
+        summary = summarize(result, elapsed=2.0, queries=12)
+
+        self.assertEqual(summary["rps"], 2.0)
+        self.assertEqual(summary["db_queries_per_request"], 3.0)
+        self.assertEqual(summary["routes"]["index:anon"]["p50_ms"], 20.0)
+        self.assertEqual(summary["routes"]["index:anon"]["statuses"], {"200": 4})
+
+    def test_db_queries_unknown_with_several_workers(self):
+        result = PhaseResult()
+        result.record("index:anon", 200, 0.01)
+
+        self.assertIsNone(summarize(result, elapsed=1.0, queries=None)["db_queries_per_request"])
+
+    def test_summarize_reports_rate_limited_share(self):
+        result = PhaseResult()
+        result.record("like:user", 200, 0.01)
+        for _ in range(3):
+            result.record("like:user", 429, 0.001)
+
+        self.assertEqual(summarize(result, elapsed=1.0, queries=None)["rate_limited"], 0.75)
+
+    def test_spawned_server_runs_without_rate_limits(self):
+        env = unlimited_env()
+
+        self.assertEqual(env["RATE_LIMIT_LOGIN_IP"], "0")
+        self.assertEqual(env["RATE_LIMIT_DEAL_CREATE_USER"], "0")
+        self.assertTrue(all(value == "0" for value in env.values()))
+
+    def test_compare_reports_change(self):
+        base = {"phases": {"index:anon": {"routes": {"index:anon": {"rps": 100.0, "p95_ms": 10.0}}}}}
+        current = {"phases": {"index:anon": {"routes": {"index:anon": {"rps": 150.0, "p95_ms": 5.0}}}}}
+        line, = compare(base, current)
+        self.assertIn("+50.0%", line)
+        self.assertIn("-50.0%", line)
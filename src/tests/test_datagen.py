@@ -0,0 +1,81 @@
+import unittest
+from collections import Counter
+from datetime import datetime
+
+from benchmarks.datagen import TABLES, Volumes, generate
+
+
+class FakeCopyConnection:
+    """
+    Соединение asyncpg, которое складывает строки COPY в память.
+    """
+
+    def __init__(self):
+        self.tables = {}
+        self.executed = []
+
+    async def copy_records_to_table(self, table, schema_name, columns, records):
+        self.tables[table] = [dict(zip(columns, row)) for row in records]
+
+    async def execute(self, sql, *args):
+        self.executed.append(sql)
+
+    async def fetch(self, sql, *args):
+        return []
+
+
+class TestDatagen(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.conn = FakeCopyConnection()
+        self.now = datetime(2025, 6, 1)
+        volumes = Volumes(users=200, categories=10, adverts=2000, likes=6000, deals=500, days=90)
+        self.dataset = await generate(self.conn, volumes, seed=7, now=self.now)
+
+    def test_fills_every_table(self):
+        self.assertEqual(set(self.conn.tables), set(TABLES))
+        self.assertEqual(self.dataset.rows["adverts"], 2000)
+        self.assertEqual(self.dataset.rows["sellers"], 40)
+        self.assertIn("ANALYZE adv_uuid.likes", self.conn.executed)
+
+    def test_foreign_keys_point_to_generated_rows(self):
+        users = {row["id"] for row in self.conn.tables["profiles"]}
+        sellers = {row["profile_id"] for row in self.conn.tables["sellers"]}
+        adverts = {row["id"] for row in self.conn.tables["adverts"]}
+        categories = {row["id"] for row in self.conn.tables["categories"]}
+
+        self.assertTrue(sellers <= users)
+        for advert in self.conn.tables["adverts"]:
+            self.assertIn(advert["id_seller"], sellers)
+            self.assertIn(advert["id_category"], categories)
+        for like in self.conn.tables["likes"]:
+            self.assertIn(like["id_customer"], users)
+            self.assertIn(like["id_advert"], adverts)
+        self.assertIn(self.dataset.hot_advert_id, adverts)
+        self.assertIn(self.dataset.hot_user_email, {row["email"] for row in self.conn.tables["profiles"]})
+
+    def test_likes_are_unique_and_follow_publication(self):
+        published = {row["id"]: row["date_created"] for row in self.conn.tables["adverts"]}
+        pairs = [(like["id_customer"], like["id_advert"]) for like in self.conn.tables["likes"]]
+
+        self.assertEqual(len(pairs), len(set(pairs)))
+        for like in self.conn.tables["likes"]:
+            self.assertGreaterEqual(like["date_created"], published[like["id_advert"]])
+            self.assertLessEqual(like["date_created"], self.now)
+
+    def test_popularity_is_skewed(self):
+        per_user = Counter(like["id_customer"] for like in self.conn.tables["likes"])
+        counts = sorted(per_user.values(), reverse=True)
+        self.assertGreater(counts[0], 10 * counts[len(counts) // 2])
+        self.assertEqual(per_user.most_common(1)[0][0], self.dataset.hot_user_id)
+
+    def test_recent_adverts_are_denser(self):
+        dates = [row["date_created"] for row in self.conn.tables["adverts"]]
+        recent = sum(1 for date in dates if (self.now - date).days < 9)
+        self.assertGreater(recent, len(dates) * 0.2)
+        self.assertEqual(dates, sorted(dates))
+
+    async def test_same_seed_gives_same_shape(self):
+        conn = FakeCopyConnection()
+        volumes = Volumes(users=200, categories=10, adverts=2000, likes=6000, deals=500, days=90)
+        dataset = await generate(conn, volumes, seed=7, now=self.now)
+        self.assertEqual(dataset.rows, self.dataset.rows)
@@ -0,0 +1,92 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.db import InstrumentedPool, PoolConfig, PoolCounter, QueryCounter
+
+
+class TestPoolConfig(unittest.TestCase):
+    def test_defaults(self):
+        with patch.dict(os.environ, {}, clear=True):
+            config = PoolConfig.from_env("admin")
+        self.assertEqual(config, PoolConfig())
+
+    def test_role_setting_overrides_common_one(self):
+        env = {
+            "DB_POOL_SIZE": "7",
+            "DB_ANY_USER_POOL_SIZE": "20",
+            "DB_ANY_USER_POOL_PRE_PING": "true",
+            "DB_STATEMENT_CACHE_SIZE": "0",
+        }
+        with patch.dict(os.environ, env, clear=True):
+            any_user = PoolConfig.from_env("any_user")
+            admin = PoolConfig.from_env("admin")
+
+        self.assertEqual(any_user.pool_size, 20)
+        self.assertTrue(any_user.pool_pre_ping)
+        self.assertEqual(any_user.statement_cache_size, 0)
+        self.assertEqual(admin.pool_size, 7)
+        self.assertFalse(admin.pool_pre_ping)
+
+
+class TestInstrumentedPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine(
+            "sqlite+aiosqlite:///:memory:",
+            poolclass=InstrumentedPool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def test_only_blocked_checkouts_are_waits(self):
+        pool = self.engine.pool
+        async with self.engine.connect():
+            pass
+        self.assertEqual(pool.wait_count, 0)
+
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            self.assertEqual(pool.checkedout(), 1)
+
+            with self.assertRaises(exc.TimeoutError):
+                async with self.engine.connect():
+                    pass
+
+        self.assertEqual(pool.timeouts, 1)
+        self.assertEqual(pool.wait_count, 1)
+        self.assertGreaterEqual(pool.wait_time_max, 0.05)
+
+    async def test_checkouts_and_connects_are_counted_by_events(self):
+        counter = PoolCounter()
+        counter.attach(self.engine, "any_user")
+        for _ in range(3):
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        await self.engine.dispose()
+        async with self.engine.connect():
+            pass
+
+        # После dispose() пул пересоздан, слушатели остались
+        self.assertEqual(counter.stats("any_user"), {"checkouts": 4, "connects": 2})
+
+
+class TestQueryCounter(unittest.IsolatedAsyncioTestCase):
+    async def test_counts_statements_per_role(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        counter = QueryCounter()
+        counter.attach(engine, "any_user")
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+        finally:
+            await engine.dispose()
+
+        self.assertEqual(counter.stats(), {"total": 2, "any_user": 2})
@@ -0,0 +1,65 @@
+import unittest
+
+from core.lru_cache import LruCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLruCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = LruCache(max_bytes=10, ttl=5, sizeof=len, clock=self.clock)
+
+    def test_hit_and_miss_are_counted(self):
+        self.cache.put("a", "xx")
+
+        self.assertEqual(self.cache.get("a"), "xx")
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.stats()["hit_rate"], 0.5)
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        self.cache.put("a", "xxxx")
+        self.cache.put("b", "xxxx")
+        self.cache.get("a")
+
+        self.cache.put("c", "xxxx")
+
+        self.assertEqual(self.cache.get("a"), "xxxx")
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.bytes, 8)
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_value_larger_than_cache_is_not_stored(self):
+        self.assertFalse(self.cache.put("big", "x" * 11))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_entries_expire(self):
+        self.cache.put("a", "x")
+        self.cache.put("b", "x", ttl=20)
+        self.clock.now = 6
+
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.get("b"), "x")
+        self.assertEqual(self.cache.expirations, 1)
+        self.assertEqual(self.cache.bytes, 1)
+
+    def test_replacing_key_keeps_byte_count(self):
+        self.cache.put("a", "xxx")
+        self.cache.put("a", "xxxxx")
+
+        self.assertEqual(self.cache.bytes, 5)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_max_entries(self):
+        cache = LruCache(max_bytes=100, ttl=5, sizeof=len, max_entries=2, clock=self.clock)
+        for key in "abc":
+            cache.put(key, "x")
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("a"))
@@ -0,0 +1,48 @@
+import unittest
+
+from fastapi import FastAPI
+from starlette.requests import Request
+
+from routers.metrics import metrics_allowed, metrics_router
+
+
+def make_request(host="127.0.0.1", authorization=None):
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return Request({"type": "http", "method": "GET", "path": "/metrics", "headers": headers,
+                    "client": (host, 5000)})
+
+
+class TestMetricsAccess(unittest.TestCase):
+    def test_loopback_without_token(self):
+        self.assertTrue(metrics_allowed(make_request("127.0.0.1"), token=""))
+        self.assertTrue(metrics_allowed(make_request("::1"), token=""))
+        self.assertFalse(metrics_allowed(make_request("10.0.0.7"), token=""))
+
+    def test_token_required_when_configured(self):
+        self.assertTrue(metrics_allowed(make_request("10.0.0.7", "Bearer s3cret"), token="s3cret"))
+        self.assertTrue(metrics_allowed(make_request("10.0.0.7", "bearer s3cret"), token="s3cret"))
+        self.assertFalse(metrics_allowed(make_request("10.0.0.7", "Bearer wrong"), token="s3cret"))
+        self.assertFalse(metrics_allowed(make_request("10.0.0.7", "s3cret"), token="s3cret"))
+        # С токеном loopback-адрес сам по себе доступа не даёт
+        self.assertFalse(metrics_allowed(make_request("127.0.0.1"), token="s3cret"))
+
+
+class TestMetricsRoute(unittest.IsolatedAsyncioTestCase):
+    async def test_remote_client_gets_404(self):
+        app = FastAPI()
+        app.include_router(metrics_router)
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/metrics", "raw_path": b"/metrics", "root_path": "", "query_string": b"",
+            "headers": [], "client": ("203.0.113.5", 5000), "server": ("test", 80),
+        }
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+        self.assertEqual(sent[0]["status"], 404)
@@ -0,0 +1,68 @@
+import unittest
+
+from core.query_plans import PlanSummary, PlanTolerance, compare_plans, summarize_plan
+
+
+def _explain(**root):
+    return [{"Plan": root}]
+
+
+class TestSummarizePlan(unittest.TestCase):
+    def test_collects_shape_rows_and_buffers(self):
+        summary = summarize_plan(_explain(**{
+            "Node Type": "Limit", "Total Cost": 12.5, "Actual Rows": 30, "Actual Loops": 1,
+            "Shared Hit Blocks": 10, "Shared Read Blocks": 2,
+            "Plans": [{"Node Type": "Index Scan", "Relation Name": "adverts", "Index Name": "adverts_price_idx"}],
+        }))
+
+        self.assertEqual(summary.shape, ["Limit", "Index Scan on adverts using adverts_price_idx"])
+        self.assertEqual(summary.scans, ["Index Scan on adverts using adverts_price_idx"])
+        self.assertEqual((summary.rows, summary.cost, summary.buffers), (30, 12.5, 12))
+
+    def test_round_trips_through_json(self):
+        summary = PlanSummary(["Seq Scan on categories"], ["Seq Scan on categories"], 40, 1.0, 1)
+        self.assertEqual(PlanSummary.from_json(summary.to_json()), summary)
+
+
+class TestComparePlans(unittest.TestCase):
+    def setUp(self):
+        scan = "Index Scan on adverts using adverts_date_idx"
+        self.baseline = PlanSummary(["Limit", scan], [scan], 30, 100.0, 200)
+
+    def test_same_plan_passes(self):
+        self.assertEqual(compare_plans(self.baseline, self.baseline), [])
+
+    def test_new_seq_scan_fails(self):
+        current = PlanSummary(["Limit", "Seq Scan on adverts"], ["Seq Scan on adverts"], 30, 100.0, 200)
+        self.assertEqual(compare_plans(self.baseline, current), [
+            "чтение: Index Scan on adverts using adverts_date_idx -> Seq Scan on adverts",
+        ])
+
+    def test_other_index_fails(self):
+        scan = "Index Scan on adverts using adverts_price_idx"
+        current = PlanSummary(["Limit", scan], [scan], 30, 100.0, 200)
+        self.assertEqual(len(compare_plans(self.baseline, current)), 1)
+
+    def test_extra_scan_of_same_kind_fails(self):
+        current = PlanSummary(self.baseline.shape, self.baseline.scans * 2, 30, 100.0, 200)
+        self.assertEqual(compare_plans(self.baseline, current), [
+            "чтение: - -> Index Scan on adverts using adverts_date_idx",
+        ])
+
+    def test_shape_change_outside_scans_passes(self):
+        current = PlanSummary(["Sort", "Limit"] + self.baseline.scans, self.baseline.scans, 30, 100.0, 200)
+        self.assertEqual(compare_plans(self.baseline, current), [])
+
+    def test_known_seq_scan_is_allowed(self):
+        baseline = PlanSummary(["Seq Scan on categories"], ["Seq Scan on categories"], 40, 1.0, 1)
+        self.assertEqual(compare_plans(baseline, baseline), [])
+
+    def test_cost_and_buffer_jumps_fail(self):
+        current = PlanSummary(self.baseline.shape, self.baseline.scans, 30, 1000.0, 5000)
+        problems = compare_plans(self.baseline, current)
+        self.assertEqual(len(problems), 2)
+
+    def test_small_growth_is_noise(self):
+        baseline = PlanSummary(["Index Scan"], ["Index Scan"], 1, 8.0, 3)
+        current = PlanSummary(["Index Scan"], ["Index Scan"], 50, 16.0, 40)
+        self.assertEqual(compare_plans(baseline, current, PlanTolerance()), [])
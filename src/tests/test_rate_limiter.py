@@ -0,0 +1,146 @@
+import unittest
+
+from core.rate_limiter import Limit, RateLimiter, RateLimitMiddleware, RateRule
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+LIKE = RateRule("like", "POST", "/like/", per_ip=Limit.parse("3/m"), per_user=Limit.parse("2/10s"))
+LOGIN = RateRule("login", "POST", "/login", per_ip=Limit.parse("2/m"), per_user=None)
+
+
+class TestLimit(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(Limit.parse("10/m"), Limit(burst=10, rate=10 / 60))
+        self.assertEqual(Limit.parse("5/10s"), Limit(burst=5, rate=0.5))
+        self.assertEqual(Limit.parse("30/3600"), Limit(burst=30, rate=30 / 3600))
+        self.assertIsNone(Limit.parse(""))
+        self.assertIsNone(Limit.parse("0"))
+
+    def test_parse_rejects_garbage(self):
+        for spec in ("10", "-1/m", "abc/m"):
+            with self.assertRaises(ValueError):
+                Limit.parse(spec)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(rules=(LIKE, LOGIN), shards=4, sweep_every=1000, clock=self.clock)
+
+    def test_match(self):
+        self.assertIs(self.limiter.match("POST", "/login"), LOGIN)
+        self.assertIs(self.limiter.match("POST", "/like/42"), LIKE)
+        self.assertIsNone(self.limiter.match("GET", "/login"))
+        self.assertIsNone(self.limiter.match("POST", "/login/extra"))
+
+    def test_burst_then_refill(self):
+        self.assertEqual([self.limiter.check(LOGIN, "1.1.1.1", None) for _ in range(2)], [0.0, 0.0])
+        self.assertAlmostEqual(self.limiter.check(LOGIN, "1.1.1.1", None), 30.0)
+
+        self.clock.now += 30
+        self.assertEqual(self.limiter.check(LOGIN, "1.1.1.1", None), 0.0)
+
+    def test_ip_buckets_are_independent(self):
+        self.limiter.check(LOGIN, "1.1.1.1", None)
+        self.limiter.check(LOGIN, "1.1.1.1", None)
+
+        self.assertEqual(self.limiter.check(LOGIN, "2.2.2.2", None), 0.0)
+
+    def test_user_limit_applies_across_ips(self):
+        self.limiter.check(LIKE, "1.1.1.1", "u1")
+        self.limiter.check(LIKE, "2.2.2.2", "u1")
+
+        self.assertGreater(self.limiter.check(LIKE, "3.3.3.3", "u1"), 0)
+        self.assertEqual(self.limiter.stats()["limited"], 1)
+
+    def test_user_refusal_does_not_spend_ip_token(self):
+        for _ in range(3):
+            self.limiter.check(LIKE, "1.1.1.1", "u1")
+
+        # IP потратил 2 токена из 3, третий запрос отклонён по пользователю
+        self.assertEqual(self.limiter.check(LIKE, "1.1.1.1", "u2"), 0.0)
+        self.assertGreater(self.limiter.check(LIKE, "1.1.1.1", "u3"), 0)
+
+    def test_ip_refusal_does_not_spend_user_token(self):
+        for n in range(3):
+            self.limiter.check(LIKE, "1.1.1.1", f"u{n}")
+
+        # IP исчерпан: отказ по нему не списывает токены пользователя u9
+        self.assertGreater(self.limiter.check(LIKE, "1.1.1.1", "u9"), 0)
+        self.assertGreater(self.limiter.check(LIKE, "1.1.1.1", "u9"), 0)
+        self.assertEqual(self.limiter.check(LIKE, "2.2.2.2", "u9"), 0.0)
+        self.assertEqual(self.limiter.check(LIKE, "3.3.3.3", "u9"), 0.0)
+
+    def test_refilled_buckets_are_reclaimed(self):
+        for n in range(50):
+            self.limiter.check(LOGIN, f"10.0.0.{n}", None)
+        self.assertEqual(len(self.limiter), 50)
+
+        self.clock.now += 29
+        self.limiter.purge()
+        self.assertEqual(len(self.limiter), 50)
+
+        self.clock.now += 2
+        self.limiter.purge()
+        self.assertEqual(len(self.limiter), 0)
+        self.assertEqual(self.limiter.stats()["reclaimed"], 50)
+
+    def test_sweep_runs_incrementally(self):
+        limiter = RateLimiter(rules=(LOGIN,), shards=1, sweep_every=2, clock=self.clock)
+        limiter.check(LOGIN, "1.1.1.1", None)
+        self.clock.now += 60
+
+        limiter.check(LOGIN, "2.2.2.2", None)
+        self.assertEqual(len(limiter), 1)
+
+
+class TestRateLimitMiddleware(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(rules=(LOGIN, LIKE), clock=self.clock)
+        self.calls = 0
+
+        async def inner(scope, receive, send):
+            self.calls += 1
+
+        self.middleware = RateLimitMiddleware(inner, self.limiter)
+
+    async def call(self, path="/login", method="POST", user=None):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": method, "path": path, "client": ("1.1.1.1", 5000),
+                 "state": {"user": user}}
+        await self.middleware(scope, None, send)
+        return sent
+
+    async def test_429_without_calling_app(self):
+        await self.call()
+        await self.call()
+        sent = await self.call()
+
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(sent[0]["status"], 429)
+        self.assertIn((b"retry-after", b"30"), sent[0]["headers"])
+
+    async def test_unlimited_routes_pass(self):
+        for _ in range(10):
+            await self.call(path="/", method="GET")
+        self.assertEqual(self.calls, 10)
+
+    async def test_user_taken_from_state(self):
+        user = {"id": "u1"}
+        await self.call("/like/1", user=user)
+        await self.call("/like/2", user=user)
+
+        sent = await self.call("/like/3", user=user)
+        self.assertEqual(sent[0]["status"], 429)
@@ -0,0 +1,141 @@
+import math
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from core.replicas import ReadYourWrites, ReplicaSet, RoutingSession
+from service_locator import get_locator, get_read_locator, request_session
+
+
+class TestReplicaRouting(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.primary = create_async_engine("sqlite+aiosqlite:///:memory:")
+        self.replica_a = create_async_engine("sqlite+aiosqlite:///:memory:")
+        self.replica_b = create_async_engine("sqlite+aiosqlite:///:memory:")
+        self.replicas = ReplicaSet([self.replica_a, self.replica_b], max_lag=5)
+
+    async def asyncTearDown(self):
+        for engine in (self.primary, self.replica_a, self.replica_b):
+            await engine.dispose()
+
+    def _session(self, **info):
+        return AsyncSession(
+            bind=self.primary,
+            sync_session_class=RoutingSession,
+            info={"replicas": self.replicas, **info},
+        )
+
+    def test_round_robin_skips_lagging_replica(self):
+        self.assertIs(self.replicas.choose(), self.replica_a)
+        self.assertIs(self.replicas.choose(), self.replica_b)
+
+        self.replicas.lag = [0.0, 30.0]
+        self.assertIs(self.replicas.choose(), self.replica_a)
+        self.assertIs(self.replicas.choose(), self.replica_a)
+
+        self.replicas.lag = [math.inf, 30.0]
+        self.assertIsNone(self.replicas.choose())
+
+    async def test_unreachable_replica_is_excluded(self):
+        # У SQLite нет pg_last_wal_replay_lsn(), проверка лага падает как у недоступной реплики
+        await self.replicas.refresh_lag()
+        self.assertEqual(self.replicas.available(), [])
+
+    async def test_marked_read_goes_to_replica(self):
+        session = self._session()
+        bind = session.sync_session.get_bind(replica=True)
+        self.assertIn(bind, (self.replica_a.sync_engine, self.replica_b.sync_engine))
+        await session.close()
+
+    async def test_session_keeps_its_replica(self):
+        session = self._session()
+        first = session.sync_session.get_bind(replica=True)
+        self.assertIs(session.sync_session.get_bind(replica=True), first)
+        await session.close()
+
+        other = self._session()
+        self.assertIsNot(other.sync_session.get_bind(replica=True), first)
+        await other.close()
+
+    async def test_reads_after_primary_use_stay_on_primary(self):
+        session = self._session()
+        self.assertIs(session.sync_session.get_bind(), self.primary.sync_engine)
+        self.assertIs(session.sync_session.get_bind(replica=True), self.primary.sync_engine)
+        await session.close()
+
+    async def test_sticky_session_reads_primary(self):
+        session = self._session(read_primary=True)
+        self.assertIs(session.sync_session.get_bind(replica=True), self.primary.sync_engine)
+        await session.close()
+
+
+class TestReadYourWrites(unittest.TestCase):
+    def setUp(self):
+        self.now = 100.0
+        self.window = ReadYourWrites(window=5, secret="secret", clock=lambda: self.now)
+
+    def test_window(self):
+        cookie = self.window.issue("user")
+
+        self.assertTrue(self.window.is_recent("user", cookie))
+        self.assertFalse(self.window.is_recent("other", cookie))
+        self.now = 106.0
+        self.assertFalse(self.window.is_recent("user", cookie))
+
+    def test_rejects_forged_or_extended_cookie(self):
+        until, _, signature = self.window.issue("user").partition(".")
+
+        self.assertFalse(self.window.is_recent("user", f"{int(until) + 60}.{signature}"))
+        self.assertFalse(self.window.is_recent("user", f"{until}.{'0' * 32}"))
+        self.assertFalse(self.window.is_recent("user", "garbage"))
+        self.assertFalse(self.window.is_recent("user", None))
+
+    def test_other_secret_does_not_verify(self):
+        other = ReadYourWrites(window=5, secret="another", clock=lambda: self.now)
+        self.assertFalse(self.window.is_recent("user", other.issue("user")))
+
+    def test_set_cookie_header(self):
+        header = self.window.set_cookie("user")
+
+        name, _, rest = header.partition("=")
+        self.assertEqual(name, "read_primary_until")
+        self.assertTrue(self.window.is_recent("user", rest.split(";")[0]))
+        self.assertIn("Max-Age=5", header)
+
+
+class TestLocatorReadYourWrites(unittest.IsolatedAsyncioTestCase):
+    async def test_user_reads_primary_after_write(self):
+        request = MagicMock()
+        request.state = SimpleNamespace(user={"id": "8d3a3c4e-0000-0000-0000-000000000001"})
+        request.cookies = {}
+
+        generator = get_read_locator(request)
+        await generator.__anext__()
+        self.assertFalse(request_session().info["read_primary"])
+        await generator.aclose()
+
+        generator = get_locator(request)
+        await generator.__anext__()
+        request_session()
+        await generator.aclose()
+
+        # Окно передаётся cookie: следующий запрос может попасть в любой воркер
+        header = request.state.read_primary_cookie
+        request.cookies = {"read_primary_until": header.split(";")[0].partition("=")[2]}
+        generator = get_read_locator(request)
+        await generator.__anext__()
+        self.assertTrue(request_session().info["read_primary"])
+        await generator.aclose()
+
+    async def test_write_without_session_sets_no_cookie(self):
+        request = MagicMock()
+        request.state = SimpleNamespace(user={"id": "8d3a3c4e-0000-0000-0000-000000000001"})
+        request.cookies = {}
+
+        generator = get_locator(request)
+        await generator.__anext__()
+        await generator.aclose()
+
+        self.assertFalse(hasattr(request.state, "read_primary_cookie"))
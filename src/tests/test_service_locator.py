@@ -0,0 +1,170 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.exc import OperationalError
+
+import service_locator
+from core.create_jwt import JWTManager
+from core.db import SessionLocal
+from service_locator import get_locator, get_read_locator, request_session, resolve_role
+from repositories.category_repository import CategoryRepository
+from services.category_service import CategoryCache
+from services.revocation_store import RevocationStore
+from services.search_index import SearchIndex
+
+
+async def _enter(request):
+    generator = get_locator(request)
+    locator = await generator.__anext__()
+    return generator, locator
+
+
+class TestServiceLocatorLifetime(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        service_locator._app_locator = None
+        self.request = MagicMock()
+        self.request.cookies = {}
+
+    async def test_services_are_shared_between_requests(self):
+        first_gen, first = await _enter(self.request)
+        await first_gen.aclose()
+        second_gen, second = await _enter(self.request)
+        await second_gen.aclose()
+
+        self.assertIs(first, second)
+        self.assertIs(first.auth_service(), second.auth_service())
+
+    async def test_auth_state_survives_between_requests(self):
+        token = JWTManager.create_access_token({"sub": "a@b.c", "id": "1"})
+        with patch.object(service_locator, "revocation_store", RevocationStore(directory=None)):
+            generator, locator = await _enter(self.request)
+            await locator.auth_service().logout(token)
+            await generator.aclose()
+
+            generator, locator = await _enter(self.request)
+            self.assertTrue(locator.auth_service().revocations.is_revoked(token))
+            await generator.aclose()
+
+    async def test_each_request_gets_own_session(self):
+        first_gen, _ = await _enter(self.request)
+        first_session = request_session()
+        await first_gen.aclose()
+
+        second_gen, _ = await _enter(self.request)
+        second_session = request_session()
+        await second_gen.aclose()
+
+        self.assertIsNot(first_session, second_session)
+
+    async def test_session_is_created_lazily(self):
+        generator, _ = await _enter(self.request)
+        self.assertFalse(request_session.registry.has())
+        await generator.aclose()
+
+        self.assertFalse(request_session.registry.has())
+
+    async def test_session_is_released_after_request(self):
+        generator, locator = await _enter(self.request)
+        self.assertIs(locator.repositories.adverts.session, request_session)
+        request_session()
+        self.assertTrue(request_session.registry.has())
+        await generator.aclose()
+
+        self.assertFalse(request_session.registry.has())
+
+
+    async def test_category_cache_loads_in_own_session(self):
+        loads = []
+
+        async def get_all(repo):
+            loads.append((request_session(), service_locator._request_role.get()))
+            return [SimpleNamespace(id=1, name="Мебель")]
+
+        with patch.object(CategoryRepository, "get_all", get_all), \
+                patch.object(service_locator, "category_cache", CategoryCache()):
+            generator, locator = await _enter(self.request)
+            own_session = request_session()
+            await locator.services.categories.get_all()
+            # Сессия запроса, начавшего загрузку, не тронута; сессия загрузки уже закрыта
+            self.assertIs(request_session(), own_session)
+            await generator.aclose()
+
+        (session, role), = loads
+        self.assertIsNot(session, own_session)
+        self.assertEqual(role, "any_user")
+
+
+class TestSessionRouting(unittest.IsolatedAsyncioTestCase):
+    def _request(self, user):
+        request = MagicMock()
+        request.state.user = user
+        request.cookies = {}
+        return request
+
+    async def _session_for(self, dependency, user):
+        generator = dependency(self._request(user))
+        await generator.__anext__()
+        session = request_session()
+        await generator.aclose()
+        return session
+
+    def test_resolve_role(self):
+        user = {"id": "1", "email": "a@b.c", "role": "authorized_user"}
+        self.assertEqual(resolve_role(None, "read"), "any_user")
+        self.assertEqual(resolve_role(user, "read"), "authorized_user")
+        self.assertEqual(resolve_role(None, "write"), "admin")
+        self.assertEqual(resolve_role(user, "write"), "admin")
+
+    async def test_anonymous_read_uses_read_only_pool(self):
+        session = await self._session_for(get_read_locator, None)
+        self.assertIs(session.bind, SessionLocal["any_user"].kw["bind"])
+
+    async def test_authorized_read_uses_user_pool(self):
+        session = await self._session_for(get_read_locator, {"id": "1"})
+        self.assertIs(session.bind, SessionLocal["authorized_user"].kw["bind"])
+
+    async def test_write_uses_primary_pool(self):
+        session = await self._session_for(get_locator, None)
+        self.assertIs(session.bind, SessionLocal["admin"].kw["bind"])
+
+
+class TestIndexBuildPages(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sessions = []
+        self.failures = 0
+        self.locator = SimpleNamespace(repositories=SimpleNamespace(adverts=SimpleNamespace(scan_adverts=self.scan)))
+
+    async def scan(self, after, limit):
+        self.sessions.append(request_session())
+        if self.failures:
+            self.failures -= 1
+            raise OperationalError("SELECT", {}, Exception("connection lost"))
+        return [] if after else [object()] * limit
+
+    @patch.object(service_locator, "BUILD_RETRY_DELAY", 0)
+    async def test_each_page_gets_own_session(self):
+        fetch = service_locator._page_reader(self.locator)
+        await fetch(None, 2)
+        await fetch(("t", "id"), 2)
+
+        self.assertIsNot(self.sessions[0], self.sessions[1])
+        self.assertFalse(request_session.registry.has())
+
+    @patch.object(service_locator, "BUILD_RETRY_DELAY", 0)
+    async def test_failed_page_is_retried(self):
+        self.failures = 2
+
+        self.assertEqual(len(await service_locator._page_reader(self.locator)(None, 3)), 3)
+        self.assertEqual(len(self.sessions), 3)
+
+    @patch.object(service_locator, "BUILD_RETRY_DELAY", 0)
+    async def test_persistent_failure_leaves_index_not_ready(self):
+        self.failures = 100
+        index = SearchIndex()
+
+        with patch.object(service_locator, "search_index", index):
+            await service_locator.build_search_index(self.locator)
+
+        self.assertFalse(index.ready)
+        self.assertEqual(len(self.sessions), service_locator.BUILD_PAGE_RETRIES + 1)
@@ -0,0 +1,52 @@
+import unittest
+from uuid import uuid4
+from datetime import datetime
+
+from sql_builders.advert_sql_builder import AdvertsSqlBuilder
+from sql_builders.liked_sql_builder import LikedSqlBuilder
+from sql_builders.statement_registry import StatementRegistry, statements
+
+
+class TestStatementRegistry(unittest.TestCase):
+    def test_register_is_idempotent_for_same_sql(self):
+        registry = StatementRegistry()
+        first = registry.register("a", "SELECT 1")
+        second = registry.register("a", "SELECT 1")
+        self.assertIs(first, second)
+
+    def test_register_rejects_conflicting_sql(self):
+        registry = StatementRegistry()
+        registry.register("a", "SELECT 1")
+        with self.assertRaises(ValueError):
+            registry.register("a", "SELECT 2")
+
+    def test_executions_are_counted(self):
+        registry = StatementRegistry()
+        statement = registry.register("a", "SELECT 1")
+        statement()
+        statement()
+        self.assertEqual(registry.stats(), {"a": 2})
+        registry.reset_counters()
+        self.assertEqual(registry.stats(), {"a": 0})
+
+
+class TestBuildersReuseStatements(unittest.TestCase):
+    def test_hot_path_returns_same_clause(self):
+        builder = LikedSqlBuilder()
+        first, _ = builder.is_liked(uuid4(), uuid4())
+        second, params = builder.is_liked(uuid4(), uuid4())
+        self.assertIs(first, second)
+        self.assertEqual(set(params), {"uid", "aid"})
+
+    def test_page_variants_are_cached(self):
+        builder = AdvertsSqlBuilder()
+        first_page, _ = builder.get_all(limit=10)
+        next_page, params = builder.get_all((datetime(2025, 1, 1), uuid4()), 10)
+        self.assertIsNot(first_page, next_page)
+        self.assertIs(builder.get_all((datetime(2025, 1, 2), uuid4()), 10)[0], next_page)
+        self.assertIn("after_id", params)
+
+    def test_builder_calls_are_counted(self):
+        before = statements.stats()["adverts.get_by_id"]
+        AdvertsSqlBuilder().get_by_id(uuid4())
+        self.assertEqual(statements.stats()["adverts.get_by_id"], before + 1)
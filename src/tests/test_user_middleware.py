@@ -0,0 +1,131 @@
+import sqlite3
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import RedirectResponse
+
+from core.user_middleware import UserMiddleware, cookie_value
+
+
+class TestCookieValue(unittest.TestCase):
+    def test_finds_cookie_among_others(self):
+        headers = [(b"host", b"x"), (b"cookie", b"theme=dark; access_token=abc.def; lang=ru")]
+        self.assertEqual(cookie_value(headers, "access_token"), "abc.def")
+
+    def test_quoted_value(self):
+        self.assertEqual(cookie_value([(b"cookie", b'access_token="abc"')], "access_token"), "abc")
+
+    def test_name_must_match_exactly(self):
+        headers = [(b"cookie", b"old_access_token=abc")]
+        self.assertIsNone(cookie_value(headers, "access_token"))
+
+    def test_missing_or_empty(self):
+        self.assertIsNone(cookie_value([(b"host", b"x")], "access_token"))
+        self.assertIsNone(cookie_value([(b"cookie", b"access_token=")], "access_token"))
+
+
+class TestUserMiddleware(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.auth = MagicMock()
+        self.auth.verify_token.return_value = {"id": "u1", "sub": "a@b.c", "role": "authorized_user"}
+        self.seen = []
+
+        async def inner(scope, receive, send):
+            self.seen.append(scope)
+
+        self.middleware = UserMiddleware(inner)
+        self.app = SimpleNamespace(state=SimpleNamespace(locator=SimpleNamespace(auth_service=lambda: self.auth)))
+
+    async def call(self, path="/", cookie=None, scope_type="http"):
+        headers = [(b"cookie", cookie.encode())] if cookie else []
+        scope = {"type": scope_type, "path": path, "headers": headers, "app": self.app}
+        await self.middleware(scope, None, None)
+        return self.seen[-1]
+
+    async def test_valid_token_sets_user(self):
+        scope = await self.call(cookie="access_token=t")
+
+        self.assertEqual(scope["state"]["user"], {"id": "u1", "email": "a@b.c", "role": "authorized_user"})
+        self.auth.verify_token.assert_called_once_with("t")
+
+    async def test_no_cookie_skips_verification(self):
+        scope = await self.call()
+
+        self.assertIsNone(scope["state"]["user"])
+        self.auth.verify_token.assert_not_called()
+
+    async def test_invalid_token_gives_anonymous(self):
+        self.auth.verify_token.side_effect = ValueError("Token revoked")
+
+        scope = await self.call(cookie="access_token=t")
+        self.assertIsNone(scope["state"]["user"])
+
+    async def test_storage_failure_is_not_hidden(self):
+        self.auth.verify_token.side_effect = sqlite3.OperationalError("disk I/O error")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            await self.call(cookie="access_token=t")
+
+    async def test_skipped_paths_are_anonymous(self):
+        for path in ("/metrics", "/search/suggest", "/static/app.css"):
+            scope = await self.call(path=path, cookie="access_token=t")
+            self.assertIsNone(scope["state"]["user"])
+        self.auth.verify_token.assert_not_called()
+
+    async def test_lifespan_passes_through(self):
+        scope = await self.call(scope_type="lifespan")
+        self.assertNotIn("state", scope)
+
+
+class TestReadPrimaryCookie(unittest.IsolatedAsyncioTestCase):
+    async def asgi(self, app, cookie=None):
+        headers = [(b"cookie", cookie.encode())] if cookie else []
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": "/write", "raw_path": b"/write", "root_path": "", "query_string": b"",
+            "headers": headers, "client": ("127.0.0.1", 5000), "server": ("test", 80),
+        }
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+        return sent[0]
+
+    def app(self):
+        app = FastAPI()
+        auth = MagicMock()
+        auth.verify_token.return_value = {"id": "u1", "sub": "a@b.c", "role": "authorized_user"}
+        app.state.locator = SimpleNamespace(auth_service=lambda: auth)
+
+        async def writing_locator(request: Request):
+            try:
+                yield None
+            finally:
+                # Как get_locator после записи в БД
+                if request.state.user:
+                    request.state.read_primary_cookie = "read_primary_until=1.sig; Path=/"
+
+        @app.post("/write")
+        async def write(_=Depends(writing_locator)):
+            return RedirectResponse("/", status_code=303)
+
+        app.add_middleware(UserMiddleware)
+        return app
+
+    async def test_cookie_added_to_redirect_after_write(self):
+        start = await self.asgi(self.app(), cookie="access_token=t")
+
+        self.assertEqual(start["status"], 303)
+        self.assertIn((b"set-cookie", b"read_primary_until=1.sig; Path=/"), start["headers"])
+
+    async def test_anonymous_response_untouched(self):
+        start = await self.asgi(self.app())
+
+        self.assertNotIn(b"set-cookie", [name for name, _ in start["headers"]])